@@ -0,0 +1,114 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.signal import lfilter
+
+from benchmarks.harness import BaselineStore, measure
+from src.models import ARMADataGenerator
+
+_MEASUREMENTS = []
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--save-baselines",
+        action="store_true",
+        help="Store the measurements as the new baselines instead of checking them.",
+    )
+    group.addoption(
+        "--time-threshold",
+        type=float,
+        default=1.5,
+        help="Allowed wall time as a factor of the baseline (default 1.5).",
+    )
+    group.addoption(
+        "--memory-threshold",
+        type=float,
+        default=1.25,
+        help="Allowed peak memory as a factor of the baseline (default 1.25).",
+    )
+    group.addoption(
+        "--baselines",
+        default=os.path.join(os.path.dirname(__file__), "baselines.json"),
+        help="Path of the baselines file.",
+    )
+
+
+@pytest.fixture(scope="session")
+def baselines(request):
+    config = request.config
+    return BaselineStore(
+        config.getoption("--baselines"),
+        config.getoption("--time-threshold"),
+        config.getoption("--memory-threshold"),
+    )
+
+
+@pytest.fixture
+def record_measurement(request, baselines):
+    """
+    Record a measurement taken by the test and fail the test if it regresses against
+    its baseline.
+    """
+
+    def record(measurement):
+        _MEASUREMENTS.append(measurement)
+        if not request.config.getoption("--save-baselines"):
+            regression = baselines.check(measurement)
+            if regression is not None:
+                pytest.fail(f"Performance regression in {regression}")
+        return measurement
+
+    return record
+
+
+@pytest.fixture
+def benchmark(record_measurement):
+    """
+    Measure a case and fail the test if it regresses against its baseline.
+    """
+
+    def run(name, func, repeat=3, items=0):
+        return record_measurement(measure(name, func, repeat, items))
+
+    return run
+
+
+@pytest.fixture(scope="session")
+def historical_series():
+    rng = np.random.default_rng(42)
+    index = pd.date_range("1990-01-01", "2019-12-31", freq="D")
+    values = lfilter([1.0, 0.3], [1.0, -0.5, 0.1], rng.standard_normal(len(index)))
+    return pd.Series(values * 2.0 + 3.0, index=index)
+
+
+@pytest.fixture(scope="session")
+def fitted_generator(historical_series):
+    generator = ARMADataGenerator(order=(2, 1), steps=365)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        generator.fit(historical_series)
+    return generator
+
+
+def pytest_sessionfinish(session):
+    if session.config.getoption("--save-baselines") and _MEASUREMENTS:
+        BaselineStore(session.config.getoption("--baselines")).save(_MEASUREMENTS)
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _MEASUREMENTS:
+        return
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(
+        f"{'case':<40} {'wall time':>12} {'peak memory':>14} {'items/s':>14}"
+    )
+    for m in _MEASUREMENTS:
+        terminalreporter.write_line(
+            f"{m.name:<40} {m.wall_time:>11.4f}s {m.peak_memory / 2**20:>10.1f} MiB "
+            f"{m.throughput:>14.3g}"
+        )
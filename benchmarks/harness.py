@@ -0,0 +1,184 @@
+import json
+import os
+import platform
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class Measurement:
+    """
+    Wall time and peak memory of one benchmark case.
+
+    Attributes:
+        name (str): Unique name of the case, e.g. 'generate[1000x3y]'.
+        wall_time (float): Best wall time of the repeats in seconds.
+        peak_memory (int): Peak traced allocation in bytes during one run.
+        items (int): Number of items processed, e.g. trajectory-days.
+    """
+
+    name: str
+    wall_time: float
+    peak_memory: int
+    items: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """
+        Items processed per second.
+
+        Returns:
+            float: items / wall_time, 0 when no items were given.
+        """
+        return self.items / self.wall_time if self.wall_time > 0 else 0.0
+
+
+def measure(
+    name: str, func: Callable[[], Any], repeat: int = 3, items: int = 0
+) -> Measurement:
+    """
+    Time a function and trace its peak memory.
+
+    The wall time is the best of the repeats, which is the least noisy estimate of
+    the cost of the code. Memory is traced in a separate run, since tracemalloc slows
+    down allocations.
+
+    Args:
+        name (str): Name of the case.
+        func (Callable[[], Any]): The code to measure.
+        repeat (int): Number of timed runs. Default is 3.
+        items (int): Number of items processed by one run. Default is 0.
+
+    Returns:
+        Measurement: The measurement.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(name, min(times), peak, items)
+
+
+def latency_measurement(
+    name: str, latencies: List[float], percentile: float = 99.0, items: int = 0
+) -> Measurement:
+    """
+    Summarise the latencies of many requests as a measurement.
+
+    The wall time is the given percentile of the latencies, so that a case regresses
+    when its tail latency does. Memory is not traced for latency cases, since
+    tracemalloc would slow down the server being measured.
+
+    Args:
+        name (str): Name of the case.
+        latencies (List[float]): Latency of every request in seconds.
+        percentile (float): Percentile reported as wall time. Default is 99.
+        items (int): Number of items served over the whole run. Default is 0.
+
+    Returns:
+        Measurement: The measurement, with a peak memory of 0.
+    """
+    tail = float(np.percentile(latencies, percentile))
+    return Measurement(name, tail, 0, items)
+
+
+@dataclass
+class BaselineStore:
+    """
+    Baselines of the benchmark cases, kept in a JSON file.
+
+    Attributes:
+        path (str): Path of the JSON file.
+        time_threshold (float): A case regresses when its wall time exceeds the
+            baseline by this factor. Default is 1.5.
+        memory_threshold (float): A case regresses when its peak memory exceeds the
+            baseline by this factor. Default is 1.25.
+        time_slack (float): Absolute wall time in seconds that is always tolerated,
+            so that millisecond cases do not fail on timer noise. Default is 0.005.
+        memory_slack (int): Absolute peak memory in bytes that is always tolerated.
+            Default is 1 MiB.
+    """
+
+    path: str
+    time_threshold: float = 1.5
+    memory_threshold: float = 1.25
+    time_slack: float = 0.005
+    memory_slack: int = 2**20
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Read the stored baselines.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Baselines by case name, empty if there are none.
+        """
+        if not os.path.isfile(self.path):
+            return {}
+        with open(self.path) as fp:
+            return json.load(fp)["cases"]
+
+    def save(self, measurements: List[Measurement]) -> None:
+        """
+        Store measurements as the new baselines, keeping the baselines of cases that
+        were not run.
+
+        Args:
+            measurements (List[Measurement]): The measurements to store.
+        """
+        cases = self.load()
+        cases.update({m.name: asdict(m) for m in measurements})
+        with open(self.path, "w") as fp:
+            json.dump(
+                {
+                    "machine": platform.platform(),
+                    "python": platform.python_version(),
+                    "cases": dict(sorted(cases.items())),
+                },
+                fp,
+                indent=2,
+            )
+
+    def check(self, measurement: Measurement) -> Optional[str]:
+        """
+        Compare a measurement with its baseline.
+
+        Args:
+            measurement (Measurement): The measurement to check.
+
+        Returns:
+            Optional[str]: A description of the regression, or None if the case is
+                           within the thresholds or has no baseline.
+        """
+        baseline = self.load().get(measurement.name)
+        if baseline is None:
+            return None
+
+        problems = []
+        allowed_time = self.time_threshold * baseline["wall_time"] + self.time_slack
+        allowed_memory = (
+            self.memory_threshold * baseline["peak_memory"] + self.memory_slack
+        )
+        if measurement.wall_time > allowed_time:
+            problems.append(
+                f"wall time {measurement.wall_time:.4f}s vs. baseline "
+                f"{baseline['wall_time']:.4f}s"
+            )
+        if measurement.peak_memory > allowed_memory:
+            problems.append(
+                f"peak memory {measurement.peak_memory / 2**20:.1f} MiB vs. baseline "
+                f"{baseline['peak_memory'] / 2**20:.1f} MiB"
+            )
+        return f"{measurement.name}: " + ", ".join(problems) if problems else None
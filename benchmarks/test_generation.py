@@ -0,0 +1,68 @@
+import pytest
+
+from src.generators import WeatherGenerator
+from src.models import ARMADataGenerator
+from src.utils import PrecipitationClassifier
+
+SIZES = [(100, 2), (1000, 2), (100, 10), (1000, 10)]
+YEAR = [("Winter", "normal"), ("Spring", "wet"), ("Summer", "dry"), ("Fall", "normal")]
+
+
+def _case(stage, n_trajectories, years):
+    return f"{stage}[{n_trajectories}x{years}y]"
+
+
+def _generator(fitted_generator, years):
+    generator = ARMADataGenerator(order=fitted_generator.order, steps=365 * years)
+    generator.model = fitted_generator.model
+    generator.scaler = fitted_generator.scaler
+    generator.original_data = fitted_generator.original_data
+    return generator
+
+
+def test_fit(benchmark, historical_series):
+    generator = ARMADataGenerator(order=(2, 1), steps=365)
+    benchmark("fit[30y]", lambda: generator.fit(historical_series), repeat=1)
+
+
+@pytest.mark.parametrize("n_trajectories, years", SIZES)
+def test_generate(benchmark, fitted_generator, n_trajectories, years):
+    generator = _generator(fitted_generator, years)
+    benchmark(
+        _case("generate", n_trajectories, years),
+        lambda: generator.generate(n_trajectories, seed=0),
+        items=n_trajectories * generator.steps,
+    )
+
+
+@pytest.mark.parametrize("n_trajectories, years", SIZES)
+@pytest.mark.parametrize("by_year", [False, True])
+def test_classify(benchmark, fitted_generator, n_trajectories, years, by_year):
+    data = _generator(fitted_generator, years).generate(n_trajectories, seed=0)
+    classifier = PrecipitationClassifier()
+    stage = "classify_by_year" if by_year else "classify"
+    benchmark(
+        _case(stage, n_trajectories, years),
+        lambda: classifier.classify_precipitation(data, by_year=by_year),
+        items=data.size,
+    )
+
+
+@pytest.mark.parametrize("n_trajectories, years", SIZES)
+def test_generate_weather(benchmark, fitted_generator, n_trajectories, years):
+    data = _generator(fitted_generator, years).generate(n_trajectories, seed=0)
+    classified = PrecipitationClassifier().classify_precipitation(data, by_year=True)
+    weather_generator = WeatherGenerator(data, classified)
+
+    benchmark(
+        _case("generate_weather", n_trajectories, years),
+        lambda: weather_generator.generate_weather(YEAR, num_years=years, seed=0),
+        items=365 * years,
+    )
+    benchmark(
+        _case("generate_weather_batch", n_trajectories, years),
+        lambda: weather_generator.generate_weather_batch(
+            YEAR, num_years=years, n_scenarios=n_trajectories, seed=0
+        ),
+        items=n_trajectories * 365 * years,
+    )
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.harness import latency_measurement
+from src.data.ensemble_store import EnsembleStore
+from src.models import ARMADataGenerator
+from src.service import ScenarioClient, ScenarioServer
+from src.utils import PrecipitationClassifier
+
+YEARS = [
+    [("Winter", "wet"), ("Spring", "normal"), ("Summer", "dry"), ("Fall", "normal")],
+    [("Winter", "dry"), ("Spring", "dry"), ("Summer", "very_dry"), ("Fall", "wet")],
+    [("Winter", "very_wet"), ("Spring", "wet"), ("Summer", "normal"), ("Fall", "dry")],
+]
+N_CLIENTS = 16
+REQUESTS_PER_CLIENT = 50
+
+
+@pytest.fixture(scope="module")
+def bundle(tmp_path_factory, fitted_generator):
+    generator = ARMADataGenerator(order=fitted_generator.order, steps=365 * 10)
+    generator.model = fitted_generator.model
+    generator.scaler = fitted_generator.scaler
+    generator.original_data = fitted_generator.original_data
+    data = generator.generate(1000, seed=0)
+
+    path = tmp_path_factory.mktemp("bundle")
+    EnsembleStore(str(path / "trajectories")).write(data)
+    classifier = PrecipitationClassifier()
+    classifier.save_classified_data(
+        classifier.classify_precipitation(data, by_year=True),
+        str(path / "classified"),
+        file_format="npy",
+    )
+    return str(path)
+
+
+async def _client_latencies(port, client_number, seeds):
+    # A closed loop: every client sends its next request once the last is answered
+    client = await ScenarioClient.connect(port=port)
+    latencies = []
+    try:
+        for i in range(REQUESTS_PER_CLIENT):
+            year = YEARS[(client_number + i) % len(YEARS)]
+            start = time.perf_counter()
+            await client.request(year, num_years=3, n_scenarios=10, seed=seeds(i))
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await client.close()
+    return latencies
+
+
+def _load(server, seeds):
+    async def run():
+        listener = await server.start()
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            await _client_latencies(port, 0, seeds)  # warm up
+            results = await asyncio.gather(
+                *[_client_latencies(port, n, seeds) for n in range(N_CLIENTS)]
+            )
+        finally:
+            listener.close()
+        return [latency for latencies in results for latency in latencies]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_serve_p99(record_measurement, bundle, cached):
+    server = ScenarioServer.from_bundle(bundle)
+    seeds = (lambda i: i % 5) if cached else (lambda i: None)
+
+    latencies = _load(server, seeds)
+
+    n_requests = N_CLIENTS * REQUESTS_PER_CLIENT
+    assert len(latencies) == n_requests
+    record_measurement(
+        latency_measurement(
+            f"serve_p99[{'cached' if cached else 'unseeded'}]",
+            latencies,
+            items=n_requests * 10 * 3 * 365,
+        )
+    )
@@ -0,0 +1,19 @@
+from setuptools import find_packages, setup
+
+setup(
+    name="precipitation-generator",
+    version="0.1.0",
+    description="Synthetic precipitation scenarios with seasonal conditions.",
+    packages=find_packages(include=["src", "src.*"]),
+    python_requires=">=3.9",
+    install_requires=[
+        "numpy>=1.22",
+        "pandas>=2.0",
+        "scipy>=1.9",
+        "statsmodels>=0.13",
+        "scikit-learn>=1.1",
+        "PyYAML>=6.0",
+    ],
+    extras_require={"plot": ["matplotlib>=3.5"], "arrow": ["pyarrow"]},
+    entry_points={"console_scripts": ["precipgen=src.cli:main"]},
+)
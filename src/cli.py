@@ -0,0 +1,178 @@
+import argparse
+import logging
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .pipeline.pipeline_config import PipelineConfig
+from .pipeline.station_pipeline import StationPipeline
+
+logger = logging.getLogger(__name__)
+
+# Options of StationPipeline in a run configuration; all keys other than these and
+# stations are PipelineConfig settings.
+_RUN_OPTIONS = ("output_dir", "n_workers", "memory_limit")
+
+
+def load_config(
+    path: str,
+) -> Tuple[PipelineConfig, Union[str, Dict[str, str]], Dict[str, Any]]:
+    """
+    Read a YAML run configuration.
+
+    The file holds the run keys stations, output_dir, n_workers and memory_limit next
+    to the PipelineConfig settings (see config/config.yaml). Relative paths are
+    resolved against the directory of the file.
+
+    Args:
+        path (str): The YAML file.
+
+    Returns:
+        Tuple[PipelineConfig, Union[str, Dict[str, str]], Dict[str, Any]]: The pipeline
+            settings, the stations (a directory, a manifest CSV or a mapping of names
+            to CSV paths) and the keyword arguments of StationPipeline.
+
+    Raises:
+        ValueError: If stations or output_dir is missing or a setting is unknown.
+    """
+    import yaml
+
+    with open(path) as fp:
+        settings = yaml.safe_load(fp) or {}
+
+    missing = [key for key in ("stations", "output_dir") if key not in settings]
+    if missing:
+        raise ValueError(f"The configuration {path} is missing: {missing}")
+
+    root = os.path.dirname(os.path.abspath(path))
+    stations = settings.pop("stations")
+    if isinstance(stations, dict):
+        stations = {
+            str(name): os.path.join(root, station) for name, station in stations.items()
+        }
+    else:
+        stations = os.path.join(root, stations)
+
+    options = {key: settings.pop(key) for key in _RUN_OPTIONS if key in settings}
+    options["output_dir"] = os.path.join(root, options["output_dir"])
+    return PipelineConfig.from_dict(settings), stations, options
+
+
+def run(config_path: str, n_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Run the pipeline of a configuration file. Stages whose inputs are unchanged since
+    the last run are skipped.
+
+    Args:
+        config_path (str): The YAML file.
+        n_workers (Optional[int]): Overrides n_workers of the configuration.
+
+    Returns:
+        pd.DataFrame: The summary of StationPipeline.run.
+    """
+    config, stations, options = load_config(config_path)
+    if n_workers is not None:
+        options["n_workers"] = n_workers
+    return StationPipeline(config=config, **options).run(stations)
+
+
+def serve(
+    bundle: str,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    path: Optional[str] = None,
+    cache_size: int = 256,
+    config_path: Optional[str] = None,
+) -> None:
+    """
+    Serve the scenarios of a station bundle until interrupted.
+
+    Args:
+        bundle (str): Bundle directory written by StationPipeline.
+        host (str): Interface of the TCP server. Default is "127.0.0.1".
+        port (int): Port of the TCP server. Default is 8765.
+        path (Optional[str]): Path of a Unix socket to listen on instead of TCP.
+        cache_size (int): Number of assembled results kept. Default is 256.
+        config_path (Optional[str]): The YAML file the bundle was built with, needed
+            when it defines custom seasons.
+    """
+    import asyncio
+
+    from .service import ScenarioServer
+
+    seasons = load_config(config_path)[0].seasons if config_path else None
+    server = ScenarioServer.from_bundle(bundle, seasons=seasons, cache_size=cache_size)
+    logger.info("Serving %s on %s", bundle, path or f"{host}:{port}")
+    try:
+        asyncio.run(server.serve_forever(host, port, path))
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the precipgen command.
+
+    Args:
+        argv (Optional[List[str]]): Command line arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        int: Exit status, 1 if a station failed.
+    """
+    parser = argparse.ArgumentParser(
+        prog="precipgen", description="Generate synthetic precipitation scenarios."
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser(
+        "run", help="run or resume the pipeline of a configuration file"
+    )
+    run_parser.add_argument("config", help="YAML configuration file")
+    run_parser.add_argument(
+        "--workers", type=int, default=None, help="stations processed in parallel"
+    )
+    serve_parser = commands.add_parser(
+        "serve", help="answer scenario requests from the bundle of a station"
+    )
+    serve_parser.add_argument("bundle", help="bundle directory of a station")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="TCP interface")
+    serve_parser.add_argument("--port", type=int, default=8765, help="TCP port")
+    serve_parser.add_argument(
+        "--socket", default=None, help="Unix socket to listen on instead of TCP"
+    )
+    serve_parser.add_argument(
+        "--config", default=None, help="YAML configuration the bundle was built with"
+    )
+    serve_parser.add_argument(
+        "--cache-size", type=int, default=256, help="assembled results kept"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s %(name)s %(levelname)s %(message)s",
+    )
+
+    if args.command == "serve":
+        serve(
+            args.bundle,
+            args.host,
+            args.port,
+            args.socket,
+            args.cache_size,
+            args.config,
+        )
+        return 0
+
+    summary = run(args.config, n_workers=args.workers)
+    print(summary.to_string())
+    failed = summary.index[summary["status"] != "done"]
+    for station in failed:
+        logger.error("%s failed: %s", station, summary.loc[station, "error"])
+    return 1 if len(failed) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
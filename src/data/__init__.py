@@ -1,5 +1,7 @@
 # src/data/__init__.py
 
 from .time_series_data import TimeSeriesData
+from .ensemble_store import EnsembleStore
+from .season_calendar import SeasonCalendar, DEFAULT_SEASONS
 
-__all__ = ["TimeSeriesData"]
+__all__ = ["TimeSeriesData", "EnsembleStore", "SeasonCalendar", "DEFAULT_SEASONS"]
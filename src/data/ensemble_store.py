@@ -0,0 +1,307 @@
+import json
+import os
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+_MAGIC = b"\x93NUMPY\x01\x00"
+_HEADER_SIZE = 128
+
+
+@dataclass
+class EnsembleStore:
+    """
+    A binary, memory-mappable store for ensembles of trajectories, classifications
+    and scenarios.
+
+    The store is a directory holding the values as a column-major .npy file (each
+    trajectory is contiguous on disk), one .npy file per index level, and a
+    metadata.json header with the column names, index description and any
+    user-supplied attributes such as model order, seed or scaler parameters.
+    Multivariate ensembles with (variable, simulation) columns are stored as one
+    array whose variables are consecutive planes of columns.
+
+    Attributes:
+        path (str): Directory of the store.
+    """
+
+    path: str
+
+    def write(
+        self,
+        data: pd.DataFrame,
+        attributes: Optional[Dict[str, Any]] = None,
+        dtype: Optional[np.dtype] = None,
+        categories: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Write a DataFrame to the store, replacing any previous content.
+
+        Args:
+            data (pd.DataFrame): The data to store.
+            attributes (Optional[Dict[str, Any]]): JSON-serializable metadata to keep
+                alongside the data.
+            dtype (Optional[np.dtype]): Storage dtype for numeric data, e.g. np.float32.
+                Defaults to the dtype of the data.
+            categories (Optional[List[str]]): When given, the data holds labels from this
+                list and is stored as int8 codes, with -1 for missing labels.
+        """
+        if categories is not None:
+            codes = np.full(data.shape, -1, dtype=np.int8)
+            lookup = {category: code for code, category in enumerate(categories)}
+            for j, column in enumerate(data.columns):
+                series = data[column]
+                if isinstance(series.dtype, pd.CategoricalDtype) and list(
+                    series.cat.categories
+                ) == list(categories):
+                    codes[:, j] = series.cat.codes.to_numpy()
+                else:
+                    codes[:, j] = (
+                        series.astype(object).map(lookup).fillna(-1).to_numpy()
+                    )
+            values = codes
+        else:
+            values = data.to_numpy(dtype=dtype)
+
+        self.write_iter([values], data.index, data.columns, attributes)
+        if categories is not None:
+            metadata = self.metadata
+            metadata["categories"] = list(categories)
+            self._write_metadata(metadata)
+
+    def write_iter(
+        self,
+        chunks: Iterable[Any],
+        index: Optional[pd.Index] = None,
+        columns: Optional[Union[List[str], pd.Index]] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        dtype: Optional[np.dtype] = None,
+    ) -> None:
+        """
+        Stream blocks of columns to the store without holding the whole ensemble in memory.
+
+        Args:
+            chunks (Iterable[Any]): DataFrames or 2D arrays sharing the same rows, e.g.
+                from ARMADataGenerator.generate_iter.
+            index (Optional[pd.Index]): Row index. Defaults to the index of the first
+                DataFrame block.
+            columns (Optional[Union[List[str], pd.Index]]): Column names, or a
+                MultiIndex. Defaults to the concatenated columns of DataFrame blocks.
+            attributes (Optional[Dict[str, Any]]): JSON-serializable metadata.
+            dtype (Optional[np.dtype]): Storage dtype. Defaults to the first block's dtype.
+
+        Raises:
+            ValueError: If no block is given or the blocks do not share the same rows.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        collected_columns: List[pd.Index] = []
+        n_rows = n_columns = None
+
+        with open(self._values_path, "wb") as fp:
+            fp.write(b"\0" * _HEADER_SIZE)
+            for chunk in chunks:
+                if isinstance(chunk, pd.DataFrame):
+                    if index is None:
+                        index = chunk.index
+                    collected_columns.append(chunk.columns)
+                    chunk = chunk.to_numpy()
+                chunk = np.asarray(chunk)
+                if chunk.ndim == 1:
+                    chunk = chunk[:, None]
+                if dtype is None:
+                    dtype = chunk.dtype
+                if n_rows is None:
+                    n_rows, n_columns = chunk.shape[0], 0
+                elif chunk.shape[0] != n_rows:
+                    raise ValueError("All blocks must have the same number of rows.")
+
+                # Column-major order: the transposed block is written row by row.
+                fp.write(np.ascontiguousarray(chunk.T, dtype=dtype).tobytes())
+                n_columns += chunk.shape[1]
+
+            if n_rows is None:
+                raise ValueError("No data provided.")
+            fp.seek(0)
+            fp.write(_npy_header(np.dtype(dtype), (n_rows, n_columns)))
+
+        if columns is None and collected_columns:
+            columns = collected_columns[0].append(collected_columns[1:])
+        if columns is None:
+            columns = [str(i) for i in range(n_columns)]
+        if index is None:
+            index = pd.RangeIndex(n_rows)
+
+        metadata = {"columns": [str(column) for column in columns]}
+        if isinstance(columns, pd.MultiIndex):
+            metadata = {
+                "columns": [[str(part) for part in column] for column in columns],
+                "column_names": list(columns.names),
+            }
+        metadata["index"] = self._write_index(index)
+        metadata["attributes"] = attributes or {}
+        self._write_metadata(metadata)
+
+    def read(self, mmap: bool = True) -> pd.DataFrame:
+        """
+        Read the store as a DataFrame.
+
+        Numeric data is wrapped without copying, so with mmap=True the DataFrame is
+        backed by the file and only the trajectories that are accessed are read.
+
+        Args:
+            mmap (bool): Memory-map the values instead of reading them. Default is True.
+
+        Returns:
+            pd.DataFrame: The stored data. Categorical stores are decoded to labels.
+        """
+        metadata = self.metadata
+        values = self.read_values(mmap=mmap)
+        index = self.read_index()
+
+        columns = metadata["columns"]
+        if "column_names" in metadata:
+            columns = pd.MultiIndex.from_tuples(
+                [tuple(column) for column in columns], names=metadata["column_names"]
+            )
+
+        categories = metadata.get("categories")
+        if categories is None:
+            return pd.DataFrame(values, index=index, columns=columns, copy=False)
+
+        return pd.DataFrame(
+            {
+                column: pd.Categorical.from_codes(values[:, j], categories=categories)
+                for j, column in enumerate(columns)
+            },
+            index=index,
+        )
+
+    def read_values(self, mmap: bool = True) -> np.ndarray:
+        """
+        Read the raw (rows, columns) array of the store.
+
+        Args:
+            mmap (bool): Memory-map the values instead of reading them. Default is True.
+
+        Returns:
+            np.ndarray: The stored values, read-only when memory-mapped.
+        """
+        return np.load(self._values_path, mmap_mode="r" if mmap else None)
+
+    def read_index(self) -> pd.Index:
+        """
+        Read the row index of the store.
+
+        Returns:
+            pd.Index: The stored index, a MultiIndex if several levels were stored.
+        """
+        description = self.metadata["index"]
+        levels = [
+            np.load(os.path.join(self.path, f"index_{i}.npy"))
+            for i in range(len(description["names"]))
+        ]
+        if len(levels) > 1:
+            return pd.MultiIndex.from_arrays(levels, names=description["names"])
+
+        index = pd.Index(levels[0], name=description["names"][0])
+        if description.get("freq") is not None:
+            index = pd.DatetimeIndex(index, freq=description["freq"])
+        return index
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """
+        Metadata header of the store.
+
+        Returns:
+            Dict[str, Any]: Columns, index description, categories and attributes.
+
+        Raises:
+            FileNotFoundError: If the store does not exist.
+        """
+        try:
+            with open(os.path.join(self.path, "metadata.json")) as fp:
+                return json.load(fp)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No ensemble store found at {self.path}.")
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """
+        Check whether a directory holds an ensemble store.
+
+        Args:
+            path (str): Directory to check.
+
+        Returns:
+            bool: True if the directory contains a store.
+        """
+        return os.path.isfile(os.path.join(path, "metadata.json"))
+
+    @property
+    def _values_path(self) -> str:
+        return os.path.join(self.path, "values.npy")
+
+    def _write_metadata(self, metadata: Dict[str, Any]) -> None:
+        with open(os.path.join(self.path, "metadata.json"), "w") as fp:
+            json.dump(metadata, fp, indent=2)
+
+    def _write_index(self, index: pd.Index) -> Dict[str, Any]:
+        """
+        Save each index level as its own .npy file.
+
+        Args:
+            index (pd.Index): The index to save.
+
+        Returns:
+            Dict[str, Any]: Description of the index for the metadata header.
+        """
+        levels = (
+            [index.get_level_values(i) for i in range(index.nlevels)]
+            if isinstance(index, pd.MultiIndex)
+            else [index]
+        )
+        for i, level in enumerate(levels):
+            values = level.to_numpy()
+            if values.dtype == object:
+                values = values.astype(str)
+            np.save(os.path.join(self.path, f"index_{i}.npy"), values)
+
+        freq = getattr(index, "freqstr", None)
+        return {"names": list(index.names), "freq": freq}
+
+
+def _npy_header(dtype: np.dtype, shape: tuple) -> bytes:
+    """
+    Build a fixed-size .npy (version 1.0) header for a column-major array.
+
+    The header has a fixed size so that it can be written after the data has been
+    streamed and the final shape is known.
+
+    Args:
+        dtype (np.dtype): Dtype of the stored array.
+        shape (tuple): Shape of the stored array.
+
+    Returns:
+        bytes: The header, exactly _HEADER_SIZE bytes long.
+    """
+    header = repr(
+        {
+            "descr": np.lib.format.dtype_to_descr(dtype),
+            "fortran_order": True,
+            "shape": tuple(int(n) for n in shape),
+        }
+    ).encode("latin1")
+    padding = _HEADER_SIZE - len(_MAGIC) - 2 - len(header) - 1
+    if padding < 0:
+        raise ValueError("Array shape is too large for the .npy header.")
+    return (
+        _MAGIC
+        + struct.pack("<H", len(header) + padding + 1)
+        + header
+        + b" " * padding
+        + b"\n"
+    )
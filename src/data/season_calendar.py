@@ -0,0 +1,281 @@
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import ClassVar, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SEASONS: Dict[str, List[int]] = {
+    "Winter": [12, 1, 2],
+    "Spring": [3, 4, 5],
+    "Summer": [6, 7, 8],
+    "Fall": [9, 10, 11],
+}
+
+
+@dataclass
+class SeasonCalendar:
+    """
+    Season membership of a date index, computed once and shared by every component
+    that works on data with that index.
+
+    The rows of the index are split into runs, the contiguous occurrences of each
+    season. A season occurrence is assigned to the year of its last month, so a
+    December to February winter belongs to the year in which it ends. Segment
+    extraction is then slicing by run offsets, and aggregation is np.add.reduceat
+    over the run starts. Any resolution works, from sub-daily to monthly.
+
+    Attributes:
+        seasons (Dict[str, List[int]]): Season names mapped to their months, in order.
+        codes (np.ndarray): int8 season position of every row, -1 outside every season.
+        years (np.ndarray): Season year of every row.
+        starts (np.ndarray): First row of every run.
+        stops (np.ndarray): One past the last row of every run.
+        run_seasons (np.ndarray): int8 season position of every run.
+        run_years (np.ndarray): Season year of every run.
+        complete (np.ndarray): Whether the run covers its season from the first instant
+                               of its first month to the end of its last month.
+    """
+
+    seasons: Dict[str, List[int]]
+    codes: np.ndarray
+    years: np.ndarray
+    starts: np.ndarray
+    stops: np.ndarray
+    run_seasons: np.ndarray
+    run_years: np.ndarray
+    complete: np.ndarray
+
+    # Recently built calendars, looked up by index identity. The indices are held
+    # weakly so that the memo does not keep large indices alive, and the lock guards
+    # lookups from worker threads, e.g. those of ScenarioServer.
+    _recent: ClassVar[List[Tuple[weakref.ref, tuple, "SeasonCalendar"]]] = []
+    _recent_lock: ClassVar[threading.Lock] = threading.Lock()
+    _max_recent: ClassVar[int] = 8
+
+    @classmethod
+    def from_index(
+        cls,
+        index: pd.DatetimeIndex,
+        seasons: Optional[Dict[str, List[int]]] = None,
+    ) -> "SeasonCalendar":
+        """
+        Build the calendar of a date index, or return the one already built for the
+        same index object and seasons.
+
+        Args:
+            index (pd.DatetimeIndex): Date index of the data, sorted.
+            seasons (Optional[Dict[str, List[int]]]): Season names mapped to their
+                months, in order. Defaults to DEFAULT_SEASONS.
+
+        Returns:
+            SeasonCalendar: The calendar of the index.
+
+        Raises:
+            ValueError: If the index is not a DatetimeIndex or a month belongs to
+                        several seasons.
+        """
+        if not isinstance(index, pd.DatetimeIndex):
+            raise ValueError("A season calendar needs a DatetimeIndex.")
+        seasons = DEFAULT_SEASONS if seasons is None else seasons
+        key = tuple((name, tuple(months)) for name, months in seasons.items())
+        with cls._recent_lock:
+            calendar = cls._lookup(index, key)
+        if calendar is not None:
+            return calendar
+
+        calendar = cls._build(index, seasons)
+        with cls._recent_lock:
+            # Another thread may have built the same calendar meanwhile
+            existing = cls._lookup(index, key)
+            if existing is not None:
+                return existing
+            alive = [entry for entry in cls._recent if entry[0]() is not None]
+            alive.insert(0, (weakref.ref(index), key, calendar))
+            cls._recent[:] = alive[: cls._max_recent]
+        return calendar
+
+    @classmethod
+    def _lookup(cls, index: pd.DatetimeIndex, key: tuple) -> Optional["SeasonCalendar"]:
+        """
+        Find a recently built calendar of the same index object and seasons. The
+        caller holds _recent_lock.
+
+        Args:
+            index (pd.DatetimeIndex): Date index of the data.
+            key (tuple): The seasons as nested tuples.
+
+        Returns:
+            Optional[SeasonCalendar]: The calendar, or None if none was built.
+        """
+        for recent_index, recent_key, calendar in cls._recent:
+            if recent_index() is index and recent_key == key:
+                return calendar
+        return None
+
+    @classmethod
+    def _build(
+        cls, index: pd.DatetimeIndex, seasons: Dict[str, List[int]]
+    ) -> "SeasonCalendar":
+        """
+        Compute the calendar of a date index.
+
+        Args:
+            index (pd.DatetimeIndex): Date index of the data.
+            seasons (Dict[str, List[int]]): Season names mapped to their months.
+
+        Returns:
+            SeasonCalendar: The calendar of the index.
+
+        Raises:
+            ValueError: If a month belongs to several seasons.
+        """
+        month_to_season = np.full(13, -1, dtype=np.int8)
+        month_to_year_offset = np.zeros(13, dtype=np.int64)
+        first_months = np.empty(len(seasons), dtype=np.int64)
+        last_months = np.empty(len(seasons), dtype=np.int64)
+        for i, months in enumerate(seasons.values()):
+            if (month_to_season[months] >= 0).any():
+                raise ValueError("Every month can belong to one season only.")
+            month_to_season[months] = i
+            first_months[i], last_months[i] = months[0], months[-1]
+            # Months before a wrap to January belong to the next season year
+            for k in range(1, len(months)):
+                if months[k] < months[k - 1]:
+                    month_to_year_offset[months[:k]] = 1
+
+        month = index.month.to_numpy()
+        codes = month_to_season[month]
+        years = index.year.to_numpy() + month_to_year_offset[month]
+
+        boundaries = (codes[1:] != codes[:-1]) | (years[1:] != years[:-1])
+        starts = np.flatnonzero(np.r_[True, boundaries])
+        stops = np.r_[starts[1:], len(index)]
+        run_seasons = codes[starts]
+
+        # A run is complete if it starts at the first instant of its first month and
+        # the row after its last one, one sampling step later, opens the next month.
+        step = pd.Timedelta(days=1)
+        if len(index) > 1:
+            step = pd.Timedelta(np.diff(index.asi8).min(), unit=index.unit)
+        first, after_last = index[starts], index[stops - 1] + step
+        complete = (
+            (run_seasons >= 0)
+            & (first.month == first_months[run_seasons])
+            & (first.day == 1)
+            & (first == first.normalize())
+            & (after_last.month == last_months[run_seasons] % 12 + 1)
+            & (after_last.day == 1)
+            & (after_last == after_last.normalize())
+        )
+
+        return cls(
+            seasons=dict(seasons),
+            codes=codes,
+            years=years,
+            starts=starts,
+            stops=stops,
+            run_seasons=run_seasons,
+            run_years=years[starts],
+            complete=np.asarray(complete),
+        )
+
+    @property
+    def season_names(self) -> List[str]:
+        """
+        Names of the seasons, in order.
+
+        Returns:
+            List[str]: The season names.
+        """
+        return list(self.seasons)
+
+    def season_position(self, season: str) -> int:
+        """
+        Position of a season in the calendar.
+
+        Args:
+            season (str): Season name.
+
+        Returns:
+            int: The position, which is also the season's code.
+
+        Raises:
+            ValueError: If the season is unknown.
+        """
+        try:
+            return self.season_names.index(season)
+        except ValueError:
+            raise ValueError(f"Unknown season '{season}'.")
+
+    def occurrences(self, season: str, complete_only: bool = True) -> np.ndarray:
+        """
+        Run numbers of the occurrences of a season.
+
+        Args:
+            season (str): Season name.
+            complete_only (bool): Keep only complete occurrences. Default is True.
+
+        Returns:
+            np.ndarray: Positions in starts, stops and run_years.
+        """
+        selected = self.run_seasons == self.season_position(season)
+        if complete_only:
+            selected &= self.complete
+        return np.flatnonzero(selected)
+
+    def segment_rows(self, season: str) -> np.ndarray:
+        """
+        Row offsets of every complete occurrence of a season.
+
+        Occurrences differ by leap days, so all are cut to the shortest one.
+
+        Args:
+            season (str): Season name.
+
+        Returns:
+            np.ndarray: Array of shape (n_occurrences, length) of row offsets.
+        """
+        runs = self.occurrences(season)
+        starts = self.starts[runs]
+        lengths = self.stops[runs] - starts
+        length = lengths.min() if len(lengths) else 0
+        return starts[:, None] + np.arange(length)
+
+    def season_rows(self, season: str) -> np.ndarray:
+        """
+        All rows belonging to a season, complete occurrence or not.
+
+        Args:
+            season (str): Season name.
+
+        Returns:
+            np.ndarray: Row offsets in increasing order.
+        """
+        return np.flatnonzero(self.codes == self.season_position(season))
+
+    def run_sums(self, values: np.ndarray) -> np.ndarray:
+        """
+        Sum the rows of every run in one pass.
+
+        Args:
+            values (np.ndarray): Array with one row per index row.
+
+        Returns:
+            np.ndarray: Array with one row per run.
+        """
+        return np.add.reduceat(values, self.starts, axis=0)
+
+    def season_totals(self, values: np.ndarray) -> np.ndarray:
+        """
+        Sum the rows of every season over all its occurrences.
+
+        Args:
+            values (np.ndarray): Array of shape (n_rows, n_columns).
+
+        Returns:
+            np.ndarray: Array of shape (n_columns, n_seasons).
+        """
+        membership = self.run_seasons[None, :] == np.arange(len(self.seasons))[:, None]
+        return (membership @ self.run_sums(values)).T
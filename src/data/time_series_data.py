@@ -1,6 +1,11 @@
+import importlib.util
+import os
+import numpy as np
 import pandas as pd
-from typing import Optional
+from typing import Dict, List, Optional, Union
 from dataclasses import dataclass
+from ..utils.model_cache import ModelCache
+from .season_calendar import SeasonCalendar
 
 
 @dataclass
@@ -15,12 +20,35 @@ class TimeSeriesData:
     data: Optional[pd.DataFrame] = None
 
     @classmethod
-    def from_csv(cls, file_path: str):
+    def from_csv(
+        cls,
+        file_path: str,
+        date_format: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        dtype: Optional[Union[str, np.dtype]] = None,
+        engine: Optional[str] = None,
+        cache: Union[bool, ModelCache, None] = None,
+    ):
         """
         Create a TimeSeriesData instance by reading data from a CSV file.
 
+        The first column holds the dates. A file with a single value column is
+        returned with that column named 'precipitation'; with several value columns,
+        or columns selected explicitly, the names are kept.
+
         Args:
             file_path (str): Path to the CSV file.
+            date_format (Optional[str]): strftime format of the dates, e.g. '%Y-%m-%d'.
+                Giving it avoids inferring the format, which dominates the parse time
+                of long hourly files.
+            columns (Optional[List[str]]): Value columns to read. Defaults to all.
+            dtype (Optional[Union[str, np.dtype]]): dtype of the values, e.g. np.float32.
+            engine (Optional[str]): CSV parser. Defaults to 'pyarrow' when installed,
+                otherwise 'c'.
+            cache (Union[bool, ModelCache, None]): Keep the parsed data in a binary cache
+                keyed by the file's modification time, size and the read options, so
+                that repeated loads skip parsing. True uses a '.cache' directory next to
+                the file.
 
         Returns:
             TimeSeriesData: An instance of TimeSeriesData with loaded data.
@@ -29,17 +57,32 @@ class TimeSeriesData:
             FileNotFoundError: If the specified file does not exist.
             pd.errors.EmptyDataError: If the CSV file is empty.
             pd.errors.ParserError: If the CSV file is not properly formatted.
+            ValueError: If the file has no value column.
         """
+        if cache is True:
+            cache = ModelCache(
+                os.path.join(os.path.dirname(file_path) or ".", ".cache")
+            )
+
+        key = None
+        if isinstance(cache, ModelCache) and os.path.isfile(file_path):
+            stat = os.stat(file_path)
+            key = cache.make_key(
+                "csv",
+                2,  # Layout version of the parsed data
+                os.path.abspath(file_path),
+                stat.st_mtime_ns,
+                stat.st_size,
+                date_format,
+                columns,
+                str(np.dtype(dtype)) if dtype is not None else None,
+            )
+            cached = cache.get_ensemble(key)
+            if cached is not None:
+                return cls(cached)
+
         try:
-            data = pd.read_csv(file_path, parse_dates=[0], index_col=0)
-            if len(data.columns) < 1:
-                raise ValueError(
-                    "CSV file must have at least two columns: date and precipitation."
-                )
-            data.columns = [
-                "precipitation"
-            ]  # Rename the second column to 'precipitation'
-            return cls(data)
+            data = cls._read_csv(file_path, date_format, columns, dtype, engine)
         except FileNotFoundError:
             raise FileNotFoundError(f"The file at {file_path} was not found.")
         except pd.errors.EmptyDataError:
@@ -49,6 +92,75 @@ class TimeSeriesData:
                 f"Error parsing the CSV file at {file_path}. Please check the file format."
             )
 
+        if len(data.columns) < 1:
+            raise ValueError(
+                "CSV file must have at least two columns: date and precipitation."
+            )
+        if columns is None and len(data.columns) == 1:
+            data.columns = ["precipitation"]
+
+        if key is not None:
+            cache.put_ensemble(key, data)
+        return cls(data)
+
+    @staticmethod
+    def _read_csv(
+        file_path: str,
+        date_format: Optional[str],
+        columns: Optional[List[str]],
+        dtype: Optional[Union[str, np.dtype]],
+        engine: Optional[str],
+    ) -> pd.DataFrame:
+        """
+        Parse a station CSV file with a date column followed by value columns.
+
+        Args:
+            file_path (str): Path to the CSV file.
+            date_format (Optional[str]): strftime format of the dates.
+            columns (Optional[List[str]]): Value columns to read.
+            dtype (Optional[Union[str, np.dtype]]): dtype of the values.
+            engine (Optional[str]): CSV parser.
+
+        Returns:
+            pd.DataFrame: The values indexed by date.
+        """
+        if engine is None:
+            engine = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+
+        header = pd.read_csv(file_path, nrows=0).columns
+        value_columns = list(header[1:]) if columns is None else list(columns)
+
+        options = {}
+        dtypes = (
+            {column: dtype for column in value_columns} if dtype is not None else {}
+        )
+        parse_dates = [0]
+        if date_format is not None:
+            if engine == "pyarrow":
+                # pyarrow would infer ISO-like dates itself, so the dates are read as
+                # text and parsed with date_format below, as with the other engines
+                dtypes[header[0]] = str
+                parse_dates = False
+            else:
+                options["date_format"] = date_format
+        if dtypes:
+            options["dtype"] = dtypes
+        data = pd.read_csv(
+            file_path,
+            usecols=[header[0], *value_columns],
+            index_col=0,
+            parse_dates=parse_dates,
+            engine=engine,
+            **options,
+        )
+
+        # Dates left unparsed by the reader are converted with date_format
+        if not isinstance(data.index, pd.DatetimeIndex):
+            data.index = pd.DatetimeIndex(
+                pd.to_datetime(data.index, format=date_format), name=data.index.name
+            )
+        return data[value_columns]
+
     def get_time_resolution(self) -> str:
         """
         Infer the time resolution of the data.
@@ -63,6 +175,29 @@ class TimeSeriesData:
             raise ValueError("Insufficient data to determine time resolution.")
         return pd.infer_freq(self.data.index) or "Unknown"
 
+    def calendar(
+        self, seasons: Optional[Dict[str, List[int]]] = None
+    ) -> SeasonCalendar:
+        """
+        The season calendar of the data's date index.
+
+        The calendar is built once per index and shared with the classifier and
+        generators working on data with the same index.
+
+        Args:
+            seasons (Optional[Dict[str, List[int]]]): Season names mapped to their
+                months, in order. Defaults to DEFAULT_SEASONS.
+
+        Returns:
+            SeasonCalendar: The calendar of the index.
+
+        Raises:
+            ValueError: If the data attribute is None.
+        """
+        if self.data is None:
+            raise ValueError("No data available.")
+        return SeasonCalendar.from_index(self.data.index, seasons)
+
     def resample_data(self, frequency: str) -> "TimeSeriesData":
         """
         Create a new TimeSeriesData instance with data resampled to a new frequency.
@@ -81,6 +216,26 @@ class TimeSeriesData:
         resampled_data = self.data.resample(frequency).mean()
         return TimeSeriesData(resampled_data)
 
+    def to_daily(self) -> "TimeSeriesData":
+        """
+        Aggregate sub-daily data to daily totals, the resolution at which trajectories
+        are generated and classified. Days with a missing step are left missing.
+
+        Returns:
+            TimeSeriesData: A new instance with daily totals, or this instance if the
+                            data is already daily or coarser.
+
+        Raises:
+            ValueError: If the data attribute is None or has less than 2 entries.
+        """
+        if self.data is None or len(self.data) < 2:
+            raise ValueError("Insufficient data to determine time resolution.")
+        step = (self.data.index[1:] - self.data.index[:-1]).min()
+        if step >= pd.Timedelta(days=1):
+            return self
+        steps_per_day = int(pd.Timedelta(days=1) // step)
+        return TimeSeriesData(self.data.resample("D").sum(min_count=steps_per_day))
+
     def filter_by_date_range(self, start_date: str, end_date: str) -> "TimeSeriesData":
         """
         Create a new TimeSeriesData instance with data filtered to a specific date range.
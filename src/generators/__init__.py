@@ -1,5 +1,6 @@
 # generators/__init__.py
 
 from .weather_generator import WeatherGenerator
+from .fragment_disaggregator import FragmentDisaggregator
 
-__all__ = ["WeatherGenerator"]
+__all__ = ["WeatherGenerator", "FragmentDisaggregator"]
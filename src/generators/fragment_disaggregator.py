@@ -0,0 +1,195 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..utils.instrumentation import stage
+
+
+@dataclass
+class FragmentDisaggregator:
+    """
+    Disaggregate daily precipitation to sub-daily steps with the method of fragments.
+
+    fit() splits a historical sub-daily record into days and keeps, for every wet day,
+    its fragments: the share of the daily total falling in each step. A synthetic
+    wet day borrows the fragments of one of the n_neighbors historical wet days of the
+    same calendar month whose totals are closest to its own, so the sub-daily pattern
+    matches the intensity and season of the day. Daily totals are preserved exactly.
+
+    Generation and classification stay at daily resolution. Sub-daily output is only
+    produced by disaggregate_iter, in blocks of trajectories, so the full sub-daily
+    ensemble is never held in memory.
+
+    Attributes:
+        n_neighbors (int): Number of historical days of similar total to draw from.
+            Default is 10.
+        steps_per_day (Optional[int]): Number of sub-daily steps, set by fit().
+    """
+
+    n_neighbors: int = 10
+    steps_per_day: Optional[int] = field(init=False, default=None)
+    _step: Optional[pd.Timedelta] = field(init=False, default=None, repr=False)
+    _library: Dict[int, Tuple[np.ndarray, np.ndarray]] = field(
+        init=False, default_factory=dict, repr=False
+    )
+
+    def fit(self, record: pd.Series) -> None:
+        """
+        Collect the fragments of the complete wet days of a sub-daily record.
+
+        Args:
+            record (pd.Series): Historical sub-daily precipitation with a regular
+                DatetimeIndex whose step divides a day.
+
+        Raises:
+            ValueError: If the record is not sub-daily or contains no complete wet day.
+        """
+        index = record.index
+        if not isinstance(index, pd.DatetimeIndex) or len(index) < 2:
+            raise ValueError("The record needs a DatetimeIndex with at least 2 steps.")
+        step = (index[1:] - index[:-1]).min()
+        day = pd.Timedelta(days=1)
+        if step >= day or day % step:
+            raise ValueError("The record must be sub-daily with a step dividing a day.")
+        self._step, self.steps_per_day = step, int(day // step)
+
+        # One row per calendar day and one column per step of the day
+        days = index.normalize()
+        day_codes, unique_days = pd.factorize(days)
+        slots = np.asarray((index - days) // step, dtype=np.intp)
+        table = np.full((len(unique_days), self.steps_per_day), np.nan)
+        table[day_codes, slots] = record.to_numpy(dtype=float)
+
+        totals = table.sum(axis=1)  # NaN for days with a missing step
+        wet = totals > 0
+        if not wet.any():
+            raise ValueError("The record contains no complete wet day.")
+        totals, fragments = totals[wet], table[wet] / totals[wet, None]
+        months = pd.DatetimeIndex(unique_days[wet]).month.to_numpy()
+
+        # Wet days of every month sorted by total; months with fewer than n_neighbors
+        # wet days draw from all months
+        order = np.argsort(totals, kind="stable")
+        self._library = {0: (totals[order], fragments[order])}
+        for month in range(1, 13):
+            chosen = order[months[order] == month]
+            if len(chosen) >= self.n_neighbors:
+                self._library[month] = (totals[chosen], fragments[chosen])
+
+    def disaggregate(
+        self, daily: Union[pd.Series, pd.DataFrame], seed: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Disaggregate daily precipitation in one piece.
+
+        Args:
+            daily (Union[pd.Series, pd.DataFrame]): Daily precipitation, one column per
+                trajectory, with a daily DatetimeIndex.
+            seed (Optional[int]): Seed for the choice of fragments.
+
+        Returns:
+            pd.DataFrame: Sub-daily precipitation with the same columns.
+
+        Raises:
+            ValueError: If fit() has not been called or the data is not daily.
+        """
+        if isinstance(daily, pd.Series):
+            daily = daily.to_frame()
+        return pd.concat(
+            self.disaggregate_iter(daily, max(daily.shape[1], 1), seed), axis=1
+        )
+
+    def disaggregate_iter(
+        self,
+        daily: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        chunk_size: int = 100,
+        seed: Optional[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lazily disaggregate daily trajectories in blocks of at most chunk_size columns.
+
+        Args:
+            daily (Union[pd.DataFrame, Iterable[pd.DataFrame]]): Daily trajectories, or
+                a stream of blocks sharing the same daily DatetimeIndex (e.g. from
+                ARMADataGenerator.generate_iter or a memory-mapped EnsembleStore).
+            chunk_size (int): Number of columns per sub-daily block. Default is 100.
+            seed (Optional[int]): Seed for the choice of fragments. Every column draws
+                from its own child of np.random.SeedSequence(seed), so the result does
+                not depend on the blocks of the input or the output.
+
+        Yields:
+            pd.DataFrame: Sub-daily blocks with the columns of the input, in order.
+
+        Raises:
+            ValueError: If fit() has not been called, chunk_size is not positive or
+                the data is not daily.
+        """
+        if self.steps_per_day is None:
+            raise ValueError("No fragments available. Call fit() method first.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+
+        root = np.random.SeedSequence(seed)
+        chunks = [daily] if isinstance(daily, pd.DataFrame) else daily
+        for chunk in chunks:
+            index = chunk.index
+            if (
+                not isinstance(index, pd.DatetimeIndex)
+                or ((index[1:] - index[:-1]) != pd.Timedelta(days=1)).any()
+            ):
+                raise ValueError("The data to disaggregate must be daily.")
+            months = index.month.to_numpy()
+            sub_daily_index = pd.date_range(
+                index[0], periods=len(index) * self.steps_per_day, freq=self._step
+            )
+
+            for start in range(0, chunk.shape[1], chunk_size):
+                block = chunk.iloc[:, start : start + chunk_size]
+                with stage(
+                    "fragments.disaggregate", items=block.size * self.steps_per_day
+                ):
+                    values = self._disaggregate_block(
+                        block.to_numpy(dtype=float), months, root.spawn(block.shape[1])
+                    )
+                yield pd.DataFrame(values, index=sub_daily_index, columns=block.columns)
+
+    def _disaggregate_block(
+        self,
+        values: np.ndarray,
+        months: np.ndarray,
+        seed_sequences: Iterable[np.random.SeedSequence],
+    ) -> np.ndarray:
+        """
+        Disaggregate a block of daily trajectories, month by month for all days at once.
+
+        Args:
+            values (np.ndarray): Daily values of shape (n_days, n_columns).
+            months (np.ndarray): Calendar month of every day.
+            seed_sequences (Iterable[np.random.SeedSequence]): One seed per column.
+
+        Returns:
+            np.ndarray: Sub-daily values of shape (n_days * steps_per_day, n_columns).
+        """
+        n_days, n_columns = values.shape
+        draws = np.empty((n_columns, n_days))
+        for row, child in zip(draws, seed_sequences):
+            np.random.default_rng(child).random(out=row)
+
+        # Filled as (day, step, column) so that the result is a reshape away
+        sub_daily = np.zeros((n_days, self.steps_per_day, n_columns))
+        for month in np.unique(months):
+            totals, fragments = self._library.get(month, self._library[0])
+            rows = np.flatnonzero(months == month)
+            days, columns = np.nonzero(values[rows] > 0)
+            days = rows[days]
+            wet = values[days, columns]
+
+            # A random rank among the k historical days closest in total
+            k = min(self.n_neighbors, len(totals))
+            first = np.clip(np.searchsorted(totals, wet) - k // 2, 0, len(totals) - k)
+            chosen = first + (draws[columns, days] * k).astype(np.intp)
+            sub_daily[days, :, columns] = wet[:, None] * fragments[chosen]
+
+        return sub_daily.reshape(n_days * self.steps_per_day, n_columns)
@@ -1,26 +1,108 @@
+import logging
 from dataclasses import dataclass, field
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Dict, Union
+from typing import List, Tuple, Dict, Union, Optional, Iterator
+from ..data.ensemble_store import EnsembleStore
+from ..data.season_calendar import DEFAULT_SEASONS, SeasonCalendar
+from ..utils.instrumentation import stage
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
 class WeatherGenerator:
     synthetic_data: pd.DataFrame
     classified_data: pd.DataFrame
-    seasons: Dict[str, List[int]] = field(
-        default_factory=lambda: {
-            "Winter": [12, 1, 2],
-            "Spring": [3, 4, 5],
-            "Summer": [6, 7, 8],
-            "Fall": [9, 10, 11],
-        }
+    seasons: Dict[str, List[int]] = field(default_factory=lambda: dict(DEFAULT_SEASONS))
+    _values: np.ndarray = field(init=False, repr=False, compare=False)
+    _variables: Optional[List[str]] = field(init=False, repr=False, compare=False)
+    _segment_rows: Dict[str, np.ndarray] = field(init=False, repr=False, compare=False)
+    _candidates: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = field(
+        init=False, repr=False, compare=False
     )
 
+    def __post_init__(self) -> None:
+        """
+        Build the segment index once from the SeasonCalendar of the trajectories.
+
+        The trajectories are kept as one (steps x simulations x variables) array, with a
+        single precipitation variable unless synthetic_data has (variable, simulation)
+        columns as generated by VARDataGenerator. Segments are selected by their
+        precipitation class and copied for all variables at once. For every season,
+        _segment_rows holds an (n_segments x segment_length) array of row offsets: a
+        single segment with all rows of the season when classified_data has one row per
+        simulation, or one segment per complete season occurrence when it is classified
+        by year (a (simulation, year) MultiIndex). For each (season, condition),
+        _candidates holds the matching trajectory columns and segment numbers.
+
+        Raises:
+            ValueError: If classified_data refers to simulations missing from synthetic_data.
+        """
+        columns = self.synthetic_data.columns
+        if columns.nlevels > 1:
+            self._variables = list(columns.unique(0))
+            simulation_columns = columns.unique(1)
+            self._values = self._variable_view(simulation_columns)
+        else:
+            self._variables = None
+            simulation_columns = columns
+            self._values = np.asarray(self.synthetic_data)[:, :, None]
+        index = self.classified_data.index
+        by_year = isinstance(index, pd.MultiIndex)
+
+        self._segment_rows = {}
+        segment_numbers = {}
+        calendar = SeasonCalendar.from_index(self.synthetic_data.index, self.seasons)
+        if by_year:
+            for season in self.seasons:
+                self._segment_rows[season] = calendar.segment_rows(season)
+                segment_numbers[season] = pd.Index(
+                    calendar.run_years[calendar.occurrences(season)]
+                ).get_indexer(index.get_level_values("year"))
+            simulations = index.get_level_values("simulation")
+        else:
+            for season in self.seasons:
+                self._segment_rows[season] = calendar.season_rows(season)[None, :]
+                segment_numbers[season] = np.zeros(len(index), dtype=np.intp)
+            simulations = index
+
+        positions = simulation_columns.get_indexer(simulations)
+        if (positions < 0).any():
+            raise ValueError(
+                "classified_data contains simulations missing from synthetic_data."
+            )
+
+        self._candidates = {}
+        for season in self.seasons:
+            if season not in self.classified_data.columns:
+                continue
+            available = segment_numbers[season] >= 0
+            labels = self.classified_data[season]
+            if isinstance(labels.dtype, pd.CategoricalDtype):
+                codes = labels.cat.codes.to_numpy()
+                matches = {
+                    condition: codes == code
+                    for code, condition in enumerate(labels.cat.categories)
+                }
+            else:
+                labels = labels.to_numpy(dtype=object)
+                matches = {
+                    condition: labels == condition
+                    for condition in pd.unique(labels[pd.notna(labels)])
+                }
+            for condition, match in matches.items():
+                match &= available
+                self._candidates[(season, condition)] = (
+                    positions[match],
+                    segment_numbers[season][match],
+                )
+
     def generate_weather(
         self,
         year_structure: Union[List[Tuple[str, str]], List[List[Tuple[str, str]]]],
         num_years: int = 1,
+        seed: Optional[int] = None,
     ) -> pd.DataFrame:
         """
         Generate weather scenarios based on the provided year structure.
@@ -30,101 +112,372 @@ class WeatherGenerator:
                 Either a single year structure or a list of year structures for multiple years.
             num_years (int): Number of years to generate if a single year structure is provided.
                              Ignored if a multi-year structure is provided. Default is 1.
+            seed (Optional[int]): Seed for the segment choices. The scenario equals the
+                                  first scenario of generate_weather_batch with the same seed.
 
         Returns:
-            pd.DataFrame: Generated weather scenario with simulated days.
+            pd.DataFrame: Generated weather scenario with simulated days, with one
+                          column per variable.
 
         Raises:
             ValueError: If the input parameters are invalid.
         """
-        scenario = []
+        segments = self._expand_year_structure(year_structure, num_years)
+        with stage("weather.generate") as record:
+            scenario = self._assemble(segments, np.random.SeedSequence(seed).spawn(1))
+            if record is not None:
+                record.items = len(scenario)
 
-        # Check if we have a multi-year structure
-        if isinstance(year_structure[0], list):
-            if num_years != 1:
-                print(
-                    "Warning: num_years is ignored when a multi-year structure is provided."
-                )
-            for year in year_structure:
-                for season, condition in year:
-                    segment = self._select_matching_segment(season, condition)
-                    scenario.extend(segment)
-        else:
-            if num_years < 1:
-                raise ValueError(
-                    "num_years must be at least 1 for a single year structure."
-                )
-            for _ in range(num_years):
-                for season, condition in year_structure:
-                    segment = self._select_matching_segment(season, condition)
-                    scenario.extend(segment)
+        return pd.DataFrame(
+            scenario[:, 0],
+            index=pd.RangeIndex(1, len(scenario) + 1, name="simulated_day"),
+            columns=self._variables or ["precipitation"],
+        )
+
+    def generate_weather_batch(
+        self,
+        year_structure: Union[List[Tuple[str, str]], List[List[Tuple[str, str]]]],
+        num_years: int = 1,
+        n_scenarios: int = 1,
+        seed: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Generate many weather scenarios with the same year structure in one call.
+
+        All segment choices are drawn at once and every segment is copied into all
+        scenarios with a single fancy-indexing operation.
+
+        Args:
+            year_structure (Union[List[Tuple[str, str]], List[List[Tuple[str, str]]]]):
+                Either a single year structure or a list of year structures for multiple years.
+            num_years (int): Number of years to generate if a single year structure is provided.
+                             Ignored if a multi-year structure is provided. Default is 1.
+            n_scenarios (int): Number of scenarios to generate. Default is 1.
+            seed (Optional[int]): Seed for the segment choices. Each scenario draws from
+                                  its own child of np.random.SeedSequence(seed).
+
+        Returns:
+            pd.DataFrame: Scenarios as columns, or (variable, scenario) columns for
+                          multivariate data, with simulated days as index.
+
+        Raises:
+            ValueError: If the input parameters are invalid.
+        """
+        with stage("weather.generate_batch") as record:
+            scenarios = pd.concat(
+                self.generate_weather_batch_iter(
+                    year_structure, num_years, n_scenarios, n_scenarios, seed
+                ),
+                axis=1,
+            )
+            if record is not None:
+                record.items = scenarios.size
+            return scenarios
+
+    def generate_weather_batch_iter(
+        self,
+        year_structure: Union[List[Tuple[str, str]], List[List[Tuple[str, str]]]],
+        num_years: int = 1,
+        n_scenarios: int = 1,
+        chunk_size: int = 1000,
+        seed: Optional[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lazily generate scenarios in blocks of at most chunk_size scenarios.
+
+        Args:
+            year_structure (Union[List[Tuple[str, str]], List[List[Tuple[str, str]]]]):
+                Either a single year structure or a list of year structures for multiple years.
+            num_years (int): Number of years to generate if a single year structure is provided.
+                             Ignored if a multi-year structure is provided. Default is 1.
+            n_scenarios (int): Total number of scenarios to generate. Default is 1.
+            chunk_size (int): Number of scenarios per block. Default is 1000.
+            seed (Optional[int]): Seed for the segment choices. The concatenated blocks
+                                  equal generate_weather_batch with the same seed.
+
+        Yields:
+            pd.DataFrame: Blocks of scenarios as columns, or (variable, scenario) columns
+                          for multivariate data, with simulated days as index.
+
+        Raises:
+            ValueError: If the input parameters are invalid.
+        """
+        if n_scenarios < 1 or chunk_size < 1:
+            raise ValueError("n_scenarios and chunk_size must be at least 1.")
+
+        segments = self._expand_year_structure(year_structure, num_years)
+        children = np.random.SeedSequence(seed).spawn(n_scenarios)
+
+        for start in range(0, n_scenarios, chunk_size):
+            block = self._assemble(segments, children[start : start + chunk_size])
+            names = [f"Scenario_{i+1}" for i in range(start, start + block.shape[1])]
+            index = pd.RangeIndex(1, len(block) + 1, name="simulated_day")
+            if self._variables is None:
+                yield pd.DataFrame(block[:, :, 0], index=index, columns=names)
+                continue
+            yield pd.DataFrame(
+                block.transpose(0, 2, 1).reshape(len(block), -1),
+                index=index,
+                columns=pd.MultiIndex.from_product(
+                    [self._variables, names], names=["variable", "scenario"]
+                ),
+            )
+
+    def resolve_segments(
+        self,
+        year_structure: Union[List[Tuple[str, str]], List[List[Tuple[str, str]]]],
+        num_years: int = 1,
+    ) -> List[Tuple[str, str]]:
+        """
+        Resolve a year structure into the segments of its scenarios.
+
+        Args:
+            year_structure (Union[List[Tuple[str, str]], List[List[Tuple[str, str]]]]):
+                Either a single year structure or a list of year structures for multiple years.
+            num_years (int): Number of years to generate if a single year structure is provided.
+                             Ignored if a multi-year structure is provided. Default is 1.
+
+        Returns:
+            List[Tuple[str, str]]: The (season, condition) pairs of the scenario, in order.
 
-        # Create a range of simulated days
-        simulated_days = range(1, len(scenario) + 1)
+        Raises:
+            ValueError: If num_years is invalid or a segment has no matching simulation.
+        """
+        segments = self._expand_year_structure(year_structure, num_years)
+        for segment in set(segments):
+            self._matching_segments(*segment)
+        return segments
+
+    def assemble(
+        self,
+        segments: List[Tuple[str, str]],
+        seed_sequences: List[np.random.SeedSequence],
+    ) -> np.ndarray:
+        """
+        Assemble one scenario per seed from resolved segments.
+
+        Scenarios assembled from the children of np.random.SeedSequence(seed) equal
+        those of generate_weather_batch with the same seed.
+
+        Args:
+            segments (List[Tuple[str, str]]): The (season, condition) pairs, in order,
+                as returned by resolve_segments.
+            seed_sequences (List[np.random.SeedSequence]): One seed per scenario.
+
+        Returns:
+            np.ndarray: Array of shape (n_days, n_scenarios), with a trailing variable
+                        axis for multivariate data.
 
-        # Create the DataFrame with simulated days
-        scenario_df = pd.DataFrame(
-            {"simulated_day": simulated_days, "precipitation": scenario}
+        Raises:
+            ValueError: If a segment has no matching simulation.
+        """
+        scenarios = self._assemble(segments, seed_sequences)
+        return scenarios if self._variables is not None else scenarios[:, :, 0]
+
+    def _variable_view(self, simulation_columns: pd.Index) -> np.ndarray:
+        """
+        Arrange multivariate trajectories as a (steps x simulations x variables) array.
+
+        Columns stored variable by variable or simulation by simulation are reshaped
+        without copying, so a memory-mapped EnsembleStore stays on disk. Any other
+        column order is copied into place.
+
+        Args:
+            simulation_columns (pd.Index): The simulations, in order.
+
+        Returns:
+            np.ndarray: The trajectories, a view of synthetic_data where possible.
+        """
+        data = self.synthetic_data
+        n_steps, k, n = len(data), len(self._variables), len(simulation_columns)
+        values = np.asarray(data)  # No copy for a single-dtype frame
+        variable_major = pd.MultiIndex.from_product(
+            [self._variables, simulation_columns]
         )
+        if data.columns.equals(variable_major):
+            return values.reshape(n_steps, k, n).transpose(0, 2, 1)
+        simulation_major = pd.MultiIndex.from_product(
+            [simulation_columns, self._variables]
+        ).swaplevel()
+        if data.columns.equals(simulation_major):
+            return values.reshape(n_steps, n, k)
 
-        # Set 'simulated_day' as the index
-        scenario_df.set_index("simulated_day", inplace=True)
+        logger.debug(
+            "Copying trajectories with unordered (variable, simulation) columns"
+        )
+        return (
+            data.reindex(columns=variable_major)
+            .to_numpy()
+            .reshape(n_steps, k, n)
+            .transpose(0, 2, 1)
+        )
 
-        return scenario_df
+    def _assemble(
+        self,
+        segments: List[Tuple[str, str]],
+        seed_sequences: List[np.random.SeedSequence],
+    ) -> np.ndarray:
+        """
+        Assemble one scenario per seed into a preallocated
+        (n_days x n_scenarios x n_variables) array.
+
+        Args:
+            segments (List[Tuple[str, str]]): The (season, condition) pairs, in order.
+            seed_sequences (List[np.random.SeedSequence]): One seed per scenario.
+
+        Returns:
+            np.ndarray: The assembled scenarios.
 
-    def _select_matching_segment(self, season: str, condition: str) -> List[float]:
+        Raises:
+            ValueError: If a segment has no matching simulation.
         """
-        Select a matching segment from synthetic_data based on the season and condition.
+        candidates = [self._matching_segments(*segment) for segment in segments]
+
+        # One uniform draw per scenario and segment, mapped to a candidate segment
+        draws = np.empty((len(seed_sequences), len(segments)))
+        for row, child in zip(draws, seed_sequences):
+            np.random.default_rng(child).random(out=row)
+
+        lengths = [self._segment_rows[season].shape[1] for season, _ in segments]
+        scenarios = np.empty(
+            (sum(lengths), len(seed_sequences), self._values.shape[2]),
+            self._values.dtype,
+        )
+
+        offset = 0
+        for (season, _), (columns, numbers), u, length in zip(
+            segments, candidates, draws.T, lengths
+        ):
+            chosen = (u * len(columns)).astype(np.intp)
+            segment_rows = self._segment_rows[season]
+            if len(segment_rows) == 1:
+                rows = np.ix_(segment_rows[0], columns[chosen])
+            else:
+                rows = (segment_rows[numbers[chosen]].T, columns[chosen])
+            scenarios[offset : offset + length] = self._values[rows]
+            offset += length
+
+        return scenarios
+
+    def _expand_year_structure(
+        self,
+        year_structure: Union[List[Tuple[str, str]], List[List[Tuple[str, str]]]],
+        num_years: int,
+    ) -> List[Tuple[str, str]]:
+        """
+        Flatten a single or multi-year structure into the ordered list of segments.
+
+        Args:
+            year_structure (Union[List[Tuple[str, str]], List[List[Tuple[str, str]]]]):
+                Either a single year structure or a list of year structures for multiple years.
+            num_years (int): Number of years to generate if a single year structure is provided.
+
+        Returns:
+            List[Tuple[str, str]]: The (season, condition) pairs of the scenario, in order.
+
+        Raises:
+            ValueError: If num_years is less than 1 for a single year structure.
+        """
+        # Check if we have a multi-year structure
+        if isinstance(year_structure[0], list):
+            if num_years != 1:
+                logger.warning(
+                    "num_years is ignored when a multi-year structure is provided."
+                )
+            return [segment for year in year_structure for segment in year]
+
+        if num_years < 1:
+            raise ValueError(
+                "num_years must be at least 1 for a single year structure."
+            )
+        return list(year_structure) * num_years
+
+    def _matching_segments(
+        self, season: str, condition: str
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Look up the segments classified as condition for the season.
 
         Args:
             season (str): The season for which to select data.
             condition (str): The precipitation condition (e.g., 'wet', 'dry').
 
         Returns:
-            List[float]: A list of precipitation values for the selected segment.
-        """
-        # Filter classified data for the given season and condition
-        matching_simulations = self.classified_data[
-            (self.classified_data[season] == condition)
-        ].index
+            Tuple[np.ndarray, np.ndarray]: Positions of the matching columns in
+                synthetic_data and the matching segment numbers in _segment_rows.
 
-        if len(matching_simulations) == 0:
+        Raises:
+            ValueError: If no simulation matches.
+        """
+        matching = self._candidates.get((season, condition))
+        if matching is None or len(matching[0]) == 0:
             raise ValueError(
                 f"No matching simulations found for {season} - {condition}"
             )
+        return matching
 
-        # Randomly select one of the matching simulations
-        selected_simulation = np.random.choice(matching_simulations)
+    def _select_matching_segment(
+        self, season: str, condition: str, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """
+        Select a matching segment from synthetic_data based on the season and condition.
+
+        Args:
+            season (str): The season for which to select data.
+            condition (str): The precipitation condition (e.g., 'wet', 'dry').
+            rng (Optional[np.random.Generator]): Source of the random choice.
+                Defaults to a freshly seeded generator.
 
-        # Get the corresponding synthetic data
-        simulation_data = self.synthetic_data[selected_simulation]
+        Returns:
+            np.ndarray: The precipitation values of the selected segment, or an
+                        (n_days x n_variables) array for multivariate data.
+        """
+        columns, numbers = self._matching_segments(season, condition)
+        rng = rng if rng is not None else np.random.default_rng()
 
-        # Extract the seasonal segment
-        season_months = self.seasons[season]
-        seasonal_mask = simulation_data.index.month.isin(season_months)
-        seasonal_segment = simulation_data[seasonal_mask].tolist()
+        # Randomly select one of the matching segments
+        chosen = rng.integers(len(columns))
 
-        return seasonal_segment
+        segment = self._values[
+            self._segment_rows[season][numbers[chosen]], columns[chosen]
+        ]
+        return segment if self._variables is not None else segment[:, 0]
 
-    def save_scenario(self, scenario: pd.DataFrame, file_path: str) -> None:
+    def save_scenario(
+        self, scenario: pd.DataFrame, file_path: str, file_format: str = "csv"
+    ) -> None:
         """
-        Save the generated scenario to a CSV file.
+        Save the generated scenario to a CSV file or a binary ensemble store.
 
         Args:
             scenario (pd.DataFrame): The generated weather scenario.
-            file_path (str): The path where the CSV file will be saved.
+            file_path (str): The path of the CSV file, or the directory of the store.
+            file_format (str): "csv" or "npy" for an EnsembleStore. Default is "csv".
+
+        Raises:
+            ValueError: If the file format is unknown.
         """
-        scenario.to_csv(file_path)
+        if file_format == "npy":
+            EnsembleStore(file_path).write(scenario)
+        elif file_format == "csv":
+            scenario.to_csv(file_path)
+        else:
+            raise ValueError(
+                f"Unknown file format '{file_format}'. Use 'csv' or 'npy'."
+            )
 
     @staticmethod
-    def load_scenario(file_path: str) -> pd.DataFrame:
+    def load_scenario(file_path: str, mmap: bool = True) -> pd.DataFrame:
         """
-        Load a previously generated scenario from a CSV file.
+        Load a previously generated scenario from a CSV file or a binary ensemble store.
 
         Args:
-            file_path (str): The path to the CSV file containing the scenario.
+            file_path (str): The path to the CSV file or the directory of the store.
+            mmap (bool): Memory-map a binary store instead of reading it. Default is True.
 
         Returns:
             pd.DataFrame: The loaded weather scenario.
         """
+        if EnsembleStore.exists(file_path):
+            return EnsembleStore(file_path).read(mmap=mmap)
         return pd.read_csv(file_path, index_col="simulated_day")
@@ -2,5 +2,14 @@
 
 from .arma_data_generator import ARMADataGenerator
 from .markov_chain import MarkovChain
+from .conditional_ensemble import ConditionalEnsemble
+from .bootstrap_data_generator import BootstrapDataGenerator
+from .var_data_generator import VARDataGenerator
 
-__all__ = ["ARMADataGenerator", "MarkovChain"]
+__all__ = [
+    "ARMADataGenerator",
+    "MarkovChain",
+    "ConditionalEnsemble",
+    "BootstrapDataGenerator",
+    "VARDataGenerator",
+]
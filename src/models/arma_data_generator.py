@@ -1,20 +1,78 @@
 from dataclasses import dataclass, field
-from typing import Tuple, Optional
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Tuple,
+    Optional,
+    Iterator,
+    Iterable,
+    Union,
+    List,
+    Dict,
+)
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import os
+import tempfile
+import warnings
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.arima.model import ARIMA
-from sklearn.preprocessing import StandardScaler
-import matplotlib.pyplot as plt
-from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
+from ..data.ensemble_store import EnsembleStore
+from ..utils.instrumentation import stage
+from ..utils.model_cache import ModelCache
+from ..data.season_calendar import SeasonCalendar
+from ..utils.plotting import load_pyplot
+from ..utils.precipitation_classifier import PrecipitationClassifier
+from .conditional_ensemble import ConditionalEnsemble
+
+if TYPE_CHECKING:
+    from sklearn.preprocessing import StandardScaler
+    from statsmodels.tsa.arima.model import ARIMAResults
+
+logger = logging.getLogger(__name__)
+
+# statsmodels, sklearn and scipy.signal take seconds to import, so they are imported
+# on first use. Worker processes that only simulate never load statsmodels.
+
+# Largest number of CSV parts read at the same time when stitching a stream of
+# blocks into one file, well below the usual open file limits
+_MAX_OPEN_PARTS = 64
+
+
+def _arima(*args, **kwargs):
+    """
+    Build a statsmodels ARIMA model, importing statsmodels on first use.
+
+    Returns:
+        ARIMA: The unfitted model.
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+
+    return ARIMA(*args, **kwargs)
+
+
+def _standard_scaler() -> "StandardScaler":
+    """
+    Build the default scaler, importing sklearn on first use.
+
+    Returns:
+        StandardScaler: A new scaler.
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    return StandardScaler()
 
 
 @dataclass
 class ARMADataGenerator:
     order: Tuple[int, int]  # (p, q) for ARMA
     steps: int
-    model: ARIMA = field(init=False, default=None)
-    scaler: StandardScaler = field(init=False, default_factory=StandardScaler)
+    model: "ARIMAResults" = field(init=False, default=None)
+    scaler: "StandardScaler" = field(init=False, default_factory=_standard_scaler)
     original_data: Optional[pd.Series] = field(init=False, default=None)
+    cache: Optional[ModelCache] = field(default=None, repr=False)
+    _fit_key: Optional[str] = field(init=False, default=None, repr=False)
 
     def standardize_data(self, data: pd.Series) -> pd.Series:
         """
@@ -50,44 +108,740 @@ class ARMADataGenerator:
         """
         Fit the ARMA model to the given time series data.
 
+        With a cache, the fitted parameters are looked up by a hash of the series,
+        the order, the scaler and the library versions. On a hit the scaler and the
+        model are restored from the cached parameters without fitting either.
+
         Args:
             time_series (pd.Series): The input time series data to fit the model to.
         """
-        self.original_data = time_series  # Store original data for plotting
-        standardized_data = self.standardize_data(time_series)
-        p, q = self.order
-        self.model = ARIMA(standardized_data, order=(p, 0, q)).fit()
+        with stage("arma.fit", items=len(time_series), order=str(self.order)) as record:
+            self.original_data = time_series  # Store original data for plotting
+            p, q = self.order
+
+            cached = None
+            if self.cache is not None:
+                self._fit_key = self._make_fit_key(time_series)
+                cached = self.cache.get_params(self._fit_key)
+            if cached is not None:
+                self._restore_scaler(
+                    cached["scaler_mean"], cached["scaler_scale"], len(time_series)
+                )
+                standardized_data = pd.Series(
+                    self.scaler.transform(time_series.values.reshape(-1, 1)).flatten(),
+                    index=time_series.index,
+                )
+                model = _arima(standardized_data, order=(p, 0, q))
+                self.model = model.filter(np.asarray(cached["params"]))
+                if record is not None:
+                    record.labels["cache"] = "hit"
+                return
+
+            standardized_data = self.standardize_data(time_series)
+            self.model = _arima(standardized_data, order=(p, 0, q)).fit()
+            if self.cache is not None:
+                self._put_fit_params()
+
+    def _restore_scaler(self, mean: float, scale: float, n_samples: int) -> None:
+        """
+        Set the fitted state of the scaler from cached parameters.
+
+        Args:
+            mean (float): The mean of the series.
+            scale (float): The standard deviation of the series.
+            n_samples (int): The length of the series.
+        """
+        self.scaler.mean_ = np.array([mean])
+        self.scaler.scale_ = np.array([scale])
+        self.scaler.var_ = self.scaler.scale_**2
+        self.scaler.n_features_in_ = 1
+        self.scaler.n_samples_seen_ = n_samples
+
+    def _make_fit_key(self, time_series: pd.Series) -> str:
+        """
+        Cache key of a fit of the current order to the given series.
+
+        Args:
+            time_series (pd.Series): The series the model is fitted to.
+
+        Returns:
+            str: The cache key.
+        """
+        return self.cache.make_key(
+            "arma-fit", time_series, list(self.order), type(self.scaler).__name__
+        )
 
-    def generate(self, n_trajectories: int) -> pd.DataFrame:
+    def _put_fit_params(self) -> None:
+        """
+        Store the parameters of the fitted model under the current fit key.
+        """
+        self.cache.put_params(
+            self._fit_key,
+            {
+                "params": self.model.params.tolist(),
+                "names": list(self.model.params.index),
+                "scaler_mean": float(self.scaler.mean_[0]),
+                "scaler_scale": float(self.scaler.scale_[0]),
+            },
+        )
+
+    def auto_order(
+        self,
+        time_series: pd.Series,
+        max_p: int = 3,
+        max_q: int = 3,
+        criterion: str = "aic",
+        prune_margin: float = 10.0,
+        n_workers: int = 1,
+    ) -> Tuple[Tuple[int, int], pd.DataFrame]:
+        """
+        Select the ARMA order from a grid of candidates and fit the chosen model.
+
+        Candidates are fitted level by level in p + q. All candidates of a level are
+        independent and run in parallel; each is warm-started from the fitted
+        parameters of its better parent, (p - 1, q) or (p, q - 1), with the new
+        coefficient set to zero, unless the default start has a higher likelihood.
+        Candidates whose criterion is more than prune_margin
+        above the best one so far are not expanded, so their larger children are only
+        fitted if another parent survives.
+
+        The generator ends up fitted with the chosen order, from the parameters found
+        during the search, without another maximum likelihood fit. With a cache, the
+        parameters are stored so that a later fit() with the chosen order is a hit.
+
+        Args:
+            time_series (pd.Series): The input time series data to fit the model to.
+            max_p (int): Largest AR order of the grid. Default is 3.
+            max_q (int): Largest MA order of the grid. Default is 3.
+            criterion (str): "aic" or "bic". Default is "aic".
+            prune_margin (float): Criterion distance to the best candidate beyond which
+                                  a candidate is not expanded. Default is 10.0.
+            n_workers (int): Number of worker processes. Default is 1.
+
+        Returns:
+            Tuple[Tuple[int, int], pd.DataFrame]: The chosen (p, q) and the ranking of
+                all grid candidates, best first, with columns p, q, aic, bic, llf,
+                converged and status ('fitted', 'pruned', 'skipped' or 'failed').
+
+        Raises:
+            ValueError: If the criterion is unknown or no candidate could be fitted.
+        """
+        if criterion not in ("aic", "bic"):
+            raise ValueError(f"Unknown criterion '{criterion}'. Use 'aic' or 'bic'.")
+
+        self.original_data = time_series
+        values = self.standardize_data(time_series).to_numpy()
+
+        results: Dict[Tuple[int, int], Dict[str, object]] = {}
+        expandable = {(0, 0)}
+        best = np.inf
+        executor = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+        try:
+            for level in range(max_p + max_q + 1):
+                candidates = []
+                for p in range(min(level, max_p) + 1):
+                    q = level - p
+                    if q > max_q:
+                        continue
+                    parents = [
+                        parent
+                        for parent in ((p - 1, q), (p, q - 1))
+                        if parent in expandable
+                    ]
+                    parents.sort(key=lambda parent: results[parent][criterion])
+                    if level == 0 or parents:
+                        candidates.append(((p, q), parents[:1]))
+                    else:
+                        results[(p, q)] = {"status": "skipped"}
+                if not candidates:
+                    break
+
+                jobs = [
+                    (
+                        values,
+                        order,
+                        (
+                            _warm_start(
+                                results[parents[0]]["params"], parents[0], order
+                            )
+                            if parents
+                            else None
+                        ),
+                    )
+                    for order, parents in candidates
+                ]
+                fitted = (
+                    executor.map(_fit_arma_candidate, *zip(*jobs))
+                    if executor is not None
+                    else (_fit_arma_candidate(*job) for job in jobs)
+                )
+                for (order, _), result in zip(candidates, fitted):
+                    results[order] = result
+                    if result["status"] == "fitted":
+                        best = min(best, result[criterion])
+
+                expandable = {
+                    order
+                    for order, _ in candidates
+                    if results[order]["status"] == "fitted"
+                    and results[order][criterion] <= best + prune_margin
+                }
+                for order, _ in candidates:
+                    if results[order]["status"] == "fitted" and order not in expandable:
+                        results[order]["status"] = "pruned"
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        ranking = pd.DataFrame(
+            [
+                {
+                    "p": p,
+                    "q": q,
+                    "aic": result.get("aic", np.nan),
+                    "bic": result.get("bic", np.nan),
+                    "llf": result.get("llf", np.nan),
+                    "converged": result.get("converged", False),
+                    "status": result["status"],
+                }
+                for (p, q), result in results.items()
+            ]
+        )
+        ranking = ranking.sort_values([criterion, "p", "q"], na_position="last")
+        ranking = ranking.reset_index(drop=True)
+        if ranking[criterion].isna().all():
+            raise ValueError("No ARMA candidate could be fitted.")
+
+        p, q = int(ranking.at[0, "p"]), int(ranking.at[0, "q"])
+        self.order = (p, q)
+        self.model = _arima(
+            pd.Series(values, index=time_series.index), order=(p, 0, q)
+        ).filter(results[self.order]["params"])
+
+        # A later fit() with the chosen order reuses these parameters
+        self._fit_key = None
+        if self.cache is not None:
+            self._fit_key = self._make_fit_key(time_series)
+            self._put_fit_params()
+        return self.order, ranking
+
+    def generate(
+        self,
+        n_trajectories: int,
+        method: str = "batch",
+        seed: Optional[int] = None,
+        n_workers: int = 1,
+    ) -> pd.DataFrame:
         """
         Generate multiple trajectories using the fitted ARMA model.
 
+        Every trajectory draws its innovations from its own child of
+        np.random.SeedSequence(seed), so the same seed gives the same ensemble
+        whatever the method's chunking or the number of workers. With a cache and a
+        seed, the ensemble is looked up by the fit key, size, seed and method, and
+        stored after generation on a miss.
+
         Args:
             n_trajectories (int): The number of trajectories to generate.
+            method (str): "batch" runs the vectorized engine (see simulate_batch),
+                          "statsmodels" simulates each trajectory with the fitted
+                          statsmodels results object. Default is "batch".
+            seed (Optional[int]): Seed for the ensemble. None draws fresh entropy.
+            n_workers (int): Number of worker processes for the batch engine. Default is 1.
 
         Returns:
             pd.DataFrame: A DataFrame containing the generated trajectories.
                           Each column represents a trajectory, and the index represents the time steps.
 
         Raises:
-            ValueError: If the model hasn't been fitted yet.
+            ValueError: If the model hasn't been fitted yet or the method is unknown.
         """
         if self.model is None:
             raise ValueError("Model has not been fitted. Call fit() method first.")
 
+        with stage(
+            "arma.generate", items=n_trajectories * self.steps, method=method
+        ) as record:
+            if self.cache is None or seed is None or self._fit_key is None:
+                return self._generate(n_trajectories, method, seed, n_workers)
+
+            key = self.cache.make_key(
+                "arma-ensemble", self._fit_key, n_trajectories, self.steps, seed, method
+            )
+            cached = self.cache.get_ensemble(key)
+            if cached is not None:
+                if record is not None:
+                    record.labels["cache"] = "hit"
+                return cached
+
+            ensemble = self._generate(n_trajectories, method, seed, n_workers)
+            self.cache.put_ensemble(
+                key, ensemble, attributes={"order": list(self.order), "seed": seed}
+            )
+            return ensemble
+
+    def _generate(
+        self,
+        n_trajectories: int,
+        method: str,
+        seed: Optional[int],
+        n_workers: int,
+    ) -> pd.DataFrame:
+        """
+        Generate trajectories without consulting the cache.
+
+        Args:
+            n_trajectories (int): The number of trajectories to generate.
+            method (str): "batch" or "statsmodels".
+            seed (Optional[int]): Seed for the ensemble.
+            n_workers (int): Number of worker processes for the batch engine.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing the generated trajectories.
+
+        Raises:
+            ValueError: If the method is unknown.
+        """
+        columns = [f"Sim_{i+1}" for i in range(n_trajectories)]
+
+        if method == "batch":
+            values = self.simulate_batch(n_trajectories, seed=seed, n_workers=n_workers)
+            return pd.DataFrame(values, index=self._simulation_index(), columns=columns)
+
+        if method != "statsmodels":
+            raise ValueError(
+                f"Unknown method '{method}'. Use 'batch' or 'statsmodels'."
+            )
+
         simulations = []
-        for _ in range(n_trajectories):
-            sim = self.model.simulate(self.steps)
+        for child in np.random.SeedSequence(seed).spawn(n_trajectories):
+            sim = self.model.simulate(self.steps, rng=np.random.default_rng(child))
             sim = self.inverse_transform(sim)
             sim = sim.clip(lower=0)  # Ensure non-negative values
             simulations.append(sim)
 
         # Create a DataFrame with simulations as columns
         df = pd.concat(simulations, axis=1)
-        df.columns = [f"Sim_{i+1}" for i in range(n_trajectories)]
+        df.columns = columns
 
         return df
 
+    def simulate_batch(
+        self, n_trajectories: int, seed: Optional[int] = None, n_workers: int = 1
+    ) -> np.ndarray:
+        """
+        Simulate all trajectories at once by running the ARMA recursion as a
+        single lfilter pass over a (steps x n_trajectories) innovation matrix.
+
+        Each trajectory starts from a burn-in period so that it is drawn from the
+        stationary distribution, like the statsmodels simulation. The scaler inverse
+        and the non-negativity clip are applied in place. With several workers the
+        trajectories are split into blocks that are simulated in a process pool and
+        written into one preallocated array.
+
+        Args:
+            n_trajectories (int): The number of trajectories to generate.
+            seed (Optional[int]): Seed for the ensemble. None draws fresh entropy.
+            n_workers (int): Number of worker processes. Default is 1.
+
+        Returns:
+            np.ndarray: Array of shape (steps, n_trajectories) in the original scale.
+
+        Raises:
+            ValueError: If the model hasn't been fitted yet.
+        """
+        if self.model is None:
+            raise ValueError("Model has not been fitted. Call fit() method first.")
+
+        if n_workers <= 1:
+            return self._simulate(np.random.SeedSequence(seed).spawn(n_trajectories))
+
+        values = np.empty((self.steps, n_trajectories), order="F")
+        chunk_size = max(1, -(-n_trajectories // (4 * n_workers)))
+        for start, block in self._iter_blocks(
+            n_trajectories, chunk_size, seed, n_workers
+        ):
+            values[:, start : start + block.shape[1]] = block
+        return values
+
+    def generate_iter(
+        self,
+        n_trajectories: int,
+        chunk_size: int = 100,
+        seed: Optional[int] = None,
+        n_workers: int = 1,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lazily generate trajectories in fixed-size blocks so that large ensembles
+        can be produced and consumed in bounded memory.
+
+        Args:
+            n_trajectories (int): The total number of trajectories to generate.
+            chunk_size (int): The number of trajectories per block. Default is 100.
+            seed (Optional[int]): Seed for the ensemble. The concatenated blocks equal
+                                  generate(n_trajectories, seed=seed).
+            n_workers (int): Number of worker processes. At most n_workers blocks are
+                             in flight at any time. Default is 1.
+
+        Yields:
+            pd.DataFrame: Blocks of at most chunk_size trajectories, with the same
+                          index as generate() and columns numbered across blocks.
+
+        Raises:
+            ValueError: If the model hasn't been fitted yet or chunk_size is not positive.
+        """
+        if self.model is None:
+            raise ValueError("Model has not been fitted. Call fit() method first.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+
+        index = self._simulation_index()
+        for start, block in self._iter_blocks(
+            n_trajectories, chunk_size, seed, n_workers
+        ):
+            yield pd.DataFrame(
+                block,
+                index=index,
+                columns=[f"Sim_{i+1}" for i in range(start, start + block.shape[1])],
+            )
+
+    def _iter_blocks(
+        self,
+        n_trajectories: int,
+        chunk_size: int,
+        seed: Optional[int],
+        n_workers: int,
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Simulate blocks of trajectories in order, optionally in a process pool.
+
+        Args:
+            n_trajectories (int): The total number of trajectories to generate.
+            chunk_size (int): The number of trajectories per block.
+            seed (Optional[int]): Seed for the ensemble.
+            n_workers (int): Number of worker processes.
+
+        Yields:
+            Tuple[int, np.ndarray]: Position of the first trajectory of the block and
+                                    the (steps, block size) array of trajectories.
+        """
+        children = np.random.SeedSequence(seed).spawn(n_trajectories)
+        starts = range(0, n_trajectories, chunk_size)
+
+        if n_workers <= 1:
+            for start in starts:
+                yield start, self._simulate(children[start : start + chunk_size])
+            return
+
+        config = self._simulation_config()
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            pending = deque()
+            for start in starts:
+                block_seeds = children[start : start + chunk_size]
+                pending.append(
+                    (start, executor.submit(_simulate_arma, config, block_seeds))
+                )
+                if len(pending) >= n_workers:
+                    block_start, future = pending.popleft()
+                    yield block_start, future.result()
+            while pending:
+                block_start, future = pending.popleft()
+                yield block_start, future.result()
+
+    def generate_conditional(
+        self,
+        season: str,
+        condition: str,
+        n_segments: int,
+        classifier: PrecipitationClassifier,
+        seed: Optional[int] = None,
+        batch_size: int = 1000,
+        max_batches: int = 100,
+        pilot_size: int = 500,
+    ) -> ConditionalEnsemble:
+        """
+        Generate trajectories whose season totals fall into a requested category,
+        without generating and discarding a large unconditioned ensemble.
+
+        The standardized innovations on the days of every complete occurrence of the
+        season are shifted by a constant tilt, which moves the season totals into the
+        category band of the classifier's frozen thresholds. The tilt is calibrated on
+        a pilot batch so that the median total lies in the middle of the band. Because
+        the tilt only changes the innovation means, the likelihood ratio of every
+        trajectory is known exactly and returned as an importance weight.
+
+        Batches are generated until at least n_segments occurrences are in the band.
+
+        Args:
+            season (str): The season to condition on.
+            condition (str): The requested precipitation category, e.g. 'very_dry'.
+            n_segments (int): Minimum number of season occurrences in the category.
+            classifier (PrecipitationClassifier): Classifier with frozen thresholds.
+            seed (Optional[int]): Seed for the pilot and all batches.
+            batch_size (int): Number of trajectories per batch. Default is 1000.
+            max_batches (int): Maximum number of batches. Default is 100.
+            pilot_size (int): Number of trajectories used to calibrate the tilt.
+                              Default is 500.
+
+        Returns:
+            ConditionalEnsemble: The accepted trajectories with their importance weights.
+
+        Raises:
+            ValueError: If the model hasn't been fitted, the thresholds are not frozen
+                        from per-year totals, the season or condition is unknown, or the simulated period
+                        contains no complete occurrence of the season.
+            RuntimeError: If n_segments are not reached within max_batches.
+        """
+        if self.model is None:
+            raise ValueError("Model has not been fitted. Call fit() method first.")
+        if classifier.thresholds is None:
+            raise ValueError(
+                "Conditional generation needs frozen thresholds. "
+                "Call classifier.freeze_thresholds() first."
+            )
+        if season not in classifier.seasons:
+            raise ValueError(f"Unknown season '{season}'.")
+        if condition not in classifier.categories:
+            raise ValueError(f"Unknown condition '{condition}'.")
+
+        index = self._simulation_index()
+        if not isinstance(index, pd.DatetimeIndex):
+            raise ValueError("Conditional generation needs a dated simulation index.")
+        calendar = SeasonCalendar.from_index(index, classifier.seasons)
+        runs = calendar.occurrences(season)
+        if not len(runs):
+            raise ValueError(f"The simulated period contains no complete {season}.")
+
+        mask = np.zeros(self.steps)
+        for start, stop in zip(calendar.starts[runs], calendar.stops[runs]):
+            mask[start:stop] = 1.0
+
+        # The tilt moves the totals of single season occurrences
+        thresholds = classifier.frozen_thresholds(by_year=True)[
+            :, list(classifier.seasons).index(season)
+        ]
+        code = classifier.categories.index(condition)
+        config = self._simulation_config()
+        root = np.random.SeedSequence(seed)
+
+        def season_totals(values: np.ndarray) -> np.ndarray:
+            return calendar.run_sums(values)[runs].T  # (n_trajectories, n_occurrences)
+
+        def simulate(
+            seed_sequences: List[np.random.SeedSequence], tilt: float
+        ) -> Tuple[np.ndarray, np.ndarray]:
+            innovations = _standard_innovations(config, seed_sequences)
+            shifted = innovations[:, config["burn_in"] :]
+            log_weights = -tilt * (shifted @ mask) - 0.5 * tilt**2 * mask.sum()
+            shifted += tilt * mask
+            return _filter_innovations(config, innovations), log_weights
+
+        pilot = root.spawn(pilot_size)
+        target = self._band_target(
+            thresholds, code, season_totals(simulate(pilot, 0.0)[0])
+        )
+        tilt = self._calibrate_tilt(
+            lambda t: np.median(season_totals(simulate(pilot, t)[0])),
+            target,
+            name=f"{season} - {condition}",
+        )
+
+        blocks, log_weights = [], []
+        proposed = accepted = 0
+        for _ in range(max_batches):
+            values, batch_log_weights = simulate(root.spawn(batch_size), tilt)
+            codes = np.searchsorted(thresholds, season_totals(values), side="left")
+            in_band = (codes == code).sum(axis=1)
+            proposed += codes.size
+            accepted += in_band.sum()
+
+            keep = in_band > 0
+            blocks.append(values[:, keep])
+            log_weights.append(batch_log_weights[keep])
+            if accepted >= n_segments:
+                break
+        else:
+            raise RuntimeError(
+                f"Only {accepted} of {n_segments} {season} - {condition} segments "
+                f"were generated in {max_batches} batches."
+            )
+
+        values = np.hstack(blocks)
+        return ConditionalEnsemble(
+            trajectories=pd.DataFrame(
+                values,
+                index=index,
+                columns=[f"Sim_{i+1}" for i in range(values.shape[1])],
+            ),
+            log_weights=np.concatenate(log_weights),
+            season=season,
+            condition=condition,
+            tilt=float(tilt),
+            n_segments=int(accepted),
+            acceptance_rate=accepted / proposed,
+        )
+
+    @staticmethod
+    def _band_target(
+        thresholds: np.ndarray, code: int, pilot_totals: np.ndarray
+    ) -> float:
+        """
+        Season total to aim for: the middle of a bounded category band, or half a
+        neighbouring band width beyond the edge of an open one.
+
+        Args:
+            thresholds (np.ndarray): Sorted thresholds of the season.
+            code (int): Position of the requested category.
+            pilot_totals (np.ndarray): Untilted season totals, used for the width of an
+                                       open band without a bounded neighbour.
+
+        Returns:
+            float: The target season total.
+        """
+        edges = np.r_[-np.inf, thresholds, np.inf]
+        lower, upper = edges[code], edges[code + 1]
+        if np.isfinite(lower) and np.isfinite(upper):
+            return float((lower + upper) / 2)
+
+        widths = np.diff(thresholds)
+        width = (
+            (widths[0] if code == 0 else widths[-1])
+            if len(widths)
+            else np.std(pilot_totals)
+        )
+        return float(upper - width / 2 if code == 0 else lower + width / 2)
+
+    @staticmethod
+    def _calibrate_tilt(
+        median_total: Callable[[float], float],
+        target: float,
+        iterations: int = 8,
+        tolerance: float = 1e-3,
+        name: str = "season",
+    ) -> float:
+        """
+        Find the tilt whose median season total hits the target with the secant method.
+
+        Without the non-negativity clip the season totals are affine in the tilt, so
+        the first secant step is already exact in that case. If the median does not
+        respond to the tilt at all, e.g. because the clip zeroes every pilot total,
+        no tilt is applied and a warning is logged.
+
+        Args:
+            median_total (Callable[[float], float]): Median pilot total for a tilt.
+            target (float): The target season total.
+            iterations (int): Maximum number of secant steps. Default is 8.
+            tolerance (float): Relative tolerance on the target. Default is 1e-3.
+            name (str): Season and band, for the warning. Default is "season".
+
+        Returns:
+            float: The calibrated tilt, 0.0 if the median does not respond to it.
+        """
+        t0, t1 = 0.0, 1.0
+        f0, f1 = median_total(t0) - target, median_total(t1) - target
+        if f1 == f0 and abs(f1) > tolerance * max(abs(target), 1.0):
+            logger.warning(
+                "The median %s total does not respond to the tilt; sampling without "
+                "tilting.",
+                name,
+            )
+            return 0.0
+        for _ in range(iterations):
+            if abs(f1) <= tolerance * max(abs(target), 1.0) or f1 == f0:
+                break
+            t0, t1 = t1, t1 - f1 * (t1 - t0) / (f1 - f0)
+            f0, f1 = f1, median_total(t1) - target
+        return t1
+
+    def _simulate(self, seed_sequences: List[np.random.SeedSequence]) -> np.ndarray:
+        """
+        Run the batched ARMA recursion in the current process.
+
+        Args:
+            seed_sequences (List[np.random.SeedSequence]): One seed per trajectory.
+
+        Returns:
+            np.ndarray: Array of shape (steps, len(seed_sequences)) in the original scale.
+        """
+        return _simulate_arma(self._simulation_config(), seed_sequences)
+
+    def _simulation_config(self) -> Dict[str, object]:
+        """
+        Collect everything the batched recursion needs in a picklable form.
+
+        Returns:
+            Dict[str, object]: Coefficients, scaler parameters and simulation lengths.
+        """
+        ar, ma, sigma2, const = self._arma_coefficients()
+        return {
+            "ar": ar,
+            "ma": ma,
+            "sigma2": sigma2,
+            "const": const,
+            "scale": float(self.scaler.scale_[0]),
+            "mean": float(self.scaler.mean_[0]),
+            "steps": self.steps,
+            "burn_in": self._burn_in(ar, ma),
+        }
+
+    def _arma_coefficients(self) -> Tuple[np.ndarray, np.ndarray, float, float]:
+        """
+        Extract the AR and MA coefficients, innovation variance and constant
+        from the fitted model.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, float, float]: (ar, ma, sigma2, const).
+        """
+        params = self.model.params
+        const = float(params["const"]) if "const" in params.index else 0.0
+        return (
+            np.asarray(self.model.arparams, dtype=float),
+            np.asarray(self.model.maparams, dtype=float),
+            float(params["sigma2"]),
+            const,
+        )
+
+    @staticmethod
+    def _burn_in(ar: np.ndarray, ma: np.ndarray, tolerance: float = 1e-8) -> int:
+        """
+        Number of warm-up steps after which the zero initial state has decayed
+        below the given tolerance.
+
+        Args:
+            ar (np.ndarray): AR coefficients of the fitted model.
+            ma (np.ndarray): MA coefficients of the fitted model.
+            tolerance (float): Remaining influence of the initial state.
+
+        Returns:
+            int: Number of burn-in steps.
+
+        Raises:
+            ValueError: If the AR polynomial is not stationary.
+        """
+        modulus = np.abs(np.roots(np.r_[1.0, -ar])).max() if len(ar) else 0.0
+        if modulus >= 1:
+            raise ValueError("The fitted AR polynomial is not stationary.")
+        if modulus == 0:
+            return len(ar) + len(ma)
+        decay = int(np.ceil(np.log(tolerance) / np.log(modulus)))
+        return int(np.clip(decay, 50, 10_000)) + len(ma)
+
+    def _simulation_index(self) -> pd.Index:
+        """
+        Build the index of simulated trajectories, starting at the first date
+        of the fitted data like the statsmodels simulation.
+
+        Returns:
+            pd.Index: A DatetimeIndex when the data frequency can be inferred,
+                      otherwise a RangeIndex.
+        """
+        index = self.original_data.index
+        if isinstance(index, pd.DatetimeIndex) and len(index) > 2:
+            freq = index.freq or pd.infer_freq(index)
+            if freq is not None:
+                return pd.date_range(index[0], periods=self.steps, freq=freq)
+        return pd.RangeIndex(self.steps)
+
     def display_acf_plot(self, lags: int = 40, alpha: float = 0.05) -> None:
         """
         Display the Autocorrelation Function (ACF) plot of the original data.
@@ -99,6 +853,9 @@ class ARMADataGenerator:
         if self.original_data is None:
             raise ValueError("No data available. Call fit() method first.")
 
+        from statsmodels.graphics.tsaplots import plot_acf
+
+        plt = load_pyplot()
         plt.figure(figsize=(10, 5))
         plot_acf(self.original_data, lags=lags, alpha=alpha)
         plt.title("Autocorrelation Function (ACF)")
@@ -115,30 +872,256 @@ class ARMADataGenerator:
         if self.original_data is None:
             raise ValueError("No data available. Call fit() method first.")
 
+        from statsmodels.graphics.tsaplots import plot_pacf
+
+        plt = load_pyplot()
         plt.figure(figsize=(10, 5))
         plot_pacf(self.original_data, lags=lags, alpha=alpha)
         plt.title("Partial Autocorrelation Function (PACF)")
         plt.show()
 
-    def save_generated_trajectories(self, data: pd.DataFrame, file_path: str) -> None:
+    def save_generated_trajectories(
+        self,
+        data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        file_path: str,
+        file_format: str = "csv",
+        dtype: Optional[np.dtype] = None,
+        attributes: Optional[Dict[str, object]] = None,
+    ) -> None:
         """
-        Save the generated trajectories to a CSV file.
+        Save the generated trajectories to a CSV file or a binary ensemble store.
 
         Args:
-            data (pd.DataFrame): The DataFrame containing the generated trajectories.
-            file_path (str): The path where the CSV file will be saved.
+            data (Union[pd.DataFrame, Iterable[pd.DataFrame]]): The DataFrame containing
+                the generated trajectories, or a stream of trajectory blocks sharing the
+                same index (e.g. from generate_iter).
+            file_path (str): The path of the CSV file, or the directory of the store.
+            file_format (str): "csv" or "npy" for an EnsembleStore. Default is "csv".
+            dtype (Optional[np.dtype]): Storage dtype for the "npy" format, e.g. np.float32.
+            attributes (Optional[Dict[str, object]]): Extra metadata for the "npy" format,
+                e.g. the seed. The model order and scaler parameters are always stored.
+
+        Raises:
+            ValueError: If the file format is unknown.
         """
-        data.to_csv(file_path)
+        if file_format == "npy":
+            metadata = {"order": list(self.order), "steps": self.steps}
+            if hasattr(self.scaler, "mean_"):
+                metadata["scaler_mean"] = float(self.scaler.mean_[0])
+                metadata["scaler_scale"] = float(self.scaler.scale_[0])
+            metadata.update(attributes or {})
+            chunks = [data] if isinstance(data, pd.DataFrame) else data
+            EnsembleStore(file_path).write_iter(
+                chunks, attributes=metadata, dtype=dtype
+            )
+            return
+
+        if file_format != "csv":
+            raise ValueError(
+                f"Unknown file format '{file_format}'. Use 'csv' or 'npy'."
+            )
+
+        if isinstance(data, pd.DataFrame):
+            data.to_csv(file_path)
+            return
+
+        # Trajectories are columns, so blocks cannot be appended to a single CSV.
+        # Spill each block to its own file and stitch the files together row by row,
+        # at most _MAX_OPEN_PARTS at a time.
+        directory = os.path.dirname(os.path.abspath(file_path))
+        with tempfile.TemporaryDirectory(dir=directory) as tmp_dir:
+            parts = []
+            for i, chunk in enumerate(data):
+                part = os.path.join(tmp_dir, f"part_{i}.csv")
+                chunk.to_csv(part)
+                parts.append(part)
+
+            level = 0
+            while len(parts) > _MAX_OPEN_PARTS:
+                merged = []
+                for start in range(0, len(parts), _MAX_OPEN_PARTS):
+                    target = os.path.join(tmp_dir, f"merged_{level}_{start}.csv")
+                    _paste_csv_columns(parts[start : start + _MAX_OPEN_PARTS], target)
+                    merged.append(target)
+                for part in parts:
+                    os.remove(part)
+                parts, level = merged, level + 1
+            _paste_csv_columns(parts, file_path)
 
     @staticmethod
-    def load_generated_trajectories(file_path: str) -> pd.DataFrame:
+    def load_generated_trajectories(file_path: str, mmap: bool = True) -> pd.DataFrame:
         """
-        Load previously generated trajectories from a CSV file.
+        Load previously generated trajectories from a CSV file or a binary ensemble store.
 
         Args:
-            file_path (str): The path to the CSV file containing the trajectories.
+            file_path (str): The path to the CSV file or the directory of the store.
+            mmap (bool): Memory-map the trajectories of a binary store instead of
+                         reading them into memory. Default is True.
 
         Returns:
             pd.DataFrame: A DataFrame containing the loaded trajectories.
         """
+        if EnsembleStore.exists(file_path):
+            return EnsembleStore(file_path).read(mmap=mmap)
         return pd.read_csv(file_path, index_col=0, parse_dates=True)
+
+
+def _paste_csv_columns(parts: List[str], file_path: str) -> None:
+    """
+    Join CSV files sharing the same index column side by side, line by line.
+
+    Args:
+        parts (List[str]): The CSV files, in column order.
+        file_path (str): The joined CSV file. The index column is taken from the first
+            part and dropped from the others.
+    """
+    handles = [open(part, newline="") for part in parts]
+    try:
+        with open(file_path, "w", newline="") as out:
+            for lines in zip(*handles):
+                row = [lines[0].rstrip("\r\n")]
+                row.extend(line.rstrip("\r\n").split(",", 1)[1] for line in lines[1:])
+                out.write(",".join(row) + "\n")
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+def _simulate_arma(
+    config: Dict[str, object], seed_sequences: List[np.random.SeedSequence]
+) -> np.ndarray:
+    """
+    Simulate one block of trajectories with the batched ARMA recursion.
+
+    Defined at module level so that it can run in worker processes.
+
+    Args:
+        config (Dict[str, object]): Output of ARMADataGenerator._simulation_config.
+        seed_sequences (List[np.random.SeedSequence]): One seed per trajectory.
+
+    Returns:
+        np.ndarray: Array of shape (steps, len(seed_sequences)) in the original scale.
+    """
+    return _filter_innovations(config, _standard_innovations(config, seed_sequences))
+
+
+def _standard_innovations(
+    config: Dict[str, object], seed_sequences: List[np.random.SeedSequence]
+) -> np.ndarray:
+    """
+    Draw standard normal innovations, one row per trajectory.
+
+    Args:
+        config (Dict[str, object]): Output of ARMADataGenerator._simulation_config.
+        seed_sequences (List[np.random.SeedSequence]): One seed per trajectory.
+
+    Returns:
+        np.ndarray: Array of shape (len(seed_sequences), burn_in + steps).
+    """
+    innovations = np.empty((len(seed_sequences), config["burn_in"] + config["steps"]))
+    for row, child in zip(innovations, seed_sequences):
+        np.random.default_rng(child).standard_normal(out=row)
+    return innovations
+
+
+def _filter_innovations(
+    config: Dict[str, object], innovations: np.ndarray
+) -> np.ndarray:
+    """
+    Run the ARMA recursion over standard normal innovations and map the result back
+    to the original scale. The innovations are scaled in place.
+
+    Args:
+        config (Dict[str, object]): Output of ARMADataGenerator._simulation_config.
+        innovations (np.ndarray): Array of shape (n_trajectories, burn_in + steps).
+
+    Returns:
+        np.ndarray: Array of shape (steps, n_trajectories) in the original scale.
+    """
+    innovations *= np.sqrt(config["sigma2"])
+
+    from scipy.signal import lfilter
+
+    simulated = lfilter(
+        np.r_[1.0, config["ma"]], np.r_[1.0, -config["ar"]], innovations, axis=1
+    )
+
+    # Transposing keeps the trajectories contiguous, which is also how pandas
+    # lays out the columns of the resulting DataFrame.
+    values = simulated[:, config["burn_in"] :].T
+    values += config["const"]
+    values *= config["scale"]
+    values += config["mean"]
+    np.maximum(values, 0, out=values)  # Ensure non-negative values
+    return values
+
+
+def _fit_arma_candidate(
+    values: np.ndarray,
+    order: Tuple[int, int],
+    start_params: Optional[np.ndarray] = None,
+) -> Dict[str, object]:
+    """
+    Fit one ARMA candidate of an order search.
+
+    Defined at module level so that it can run in worker processes.
+
+    Args:
+        values (np.ndarray): The standardized series.
+        order (Tuple[int, int]): The (p, q) order of the candidate.
+        start_params (Optional[np.ndarray]): Warm-start parameters.
+
+    Returns:
+        Dict[str, object]: Parameters, aic, bic, llf, convergence flag and status.
+    """
+    p, q = order
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = _arima(values, order=(p, 0, q))
+            # Keep the warm start only if it beats the default starting point
+            if start_params is not None and not model.loglike(
+                start_params
+            ) > model.loglike(model.start_params):
+                start_params = None
+            fitted = model.fit(start_params=start_params)
+    except (ValueError, np.linalg.LinAlgError):
+        return {"status": "failed"}
+
+    return {
+        "params": np.asarray(fitted.params),
+        "aic": float(fitted.aic),
+        "bic": float(fitted.bic),
+        "llf": float(fitted.llf),
+        "converged": bool(fitted.mle_retvals.get("converged", True)),
+        "status": "fitted",
+    }
+
+
+def _warm_start(
+    params: np.ndarray, parent: Tuple[int, int], order: Tuple[int, int]
+) -> np.ndarray:
+    """
+    Extend the parameters of a fitted parent order to a larger order.
+
+    Parameters are laid out as (const, ar.L1..Lp, ma.L1..Lq, sigma2). The added
+    AR or MA coefficient starts at zero, where the larger model equals the parent.
+
+    Args:
+        params (np.ndarray): Fitted parameters of the parent.
+        parent (Tuple[int, int]): The (p, q) order of the parent.
+        order (Tuple[int, int]): The (p, q) order to start.
+
+    Returns:
+        np.ndarray: Start parameters for the larger order.
+    """
+    p, q = parent
+    const, ar, ma, sigma2 = (
+        params[0],
+        params[1 : 1 + p],
+        params[1 + p : 1 + p + q],
+        params[-1],
+    )
+    ar = np.r_[ar, np.zeros(order[0] - p)]
+    ma = np.r_[ma, np.zeros(order[1] - q)]
+    return np.r_[const, ar, ma, sigma2]
@@ -0,0 +1,374 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..data.season_calendar import DEFAULT_SEASONS, SeasonCalendar
+from ..utils.instrumentation import stage
+
+
+@dataclass
+class BootstrapDataGenerator:
+    """
+    Generate synthetic precipitation by resampling blocks of the historical record.
+
+    Every season of a trajectory is assembled from blocks of block_length rows copied
+    from complete historical occurrences of the same season, at the same position
+    within the season. The occurrences a season draws from are analogs: the
+    successors of the n_neighbors historical occurrences of the previous season whose
+    features (seasonal total and wet-day fraction) are nearest to the features of the
+    previous generated season, looked up in a KD-tree per season built once by fit().
+    Daily values, including zeros and dry spells within a block, are historical, and
+    season-to-season persistence is kept through the analogs.
+
+    The trajectories have the same date index as those of ARMADataGenerator, so they
+    can be passed to PrecipitationClassifier and WeatherGenerator unchanged.
+
+    Attributes:
+        steps (int): Length of each trajectory in rows.
+        block_length (int): Rows per resampled block. Default is 30.
+        n_neighbors (int): Number of analogs to draw from. Default is 5.
+        wet_threshold (float): Smallest value counted as a wet day. Default is 0.1.
+        seasons (Dict[str, List[int]]): Season names mapped to their months, in order.
+        original_data (Optional[pd.Series]): The historical record.
+    """
+
+    steps: int
+    block_length: int = 30
+    n_neighbors: int = 5
+    wet_threshold: float = 0.1
+    seasons: Dict[str, List[int]] = field(default_factory=lambda: dict(DEFAULT_SEASONS))
+    original_data: Optional[pd.Series] = field(init=False, default=None)
+    _values: np.ndarray = field(init=False, repr=False, default=None)
+    _segments: List[np.ndarray] = field(init=False, repr=False)
+    _lengths: List[np.ndarray] = field(init=False, repr=False)
+    _cumulative: List[np.ndarray] = field(init=False, repr=False)
+    _analogs: List[Optional[Tuple[object, np.ndarray, np.ndarray]]] = field(
+        init=False, repr=False
+    )
+
+    def fit(self, time_series: pd.Series) -> None:
+        """
+        Index the historical record. Nothing is estimated: the complete season
+        occurrences are located and a KD-tree over their features is built per season.
+
+        Args:
+            time_series (pd.Series): Historical precipitation with a DatetimeIndex.
+
+        Raises:
+            ValueError: If a season has no complete occurrence without missing values.
+        """
+        from scipy.spatial import cKDTree
+
+        self.original_data = time_series
+        self._values = time_series.to_numpy(dtype=float)
+        calendar = SeasonCalendar.from_index(time_series.index, self.seasons)
+        missing = np.add.reduceat(np.isnan(self._values), calendar.starts) > 0
+        usable = calendar.complete & ~missing
+
+        # Values of the complete occurrences of every season, one row per occurrence.
+        # Occurrences shorter than the longest, e.g. a Winter without February 29,
+        # are padded with zeros that are never copied and never summed.
+        runs = []
+        self._segments, self._lengths, self._cumulative = [], [], []
+        for i, season in enumerate(self.seasons):
+            season_runs = np.flatnonzero(usable & (calendar.run_seasons == i))
+            if not len(season_runs):
+                raise ValueError(f"The record contains no complete {season}.")
+            starts = calendar.starts[season_runs]
+            lengths = calendar.stops[season_runs] - starts
+            observed = np.arange(lengths.max()) < lengths[:, None]
+            runs.append(season_runs)
+            segments = np.zeros(observed.shape)
+            segments[observed] = self._values[
+                (starts[:, None] + np.arange(lengths.max()))[observed]
+            ]
+            self._segments.append(segments)
+            self._lengths.append(lengths)
+
+            # Running sums of values and wet rows, for the features of any range
+            cumulative = np.zeros((len(segments), segments.shape[1] + 1, 2))
+            np.cumsum(segments, axis=1, out=cumulative[:, 1:, 0])
+            np.cumsum(
+                (segments >= self.wet_threshold) & observed,
+                axis=1,
+                out=cumulative[:, 1:, 1],
+            )
+            self._cumulative.append(cumulative)
+
+        # Analogs of every season: a tree over the features of the occurrences that are
+        # directly followed by a usable occurrence of the next season, and the
+        # positions of those successors
+        self._analogs = []
+        n_seasons = len(self.seasons)
+        for i in range(n_seasons):
+            following = runs[i] + 1
+            has_successor = np.zeros(len(runs[i]), dtype=bool)
+            in_range = following < len(calendar.starts)
+            has_successor[in_range] = usable[following[in_range]] & (
+                calendar.run_seasons[following[in_range]] == (i + 1) % n_seasons
+            )
+            if has_successor.sum() < 2:
+                self._analogs.append(None)
+                continue
+
+            lengths = self._lengths[i][has_successor]
+            features = self._features(
+                self._cumulative[i][has_successor, -1], lengths, lengths
+            )
+            mean, std = features.mean(axis=0), features.std(axis=0)
+            std[std == 0] = 1.0
+            successors = np.searchsorted(runs[(i + 1) % n_seasons], following)
+            self._analogs.append(
+                (
+                    cKDTree((features - mean) / std),
+                    successors[has_successor],
+                    np.stack([mean, std]),
+                )
+            )
+
+    def generate(self, n_trajectories: int, seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        Generate trajectories by analog block resampling.
+
+        Args:
+            n_trajectories (int): The number of trajectories to generate.
+            seed (Optional[int]): Seed for the ensemble. Every trajectory draws from its
+                own child of np.random.SeedSequence(seed).
+
+        Returns:
+            pd.DataFrame: Trajectories as columns Sim_1, Sim_2, ... with a date index
+                          starting at the first date of the historical record.
+
+        Raises:
+            ValueError: If fit() has not been called.
+        """
+        return pd.concat(
+            self.generate_iter(n_trajectories, n_trajectories, seed), axis=1
+        )
+
+    def generate_iter(
+        self,
+        n_trajectories: int,
+        chunk_size: int = 1000,
+        seed: Optional[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lazily generate trajectories in blocks of at most chunk_size trajectories.
+
+        Args:
+            n_trajectories (int): The total number of trajectories to generate.
+            chunk_size (int): The number of trajectories per block. Default is 1000.
+            seed (Optional[int]): Seed for the ensemble. The concatenated blocks equal
+                                  generate(n_trajectories, seed=seed).
+
+        Yields:
+            pd.DataFrame: Blocks of trajectories, with columns numbered across blocks.
+
+        Raises:
+            ValueError: If fit() has not been called or chunk_size is not positive.
+        """
+        if self._values is None:
+            raise ValueError("No historical record indexed. Call fit() method first.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+
+        index = self._simulation_index()
+        children = np.random.SeedSequence(seed).spawn(n_trajectories)
+        for start in range(0, n_trajectories, chunk_size):
+            block_seeds = children[start : start + chunk_size]
+            with stage("bootstrap.generate", items=len(block_seeds) * self.steps):
+                values = self._resample(index, block_seeds)
+            yield pd.DataFrame(
+                values,
+                index=index,
+                columns=[f"Sim_{i+1}" for i in range(start, start + len(block_seeds))],
+            )
+
+    def _resample(
+        self, index: pd.DatetimeIndex, seed_sequences: List[np.random.SeedSequence]
+    ) -> np.ndarray:
+        """
+        Assemble one trajectory per seed, season occurrence by season occurrence, with
+        all trajectories advancing together.
+
+        Args:
+            index (pd.DatetimeIndex): Index of the trajectories.
+            seed_sequences (List[np.random.SeedSequence]): One seed per trajectory.
+
+        Returns:
+            np.ndarray: Array of shape (steps, len(seed_sequences)).
+        """
+        calendar = SeasonCalendar.from_index(index, self.seasons)
+        step = index[1] - index[0] if len(index) > 1 else pd.Timedelta(days=1)
+        n = len(seed_sequences)
+
+        # Row offsets of every run within its season, and the blocks they fall into
+        first_offsets = self._season_offsets(calendar, index, step)
+        lengths = calendar.stops - calendar.starts
+        first_blocks = first_offsets // self.block_length
+        n_blocks = (first_offsets + lengths - 1) // self.block_length - first_blocks + 1
+
+        draws = np.empty((n, int(n_blocks.sum())))
+        for row, child in zip(draws, seed_sequences):
+            np.random.default_rng(child).random(out=row)
+
+        # Trajectories are filled as rows of an (n, steps) buffer, which keeps the
+        # copied blocks contiguous, and transposed at the end.
+        values = np.zeros((n, len(index)))
+        candidates = None
+        draw = 0
+        for run in range(len(calendar.starts)):
+            season = calendar.run_seasons[run]
+            start, stop = calendar.starts[run], calendar.stops[run]
+            if season < 0:
+                candidates = None  # Rows outside every season stay dry
+                continue
+
+            segments = self._segments[season]
+            segment_lengths = self._lengths[season]
+            cumulative = self._cumulative[season]
+            if candidates is None:
+                candidates = np.broadcast_to(
+                    np.arange(len(segments)), (n, len(segments))
+                )
+
+            # One analog per trajectory and block, copied at its position in the season
+            scaled = draws[:, draw : draw + n_blocks[run]] * candidates.shape[1]
+            draw += n_blocks[run]
+            chosen = np.take_along_axis(candidates, scaled.astype(np.intp), axis=1)
+            # The fractional part of a draw is again uniform and picks the row of
+            # the donor that fills rows past its end, e.g. February 29
+            spare = scaled % 1.0
+            first = first_offsets[run]
+            last = min(first + stop - start, segments.shape[1])
+            sums = np.zeros((n, 2))
+            for b, block_start in enumerate(
+                range(first_blocks[run] * self.block_length, last, self.block_length)
+            ):
+                lo = max(block_start, first)
+                hi = min(block_start + self.block_length, last)
+                donors = chosen[:, b]
+                target = slice(start + lo - first, start + hi - first)
+                values[:, target] = segments[donors, lo:hi]
+                sums += cumulative[donors, hi] - cumulative[donors, lo]
+
+                short = segment_lengths[donors] < hi
+                if short.any():
+                    short_lengths = segment_lengths[donors[short]]
+                    fill = segments[
+                        donors[short], (spare[short, b] * short_lengths).astype(np.intp)
+                    ]
+                    beyond = np.arange(lo, hi) >= short_lengths[:, None]
+                    block = values[short, target]
+                    block[beyond] = np.broadcast_to(fill[:, None], beyond.shape)[beyond]
+                    values[short, target] = block
+                    n_beyond = beyond.sum(axis=1)
+                    sums[short, 0] += fill * n_beyond
+                    sums[short, 1] += (fill >= self.wet_threshold) * n_beyond
+
+            # Complete runs are scaled to their own length, partial ones to the
+            # longest occurrence of the season
+            season_length = (
+                stop - start if calendar.complete[run] else segments.shape[1]
+            )
+            features = self._features(sums, last - first, season_length)
+            candidates = self._next_candidates(season, features)
+
+        return values.T
+
+    def _next_candidates(
+        self, season: int, features: np.ndarray
+    ) -> Optional[np.ndarray]:
+        """
+        Find the analogs of generated seasons and return their successors.
+
+        Args:
+            season (int): Position of the generated season.
+            features (np.ndarray): Features of the generated seasons, of shape
+                (n_trajectories, 2).
+
+        Returns:
+            Optional[np.ndarray]: Occurrence positions of the next season, of shape
+                (n_trajectories, n_neighbors), or None to draw from all occurrences.
+        """
+        analogs = self._analogs[season]
+        if analogs is None:
+            return None
+        tree, successors, scaling = analogs
+
+        k = min(self.n_neighbors, tree.n)
+        _, neighbors = tree.query((features - scaling[0]) / scaling[1], k=k)
+        return successors[neighbors.reshape(len(features), k)]
+
+    @staticmethod
+    def _features(
+        sums: np.ndarray,
+        n_rows: Union[int, np.ndarray],
+        season_length: Union[int, np.ndarray],
+    ) -> np.ndarray:
+        """
+        Seasonal total and wet-day fraction of season occurrences.
+
+        Args:
+            sums (np.ndarray): Sums of the values and of the wet rows, of shape
+                (n_occurrences, 2).
+            n_rows (Union[int, np.ndarray]): Number of rows summed, per occurrence
+                or for all.
+            season_length (Union[int, np.ndarray]): Number of rows of the full season,
+                to scale the totals of partial occurrences.
+
+        Returns:
+            np.ndarray: Features of shape (n_occurrences, 2).
+        """
+        features = sums / np.reshape(n_rows, (-1, 1))
+        features[:, 0] *= season_length
+        return features
+
+    def _season_offsets(
+        self, calendar: SeasonCalendar, index: pd.DatetimeIndex, step: pd.Timedelta
+    ) -> np.ndarray:
+        """
+        Row offset of the first row of every run from the start of its season, which
+        is not zero for a season cut by the start of the index.
+
+        Args:
+            calendar (SeasonCalendar): Calendar of the index.
+            index (pd.DatetimeIndex): The index.
+            step (pd.Timedelta): Sampling step of the index.
+
+        Returns:
+            np.ndarray: Offsets in rows.
+        """
+        offsets = np.zeros(len(calendar.starts), dtype=np.intp)
+        months = list(self.seasons.values())
+        for run in np.flatnonzero(~calendar.complete & (calendar.run_seasons >= 0)):
+            season_months = months[calendar.run_seasons[run]]
+            wraps = any(b < a for a, b in zip(season_months, season_months[1:]))
+            season_start = pd.Timestamp(
+                year=int(calendar.run_years[run]) - wraps,
+                month=season_months[0],
+                day=1,
+            )
+            offsets[run] = max((index[calendar.starts[run]] - season_start) // step, 0)
+        return offsets
+
+    def _simulation_index(self) -> pd.DatetimeIndex:
+        """
+        Build the index of the trajectories, starting at the first date of the record
+        like ARMADataGenerator.
+
+        Returns:
+            pd.DatetimeIndex: The index.
+
+        Raises:
+            ValueError: If the frequency of the record cannot be inferred.
+        """
+        index = self.original_data.index
+        freq = index.freq or (pd.infer_freq(index) if len(index) > 2 else None)
+        if freq is None:
+            raise ValueError(
+                "The frequency of the historical record cannot be inferred."
+            )
+        return pd.date_range(index[0], periods=self.steps, freq=freq)
@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class ConditionalEnsemble:
+    """
+    Trajectories generated conditionally on the precipitation category of a season.
+
+    The trajectories were drawn from a tilted proposal, so every trajectory carries an
+    importance weight: the likelihood ratio between the fitted model and the proposal.
+    Weighted statistics of the trajectories estimate statistics of the fitted model
+    conditional on the requested category.
+
+    Attributes:
+        trajectories (pd.DataFrame): Accepted trajectories as columns. Each holds at
+            least one complete occurrence of the season in the requested category.
+        log_weights (np.ndarray): Log importance weight of every trajectory.
+        season (str): The conditioned season.
+        condition (str): The requested precipitation category.
+        tilt (float): Shift of the standardized innovations during the season.
+        n_segments (int): Number of season occurrences in the requested category.
+        acceptance_rate (float): Share of proposed occurrences that were in the category.
+    """
+
+    trajectories: pd.DataFrame
+    log_weights: np.ndarray
+    season: str
+    condition: str
+    tilt: float
+    n_segments: int
+    acceptance_rate: float
+
+    @property
+    def weights(self) -> np.ndarray:
+        """
+        Self-normalized importance weights.
+
+        Returns:
+            np.ndarray: Weights summing to one, one per trajectory.
+        """
+        weights = np.exp(self.log_weights - self.log_weights.max())
+        return weights / weights.sum()
+
+    @property
+    def effective_sample_size(self) -> float:
+        """
+        Kish effective sample size of the importance weights.
+
+        Equals the number of trajectories when all weights are equal and drops towards
+        one when a few trajectories dominate.
+
+        Returns:
+            float: (sum of weights)^2 / sum of squared weights.
+        """
+        return float(1.0 / np.sum(self.weights**2))
+
+    def resample(self, n_trajectories: int, seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        Draw trajectories with probabilities proportional to their weights, giving an
+        unweighted ensemble that can be classified and used like a generated one.
+
+        Args:
+            n_trajectories (int): Number of trajectories to draw, with replacement.
+            seed (Optional[int]): Seed for the draw.
+
+        Returns:
+            pd.DataFrame: The drawn trajectories as columns named Sim_1, Sim_2, ...
+        """
+        rng = np.random.default_rng(seed)
+        chosen = rng.choice(
+            self.trajectories.shape[1], size=n_trajectories, p=self.weights
+        )
+        resampled = self.trajectories.iloc[:, chosen]
+        resampled.columns = [f"Sim_{i+1}" for i in range(n_trajectories)]
+        return resampled
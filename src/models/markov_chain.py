@@ -1,20 +1,310 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Union
 import pandas as pd
 import numpy as np
+from ..data.season_calendar import DEFAULT_SEASONS
+
+_TABLE_SIZE = 1024
 
 
 @dataclass
 class MarkovChain:
+    """
+    A first-order Markov chain over seasonal precipitation conditions.
+
+    The chain moves from season to season. Each season has its own transition
+    matrix from the condition of the previous season, so persistence such as wet
+    years following wet years is kept, along with seasonal differences.
+
+    Attributes:
+        transition_matrix (pd.DataFrame): Transition probabilities pooled over all
+            seasons, with conditions as index (from) and columns (to).
+        categories (List[str]): Precipitation categories from driest to wettest.
+        seasons (List[str]): Seasons in chronological order within a year.
+        seasonal_matrices (Optional[np.ndarray]): Array of shape
+            (n_seasons, n_categories, n_categories). Entry [s, i, j] is the probability
+            that season s has condition j given that the previous season had condition i.
+        initial_distribution (Optional[np.ndarray]): Condition frequencies of each season,
+            of shape (n_seasons, n_categories), used to draw the first condition.
+    """
+
     transition_matrix: pd.DataFrame = None
+    categories: List[str] = field(
+        default_factory=lambda: ["very_dry", "dry", "normal", "wet", "very_wet"]
+    )
+    seasons: List[str] = field(default_factory=lambda: list(DEFAULT_SEASONS))
+    seasonal_matrices: Optional[np.ndarray] = None
+    initial_distribution: Optional[np.ndarray] = None
+
+    def compute_transition_matrix(
+        self, classified_data: Union[pd.DataFrame, np.ndarray]
+    ) -> None:
+        """
+        Estimate the transition matrices from classified data in a single counting pass.
+
+        Args:
+            classified_data (Union[pd.DataFrame, np.ndarray]): Either the output of
+                PrecipitationClassifier.classify_precipitation, preferably with
+                by_year=True so that transitions between years are seen, or an int
+                array of condition codes of shape (n_sequences, length) whose first
+                column is the first season. Missing conditions (-1 or NaN) are skipped.
+
+        Raises:
+            ValueError: If the data contains no transition.
+        """
+        sequences = self._to_sequences(classified_data)
+        n_seasons, k = len(self.seasons), len(self.categories)
+
+        previous, current = sequences[:, :-1], sequences[:, 1:]
+        season = np.broadcast_to(
+            np.arange(1, sequences.shape[1]) % n_seasons, current.shape
+        )
+        valid = (previous >= 0) & (current >= 0)
+        if not valid.any():
+            raise ValueError("classified_data contains no season-to-season transition.")
+
+        flat = (season[valid] * k + previous[valid]) * k + current[valid]
+        counts = np.bincount(flat, minlength=n_seasons * k * k).reshape(n_seasons, k, k)
+        pooled = counts.sum(axis=0)
+
+        self.transition_matrix = pd.DataFrame(
+            _normalize_rows(pooled, np.full(k, 1 / k)),
+            index=self.categories,
+            columns=self.categories,
+        )
+        # Rows never observed for a season fall back to the pooled transitions
+        self.seasonal_matrices = np.stack(
+            [
+                _normalize_rows(counts[s], self.transition_matrix.to_numpy())
+                for s in range(n_seasons)
+            ]
+        )
+
+        initial = np.zeros((n_seasons, k))
+        for s in range(n_seasons):
+            codes = sequences[:, s::n_seasons]
+            initial[s] = np.bincount(codes[codes >= 0], minlength=k)
+        self.initial_distribution = _normalize_rows(initial, np.full(k, 1 / k))
+
+    def generate_sequence(
+        self,
+        length: int,
+        n_sequences: int = 1,
+        seed: Optional[int] = None,
+        start_season: int = 0,
+    ) -> np.ndarray:
+        """
+        Sample many condition sequences at once.
+
+        All sequences advance together. At every step one uniform draw per sequence is
+        mapped to the next condition through a lookup table of the cumulative transition
+        probabilities of its current row, followed by an exact correction for the draws
+        that fall into a table bin containing a category boundary.
+
+        Args:
+            length (int): Number of seasons in each sequence.
+            n_sequences (int): Number of sequences. Default is 1.
+            seed (Optional[int]): Seed for the random number generator.
+            start_season (int): Position in seasons of the first season. Default is 0.
+
+        Returns:
+            np.ndarray: int8 condition codes of shape (n_sequences, length).
+
+        Raises:
+            ValueError: If the transition matrices have not been computed.
+        """
+        if self.seasonal_matrices is None:
+            raise ValueError(
+                "Transition matrix has not been computed. Call compute_transition_matrix() first."
+            )
+
+        rng = np.random.default_rng(seed)
+        n_seasons, k = len(self.seasons), len(self.categories)
+
+        # Rows are (season, previous condition) pairs, with the first draw of each
+        # sequence using the initial distribution of the start season as an extra row.
+        first = start_season % n_seasons
+        cumulative = np.cumsum(
+            np.concatenate(
+                [
+                    self.seasonal_matrices.reshape(-1, k),
+                    self.initial_distribution[first][None, :],
+                ]
+            ),
+            axis=1,
+        )
+        cumulative[:, -1] = np.inf
+
+        # table[row, b] is the condition of draws at the lower edge of bin b. Bins that
+        # contain a category boundary are flagged by adding k and resolved exactly.
+        edges = np.arange(_TABLE_SIZE + 1) / _TABLE_SIZE
+        lower = np.stack(
+            [np.searchsorted(row, edges[:-1], side="right") for row in cumulative]
+        )
+        upper = np.stack(
+            [np.searchsorted(row, edges[1:], side="left") for row in cumulative]
+        )
+        table = (lower + k * (upper > lower)).ravel()
+        cumulative = cumulative.ravel()
+
+        # Steps are filled as rows of a (length, n_sequences) buffer, which keeps the
+        # writes contiguous, and transposed at the end.
+        sequences = np.empty((length, n_sequences), dtype=np.int8)
+        offset = np.full(n_sequences, n_seasons * k * _TABLE_SIZE, dtype=np.intp)
+        u = np.empty(n_sequences)
+        position = np.empty(n_sequences, dtype=np.intp)
+        state = np.empty(n_sequences, dtype=np.intp)
+        for t in range(length):
+            rng.random(out=u)
+            np.multiply(u, _TABLE_SIZE, out=position, casting="unsafe")
+            position += offset
+            np.take(table, position, out=state)
+
+            ambiguous = np.flatnonzero(state >= k)
+            if len(ambiguous):
+                boundary = offset[ambiguous] // _TABLE_SIZE * k + state[ambiguous] - k
+                draws = u[ambiguous]
+                behind = cumulative[boundary] <= draws
+                while behind.any():
+                    boundary += behind
+                    behind = cumulative[boundary] <= draws
+                state[ambiguous] = boundary % k
+
+            sequences[t] = state
+            np.multiply(state, _TABLE_SIZE, out=offset)
+            offset += ((first + t + 1) % n_seasons) * k * _TABLE_SIZE
+
+        return np.ascontiguousarray(sequences.T)
 
-    def compute_transition_matrix(self, classified_data: np.ndarray) -> None:
-        # Implementation to be added
-        pass
+    def generate_year_structures(
+        self, num_years: int, n_sequences: int = 1, seed: Optional[int] = None
+    ) -> List[List[List[Tuple[str, str]]]]:
+        """
+        Sample multi-year structures for WeatherGenerator.generate_weather.
 
-    def generate_sequence(self, length: int) -> None:
-        # Implementation to be added
-        pass
+        Args:
+            num_years (int): Number of years in each structure.
+            n_sequences (int): Number of structures. Default is 1.
+            seed (Optional[int]): Seed for the random number generator.
+
+        Returns:
+            List[List[List[Tuple[str, str]]]]: One multi-year structure per sequence.
+        """
+        sequences = self.generate_sequence(
+            num_years * len(self.seasons), n_sequences, seed
+        )
+        return [self.to_year_structure(sequence) for sequence in sequences]
+
+    def to_year_structure(self, sequence: np.ndarray) -> List[List[Tuple[str, str]]]:
+        """
+        Convert a sequence of condition codes starting with the first season into a
+        multi-year structure.
+
+        Args:
+            sequence (np.ndarray): Condition codes, a whole number of years long.
+
+        Returns:
+            List[List[Tuple[str, str]]]: One list of (season, condition) pairs per year.
+        """
+        n_seasons = len(self.seasons)
+        return [
+            [
+                (self.seasons[s], self.categories[code])
+                for s, code in enumerate(sequence[start : start + n_seasons])
+            ]
+            for start in range(0, len(sequence), n_seasons)
+        ]
 
     def save_transition_matrix(self, file_path: str) -> None:
-        # Implementation to be added
-        pass
+        """
+        Save the pooled transition matrix to a CSV file.
+
+        Args:
+            file_path (str): The path where the CSV file will be saved.
+
+        Raises:
+            ValueError: If the transition matrix has not been computed.
+        """
+        if self.transition_matrix is None:
+            raise ValueError(
+                "Transition matrix has not been computed. Call compute_transition_matrix() first."
+            )
+        self.transition_matrix.to_csv(file_path)
+
+    @staticmethod
+    def load_transition_matrix(file_path: str) -> pd.DataFrame:
+        """
+        Load a previously saved transition matrix from a CSV file.
+
+        Args:
+            file_path (str): The path to the CSV file containing the matrix.
+
+        Returns:
+            pd.DataFrame: The loaded transition matrix.
+        """
+        return pd.read_csv(file_path, index_col=0)
+
+    def _to_sequences(
+        self, classified_data: Union[pd.DataFrame, np.ndarray]
+    ) -> np.ndarray:
+        """
+        Arrange classified data as one row of condition codes per simulation.
+
+        Args:
+            classified_data (Union[pd.DataFrame, np.ndarray]): Classified data or codes.
+
+        Returns:
+            np.ndarray: Condition codes of shape (n_sequences, length), -1 where missing.
+        """
+        if isinstance(classified_data, np.ndarray):
+            return classified_data.astype(np.int64)
+
+        codes = np.column_stack(
+            [self._season_codes(classified_data[season]) for season in self.seasons]
+        )
+        index = classified_data.index
+        if not isinstance(index, pd.MultiIndex):
+            return codes  # One year per simulation
+
+        simulations = pd.factorize(index.get_level_values(0))[0]
+        order = np.lexsort((index.get_level_values(1), simulations))
+        simulations, codes = simulations[order], codes[order]
+        year = pd.Series(simulations).groupby(simulations).cumcount().to_numpy()
+
+        sequences = np.full((simulations.max() + 1, year.max() + 1, codes.shape[1]), -1)
+        sequences[simulations, year] = codes
+        return sequences.reshape(len(sequences), -1)
+
+    def _season_codes(self, labels: pd.Series) -> np.ndarray:
+        """
+        Convert the labels of one season to category codes.
+
+        Args:
+            labels (pd.Series): Categorical or string labels.
+
+        Returns:
+            np.ndarray: Category codes, -1 where missing.
+        """
+        if isinstance(labels.dtype, pd.CategoricalDtype) and list(
+            labels.cat.categories
+        ) == list(self.categories):
+            return labels.cat.codes.to_numpy(dtype=np.int64)
+        lookup = {category: code for code, category in enumerate(self.categories)}
+        return labels.astype(object).map(lookup).fillna(-1).to_numpy(dtype=np.int64)
+
+
+def _normalize_rows(counts: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+    """
+    Turn count rows into probabilities, using the fallback for empty rows.
+
+    Args:
+        counts (np.ndarray): Array of counts, one distribution per row.
+        fallback (np.ndarray): Probabilities for rows without counts, either one row
+                               for all or one row per row of counts.
+
+    Returns:
+        np.ndarray: Row-normalized probabilities.
+    """
+    totals = counts.sum(axis=-1, keepdims=True)
+    fallback = np.broadcast_to(fallback, counts.shape)
+    return np.where(totals > 0, counts / np.where(totals > 0, totals, 1), fallback)
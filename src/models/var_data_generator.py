@@ -0,0 +1,295 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..utils.instrumentation import stage
+from .arma_data_generator import _standard_scaler
+
+if TYPE_CHECKING:
+    from sklearn.preprocessing import StandardScaler
+    from statsmodels.tsa.vector_ar.var_model import VARResults
+
+
+def _var(*args, **kwargs):
+    """
+    Build a statsmodels VAR model, importing statsmodels on first use.
+
+    Returns:
+        VAR: The unfitted model.
+    """
+    from statsmodels.tsa.vector_ar.var_model import VAR
+
+    return VAR(*args, **kwargs)
+
+
+@dataclass
+class VARDataGenerator:
+    """
+    Generate several weather variables jointly with a vector autoregression.
+
+    All variables of a trajectory are simulated in one recursion with correlated
+    innovations, so adding a variable adds one plane to the simulated array instead
+    of a second model, simulation and classification. Trajectories are held as one
+    (steps x variables x trajectories) array, one plane per variable. generate()
+    exposes it as a DataFrame with (variable, simulation) columns without copying:
+    frame["precipitation"] is an ordinary precipitation ensemble, and
+    PrecipitationClassifier and WeatherGenerator accept the whole frame directly.
+    The classifier reads the precipitation plane and the weather generator copies
+    every variable of a selected segment.
+
+    Attributes:
+        order (int): Number of lags of the VAR model.
+        steps (int): Length of each trajectory.
+        precipitation (str): Name of the precipitation variable, which is clipped at
+            zero. Default is "precipitation".
+        model (VARResults): The fitted model, on standardized data.
+        scaler (StandardScaler): Per-variable standardization.
+        original_data (Optional[pd.DataFrame]): The data the model was fitted to.
+    """
+
+    order: int
+    steps: int
+    precipitation: str = "precipitation"
+    model: "VARResults" = field(init=False, default=None)
+    scaler: "StandardScaler" = field(init=False, default_factory=_standard_scaler)
+    original_data: Optional[pd.DataFrame] = field(init=False, default=None)
+
+    @property
+    def variables(self) -> List[str]:
+        """
+        Names of the simulated variables, in the order of the last array axis.
+
+        Returns:
+            List[str]: The columns of the fitted data.
+
+        Raises:
+            ValueError: If the model hasn't been fitted yet.
+        """
+        if self.original_data is None:
+            raise ValueError("Model has not been fitted. Call fit() method first.")
+        return [str(column) for column in self.original_data.columns]
+
+    def fit(self, data: pd.DataFrame) -> None:
+        """
+        Fit the VAR model to all columns of the data at once.
+
+        Args:
+            data (pd.DataFrame): One column per variable with a date index, e.g.
+                TimeSeriesData.from_csv(path, columns=[...]).data.
+
+        Raises:
+            ValueError: If the precipitation variable is not a column of the data.
+        """
+        if self.precipitation not in data.columns:
+            raise ValueError(
+                f"Column '{self.precipitation}' not found in the data. "
+                f"Available columns: {list(data.columns)}"
+            )
+
+        with stage("var.fit", items=data.size, order=str(self.order)):
+            self.original_data = data
+            standardized = self.scaler.fit_transform(data.to_numpy(dtype=float))
+            self.model = _var(standardized).fit(self.order, trend="c")
+
+    def generate(self, n_trajectories: int, seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        Generate trajectories of all variables.
+
+        Args:
+            n_trajectories (int): The number of trajectories to generate.
+            seed (Optional[int]): Seed for the ensemble. Every trajectory draws from its
+                own child of np.random.SeedSequence(seed).
+
+        Returns:
+            pd.DataFrame: Columns (variable, Sim_i) over the simulated array.
+
+        Raises:
+            ValueError: If the model hasn't been fitted yet.
+        """
+        # A single block holds all trajectories, so no concatenation copy is needed
+        for block in self.generate_iter(n_trajectories, max(n_trajectories, 1), seed):
+            return block
+        return pd.DataFrame(
+            index=self._simulation_index(),
+            columns=pd.MultiIndex.from_product(
+                [self.variables, []], names=["variable", "simulation"]
+            ),
+            dtype=float,
+        )
+
+    def simulate_batch(
+        self, n_trajectories: int, seed: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Simulate all trajectories at once.
+
+        Args:
+            n_trajectories (int): The number of trajectories to generate.
+            seed (Optional[int]): Seed for the ensemble.
+
+        Returns:
+            np.ndarray: Array of shape (steps, n_variables, n_trajectories) in the
+                        original scale.
+
+        Raises:
+            ValueError: If the model hasn't been fitted yet.
+        """
+        if self.model is None:
+            raise ValueError("Model has not been fitted. Call fit() method first.")
+        return _simulate_var(
+            self._simulation_config(),
+            np.random.SeedSequence(seed).spawn(n_trajectories),
+        )
+
+    def generate_iter(
+        self,
+        n_trajectories: int,
+        chunk_size: int = 100,
+        seed: Optional[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lazily generate trajectories in blocks of at most chunk_size trajectories.
+
+        Args:
+            n_trajectories (int): The total number of trajectories to generate.
+            chunk_size (int): The number of trajectories per block. Default is 100.
+            seed (Optional[int]): Seed for the ensemble. The blocks hold the trajectories
+                                  of generate(n_trajectories, seed=seed).
+
+        Yields:
+            pd.DataFrame: Blocks with (variable, Sim_i) columns, numbered across blocks.
+
+        Raises:
+            ValueError: If the model hasn't been fitted yet or chunk_size is not positive.
+        """
+        if self.model is None:
+            raise ValueError("Model has not been fitted. Call fit() method first.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+
+        config = self._simulation_config()
+        index = self._simulation_index()
+        children = np.random.SeedSequence(seed).spawn(n_trajectories)
+        for start in range(0, n_trajectories, chunk_size):
+            block_seeds = children[start : start + chunk_size]
+            with stage("var.generate", items=len(block_seeds) * self.steps):
+                values = _simulate_var(config, block_seeds)
+            yield pd.DataFrame(
+                values.reshape(self.steps, -1),
+                index=index,
+                columns=pd.MultiIndex.from_product(
+                    [
+                        self.variables,
+                        [f"Sim_{i+1}" for i in range(start, start + len(block_seeds))],
+                    ],
+                    names=["variable", "simulation"],
+                ),
+            )
+
+    def _simulation_config(self) -> Dict[str, object]:
+        """
+        Collect everything the batched recursion needs in a picklable form.
+
+        Returns:
+            Dict[str, object]: Coefficients, innovation factor, scaler parameters and
+                simulation lengths.
+        """
+        coefs = np.asarray(self.model.coefs, dtype=float)
+        return {
+            "coefs": coefs,
+            "intercept": np.asarray(self.model.intercept, dtype=float),
+            "cholesky": np.linalg.cholesky(np.asarray(self.model.sigma_u, dtype=float)),
+            "mean": self.scaler.mean_,
+            "scale": self.scaler.scale_,
+            "clip": self.variables.index(self.precipitation),
+            "steps": self.steps,
+            "burn_in": self._burn_in(coefs),
+        }
+
+    @staticmethod
+    def _burn_in(coefs: np.ndarray, tolerance: float = 1e-8) -> int:
+        """
+        Number of warm-up steps after which the zero initial state has decayed
+        below the given tolerance.
+
+        Args:
+            coefs (np.ndarray): VAR coefficients of shape (order, k, k).
+            tolerance (float): Remaining influence of the initial state.
+
+        Returns:
+            int: Number of burn-in steps.
+
+        Raises:
+            ValueError: If the fitted VAR process is not stationary.
+        """
+        order, k, _ = coefs.shape
+        companion = np.zeros((order * k, order * k))
+        companion[:k] = np.concatenate(coefs, axis=1)
+        companion[k:, :-k] = np.eye((order - 1) * k)
+        modulus = np.abs(np.linalg.eigvals(companion)).max()
+        if modulus >= 1:
+            raise ValueError("The fitted VAR process is not stationary.")
+        if modulus == 0:
+            return order
+        decay = int(np.ceil(np.log(tolerance) / np.log(modulus)))
+        return int(np.clip(decay, 50, 10_000))
+
+    def _simulation_index(self) -> pd.Index:
+        """
+        Build the index of simulated trajectories, starting at the first date of the
+        fitted data like ARMADataGenerator.
+
+        Returns:
+            pd.Index: A DatetimeIndex when the data frequency can be inferred,
+                      otherwise a RangeIndex.
+        """
+        index = self.original_data.index
+        if isinstance(index, pd.DatetimeIndex) and len(index) > 2:
+            freq = index.freq or pd.infer_freq(index)
+            if freq is not None:
+                return pd.date_range(index[0], periods=self.steps, freq=freq)
+        return pd.RangeIndex(self.steps)
+
+
+def _simulate_var(
+    config: Dict[str, object], seed_sequences: List[np.random.SeedSequence]
+) -> np.ndarray:
+    """
+    Simulate one block of trajectories with the batched VAR recursion.
+
+    Args:
+        config (Dict[str, object]): Output of VARDataGenerator._simulation_config.
+        seed_sequences (List[np.random.SeedSequence]): One seed per trajectory.
+
+    Returns:
+        np.ndarray: Array of shape (steps, n_variables, len(seed_sequences)) in the
+                    original scale.
+    """
+    coefs = config["coefs"]
+    order, k, _ = coefs.shape
+    length = config["burn_in"] + config["steps"]
+
+    # Standard normal innovations drawn per trajectory, then laid out as
+    # (time, variable, trajectory) so that the last order steps form one contiguous
+    # (order * k, n) matrix and every step is a single matrix product
+    innovations = np.empty((len(seed_sequences), length, k))
+    for row, child in zip(innovations, seed_sequences):
+        np.random.default_rng(child).standard_normal(out=row)
+    simulated = np.matmul(config["cholesky"], innovations.transpose(1, 2, 0))
+    del innovations
+
+    simulated += config["intercept"][:, None]
+    stacked = np.concatenate(coefs[::-1], axis=1)  # [A_order, ..., A_1]
+    lagged = np.empty(simulated.shape[1:])
+    for t in range(order, length):
+        np.matmul(stacked, simulated[t - order : t].reshape(order * k, -1), out=lagged)
+        simulated[t] += lagged
+
+    values = simulated[config["burn_in"] :]
+    values *= config["scale"][:, None]
+    values += config["mean"][:, None]
+    clipped = values[:, config["clip"]]
+    np.maximum(clipped, 0, out=clipped)  # Ensure non-negative precipitation
+    return values
@@ -0,0 +1,6 @@
+# pipeline/__init__.py
+
+from .pipeline_config import PipelineConfig
+from .station_pipeline import StationPipeline
+
+__all__ = ["PipelineConfig", "StationPipeline"]
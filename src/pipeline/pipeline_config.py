@@ -0,0 +1,115 @@
+from dataclasses import dataclass, field, asdict, fields
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+
+@dataclass
+class PipelineConfig:
+    """
+    Settings shared by all stations of a batch run.
+
+    Attributes:
+        order (Optional[Tuple[int, int]]): ARMA (p, q) order. None selects the order
+            of every station with ARMADataGenerator.auto_order.
+        max_p (int): Largest AR order searched when order is None. Default is 3.
+        max_q (int): Largest MA order searched when order is None. Default is 3.
+        steps (int): Length of each trajectory in days. Default is 3650.
+        n_trajectories (int): Number of trajectories per station. Default is 1000.
+        chunk_size (int): Trajectories generated and classified per block. Lowered
+            automatically to fit the memory budget of the pipeline. Default is 250.
+        by_year (bool): Classify every season occurrence separately. Default is True.
+        year_structure (Optional[List[List[Tuple[str, str]]]]): Multi-year structure of
+            the scenarios. None skips the assemble stage.
+        n_scenarios (int): Number of scenarios per station. Default is 100.
+        seed (int): Base seed. Every station derives its own seed from it and its name.
+        disaggregate (bool): Disaggregate the trajectories of sub-daily stations back
+            to their resolution with FragmentDisaggregator. Fitting, generation and
+            classification always run on daily totals. Default is False.
+        seasons (Optional[Dict[str, List[int]]]): Season names mapped to their months,
+            in order, used to classify and assemble. None uses DEFAULT_SEASONS.
+        output_format (str): Format of the scenarios, "npy" for an EnsembleStore or
+            "csv". Default is "npy".
+    """
+
+    order: Optional[Tuple[int, int]] = None
+    max_p: int = 3
+    max_q: int = 3
+    steps: int = 3650
+    n_trajectories: int = 1000
+    chunk_size: int = 250
+    by_year: bool = True
+    year_structure: Optional[List[List[Tuple[str, str]]]] = None
+    n_scenarios: int = 100
+    seed: int = 0
+    disaggregate: bool = False
+    seasons: Optional[Dict[str, List[int]]] = None
+    output_format: str = "npy"
+
+    @classmethod
+    def from_dict(cls, settings: Mapping[str, Any]) -> "PipelineConfig":
+        """
+        Build a configuration from plain values, e.g. parsed from YAML.
+
+        Args:
+            settings (Mapping[str, Any]): Field names mapped to values. Lists are
+                converted where a field expects tuples.
+
+        Returns:
+            PipelineConfig: The configuration.
+
+        Raises:
+            ValueError: If a setting is unknown or the output format is not supported.
+        """
+        names = {f.name for f in fields(cls)}
+        unknown = sorted(set(settings) - names)
+        if unknown:
+            raise ValueError(f"Unknown pipeline settings: {unknown}")
+
+        settings = dict(settings)
+        if settings.get("order") is not None:
+            settings["order"] = tuple(settings["order"])
+        if settings.get("year_structure") is not None:
+            settings["year_structure"] = [
+                [tuple(segment) for segment in year]
+                for year in settings["year_structure"]
+            ]
+        if settings.get("seasons") is not None:
+            settings["seasons"] = {
+                str(season): [int(month) for month in months]
+                for season, months in settings["seasons"].items()
+            }
+        config = cls(**settings)
+        if config.output_format not in ("npy", "csv"):
+            raise ValueError(
+                f"Unknown output format '{config.output_format}'. Use 'npy' or 'csv'."
+            )
+        return config
+
+    def stage_settings(self, stage: str) -> Dict[str, Any]:
+        """
+        The settings a stage's output depends on, used in its checkpoint fingerprint.
+
+        chunk_size is left out on purpose: generation and classification give the same
+        result for any block size.
+
+        Args:
+            stage (str): One of 'fit', 'generate', 'classify', 'assemble' or
+                'disaggregate'.
+
+        Returns:
+            Dict[str, Any]: The relevant settings.
+        """
+        settings = asdict(self)
+        keys = {
+            "fit": ["order", "max_p", "max_q"],
+            "generate": ["steps", "n_trajectories", "seed"],
+            "classify": ["by_year", "seasons"],
+            "assemble": [
+                "year_structure",
+                "n_scenarios",
+                "seed",
+                "seasons",
+                "output_format",
+            ],
+            "disaggregate": ["disaggregate", "seed"],
+        }[stage]
+        return {key: settings[key] for key in keys}
@@ -0,0 +1,374 @@
+import glob
+import hashlib
+import json
+import os
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ..data.ensemble_store import EnsembleStore
+from ..data.season_calendar import DEFAULT_SEASONS
+from ..data.time_series_data import TimeSeriesData
+from ..generators.fragment_disaggregator import FragmentDisaggregator
+from ..generators.weather_generator import WeatherGenerator
+from ..models.arma_data_generator import ARMADataGenerator
+from ..utils.model_cache import ModelCache
+from ..utils.precipitation_classifier import PrecipitationClassifier
+from .pipeline_config import PipelineConfig
+
+STAGES = ("fit", "generate", "classify", "assemble", "disaggregate")
+
+# The stage whose output every stage reads. Disaggregation streams the trajectories,
+# so classification and assembly settings do not invalidate it.
+_UPSTREAM = {
+    "generate": "fit",
+    "classify": "generate",
+    "assemble": "classify",
+    "disaggregate": "generate",
+}
+
+
+@dataclass
+class StationPipeline:
+    """
+    Run load -> fit -> generate -> classify -> assemble -> disaggregate for many
+    stations on a process pool.
+
+    Every station gets its own bundle directory below output_dir holding the fitted
+    model parameters, the trajectories, the classified data and the scenarios as
+    binary ensemble stores, plus a bundle.json manifest. Sub-daily records are
+    modeled on their daily totals; with config.disaggregate the daily trajectories
+    are streamed back to the station's resolution into a sub_daily store, while daily
+    stations record the stage as not applicable. The manifest records a
+    fingerprint per completed stage, computed from the station file, the stage's
+    settings and the fingerprint of the stage it reads from. A rerun skips every stage whose
+    fingerprint is unchanged, so an interrupted batch resumes where it stopped and a
+    settings change only reruns the affected stages.
+
+    Attributes:
+        output_dir (str): Directory receiving one bundle per station.
+        config (PipelineConfig): Settings shared by all stations.
+        n_workers (int): Number of stations processed at the same time. Default is 1.
+        memory_limit (Optional[int]): Approximate memory budget in bytes for all
+            workers together. Trajectories are generated and classified in blocks
+            small enough to stay within it. None uses config.chunk_size.
+    """
+
+    output_dir: str
+    config: PipelineConfig = field(default_factory=PipelineConfig)
+    n_workers: int = 1
+    memory_limit: Optional[int] = None
+
+    def run(self, source: Union[str, Dict[str, str]]) -> pd.DataFrame:
+        """
+        Process every station of a directory, manifest or mapping.
+
+        A failing station is reported in the summary and does not stop the others.
+
+        Args:
+            source (Union[str, Dict[str, str]]): A directory of station CSV files, a
+                manifest CSV (see discover_stations) or a mapping of station names to
+                CSV paths.
+
+        Returns:
+            pd.DataFrame: Summary indexed by station with the status, the stages that
+                          ran, the run time and any error. Also written to summary.csv.
+        """
+        stations = self.discover_stations(source) if isinstance(source, str) else source
+        os.makedirs(self.output_dir, exist_ok=True)
+        chunk_size = self._chunk_size()
+        jobs = [
+            (self.output_dir, self.config, station, path, chunk_size)
+            for station, path in stations.items()
+        ]
+
+        rows = []
+        if self.n_workers <= 1:
+            rows = [_run_station(*job) for job in jobs]
+        else:
+            # Keep a bounded number of stations queued so that results of a large
+            # grid are collected while it runs.
+            with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                pending = set()
+                for job in jobs:
+                    pending.add(executor.submit(_run_station, *job))
+                    if len(pending) >= 2 * self.n_workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        rows.extend(future.result() for future in done)
+                rows.extend(future.result() for future in pending)
+
+        columns = ["station", "status", "stages_run", "seconds", "error"]
+        summary = pd.DataFrame(rows, columns=columns).set_index("station")
+        summary = summary.reindex(list(stations))
+        summary.to_csv(os.path.join(self.output_dir, "summary.csv"))
+        return summary
+
+    @staticmethod
+    def discover_stations(source: str) -> Dict[str, str]:
+        """
+        List the stations of a directory or manifest.
+
+        Args:
+            source (str): Either a directory, where every *.csv file is a station named
+                after the file, or a manifest CSV with a 'path' column and an optional
+                'station' column. Relative paths are resolved against the manifest's
+                directory.
+
+        Returns:
+            Dict[str, str]: Station names mapped to CSV paths.
+
+        Raises:
+            ValueError: If the manifest has no 'path' column or names a station twice.
+        """
+        if os.path.isdir(source):
+            paths = sorted(glob.glob(os.path.join(source, "*.csv")))
+            return {os.path.splitext(os.path.basename(p))[0]: p for p in paths}
+
+        manifest = pd.read_csv(source)
+        if "path" not in manifest.columns:
+            raise ValueError("The station manifest needs a 'path' column.")
+        root = os.path.dirname(os.path.abspath(source))
+        paths = [os.path.join(root, path) for path in manifest["path"]]
+        names = (
+            manifest["station"].astype(str).tolist()
+            if "station" in manifest.columns
+            else [os.path.splitext(os.path.basename(p))[0] for p in paths]
+        )
+        if len(set(names)) != len(names):
+            raise ValueError("The station manifest names a station twice.")
+        return dict(zip(names, paths))
+
+    def _chunk_size(self) -> int:
+        """
+        Number of trajectories per block that keeps all workers within memory_limit.
+
+        A block of float64 trajectories is held about three times at its peak: the
+        innovations, the filtered values and the DataFrame handed to the store.
+
+        Returns:
+            int: The block size, at least 1.
+        """
+        if self.memory_limit is None:
+            return self.config.chunk_size
+        per_trajectory = 3 * 8 * self.config.steps
+        budget = self.memory_limit // (max(self.n_workers, 1) * per_trajectory)
+        return int(max(1, min(self.config.chunk_size, budget)))
+
+
+def _run_station(
+    output_dir: str,
+    config: PipelineConfig,
+    station: str,
+    path: str,
+    chunk_size: int,
+) -> Dict[str, Any]:
+    """
+    Run the stages of one station that are not checkpointed yet.
+
+    Defined at module level so that it can run in worker processes.
+
+    Args:
+        output_dir (str): Directory of all bundles.
+        config (PipelineConfig): Pipeline settings.
+        station (str): Station name, used as the bundle directory name.
+        path (str): CSV file of the station.
+        chunk_size (int): Trajectories per block.
+
+    Returns:
+        Dict[str, Any]: Summary row of the station.
+    """
+    started = time.perf_counter()
+    stages_run: List[str] = []
+    try:
+        bundle = os.path.join(output_dir, station)
+        os.makedirs(bundle, exist_ok=True)
+        manifest = _read_manifest(bundle)
+        fingerprints = _fingerprints(config, path)
+        pending = [
+            stage
+            for stage in STAGES
+            if manifest["stages"].get(stage) != fingerprints[stage]
+            and not (stage == "assemble" and config.year_structure is None)
+            and not (stage == "disaggregate" and not config.disaggregate)
+        ]
+
+        if pending:
+            seed = int(
+                np.random.SeedSequence(
+                    [config.seed, zlib.crc32(station.encode())]
+                ).generate_state(1)[0]
+            )
+            data = TimeSeriesData.from_csv(path)
+            daily = data.to_daily()
+            series = daily.get_precipitation_series()
+            generator = ARMADataGenerator(
+                order=tuple(manifest.get("order") or config.order or (0, 0)),
+                steps=config.steps,
+                cache=ModelCache(os.path.join(bundle, "model")),
+            )
+            trajectories_path = os.path.join(bundle, "trajectories")
+            classified_path = os.path.join(bundle, "classified")
+            seasons = dict(config.seasons or DEFAULT_SEASONS)
+
+            for stage in pending:
+                if stage == "fit":
+                    if config.order is None:
+                        _, ranking = generator.auto_order(
+                            series, max_p=config.max_p, max_q=config.max_q
+                        )
+                        ranking.to_csv(os.path.join(bundle, "order_ranking.csv"))
+                    else:
+                        generator.order = tuple(config.order)
+                        generator.fit(series)
+                    manifest["order"] = list(generator.order)
+
+                elif stage == "generate":
+                    if generator.model is None:
+                        generator.fit(series)  # Cache hit of the fit stage
+                    EnsembleStore(trajectories_path).write_iter(
+                        generator.generate_iter(
+                            config.n_trajectories, chunk_size=chunk_size, seed=seed
+                        ),
+                        attributes={"order": manifest["order"], "seed": seed},
+                    )
+
+                elif stage == "classify":
+                    trajectories = EnsembleStore(trajectories_path).read(mmap=True)
+                    classifier = PrecipitationClassifier(seasons=seasons)
+                    classified = classifier.classify_precipitation(
+                        (
+                            trajectories.iloc[:, start : start + chunk_size]
+                            for start in range(0, trajectories.shape[1], chunk_size)
+                        ),
+                        by_year=config.by_year,
+                    )
+                    classifier.save_classified_data(
+                        classified, classified_path, file_format="npy"
+                    )
+
+                elif stage == "assemble":
+                    weather_generator = WeatherGenerator(
+                        EnsembleStore(trajectories_path).read(mmap=True),
+                        PrecipitationClassifier.load_classified_data(classified_path),
+                        seasons=seasons,
+                    )
+                    scenarios = weather_generator.generate_weather_batch(
+                        [
+                            [tuple(segment) for segment in year]
+                            for year in config.year_structure
+                        ],
+                        n_scenarios=config.n_scenarios,
+                        seed=seed,
+                    )
+                    scenarios_path = os.path.join(bundle, "scenarios")
+                    if config.output_format == "csv":
+                        scenarios_path += ".csv"
+                    weather_generator.save_scenario(
+                        scenarios, scenarios_path, file_format=config.output_format
+                    )
+
+                elif stage == "disaggregate":
+                    if daily is data:
+                        # Daily or coarser records have nothing to disaggregate to
+                        manifest["not_applicable"] = sorted(
+                            set(manifest.get("not_applicable", [])) | {stage}
+                        )
+                        manifest["stages"][stage] = fingerprints[stage]
+                        _write_manifest(bundle, manifest)
+                        continue
+                    disaggregator = FragmentDisaggregator()
+                    disaggregator.fit(data.get_precipitation_series())
+                    # A block of sub-daily trajectories is steps_per_day times larger
+                    EnsembleStore(os.path.join(bundle, "sub_daily")).write_iter(
+                        disaggregator.disaggregate_iter(
+                            EnsembleStore(trajectories_path).read(mmap=True),
+                            chunk_size=max(
+                                1, chunk_size // disaggregator.steps_per_day
+                            ),
+                            seed=seed,
+                        ),
+                        attributes={
+                            "steps_per_day": disaggregator.steps_per_day,
+                            "seed": seed,
+                        },
+                    )
+
+                manifest["stages"][stage] = fingerprints[stage]
+                _write_manifest(bundle, manifest)
+                stages_run.append(stage)
+
+        status, error = "done", None
+    except Exception as exc:  # One bad station must not stop the batch
+        status, error = "failed", f"{type(exc).__name__}: {exc}"
+
+    return {
+        "station": station,
+        "status": status,
+        "stages_run": ",".join(stages_run),
+        "seconds": round(time.perf_counter() - started, 3),
+        "error": error,
+    }
+
+
+def _fingerprints(config: PipelineConfig, path: str) -> Dict[str, str]:
+    """
+    Chain the fingerprints of all stages, starting from the content of the station
+    file. Every stage is chained onto the stage whose output it reads.
+
+    Args:
+        config (PipelineConfig): Pipeline settings.
+        path (str): CSV file of the station.
+
+    Returns:
+        Dict[str, str]: Fingerprint of every stage.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(block)
+
+    fingerprints = {}
+    for stage in STAGES:
+        upstream = fingerprints.get(_UPSTREAM.get(stage), digest.hexdigest())
+        fingerprints[stage] = ModelCache.make_key(
+            stage, upstream, config.stage_settings(stage)
+        )
+    return fingerprints
+
+
+def _read_manifest(bundle: str) -> Dict[str, Any]:
+    """
+    Read the manifest of a bundle, or start an empty one.
+
+    Args:
+        bundle (str): Bundle directory.
+
+    Returns:
+        Dict[str, Any]: The manifest with the completed stages, the chosen order and
+            the stages that do not apply to the station.
+    """
+    try:
+        with open(os.path.join(bundle, "bundle.json")) as fp:
+            return json.load(fp)
+    except FileNotFoundError:
+        return {"stages": {}, "order": None, "not_applicable": []}
+
+
+def _write_manifest(bundle: str, manifest: Dict[str, Any]) -> None:
+    """
+    Replace the manifest of a bundle atomically, so that an interrupted write never
+    marks a stage as completed.
+
+    Args:
+        bundle (str): Bundle directory.
+        manifest (Dict[str, Any]): The manifest to write.
+    """
+    temporary = os.path.join(bundle, "bundle.json.tmp")
+    with open(temporary, "w") as fp:
+        json.dump(manifest, fp, indent=2)
+    os.replace(temporary, os.path.join(bundle, "bundle.json"))
@@ -0,0 +1,5 @@
+# service/__init__.py
+
+from .scenario_server import ScenarioServer, ScenarioClient
+
+__all__ = ["ScenarioServer", "ScenarioClient"]
@@ -0,0 +1,495 @@
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..data.ensemble_store import EnsembleStore
+from ..generators.weather_generator import WeatherGenerator
+from ..utils.instrumentation import stage
+from ..utils.precipitation_classifier import PrecipitationClassifier
+
+# Largest request or response header line read from a connection
+_LINE_LIMIT = 2**20
+
+YearStructure = Union[List[Tuple[str, str]], List[List[Tuple[str, str]]]]
+
+
+@dataclass
+class _Request:
+    segments: Tuple[Tuple[str, str], ...]
+    n_scenarios: int
+    seed: Optional[int]
+    future: asyncio.Future
+
+
+@dataclass
+class ScenarioServer:
+    """
+    A long-running asyncio service answering weather scenario requests.
+
+    The trajectories and their classification are loaded once into a WeatherGenerator,
+    memory-mapped when read from a bundle, so every server process started on the same
+    bundle shares the segment pool through the page cache. Requests arriving within
+    batch_window of each other are assembled together: requests with the same
+    segments are merged into one WeatherGenerator assembly. Seeded results are kept
+    in an LRU cache of cache_size entries. A seeded request gives the same scenarios as
+    WeatherGenerator.generate_weather_batch with the same arguments.
+
+    Clients talk JSON lines over TCP or a Unix socket. A request such as
+
+        {"id": 1, "year_structure": [["Winter", "wet"], ["Summer", "dry"]],
+         "num_years": 3, "n_scenarios": 1, "seed": 7}
+
+    is answered with a header line {"id": 1, "shape": [n_days, n_scenarios],
+    "dtype": "<f8"} followed by the raw bytes of the scenario array in C order, or
+    with the single line {"id": 1, "error": "..."}. Sending the array as bytes keeps
+    responses a memory copy away from the assembled scenarios instead of formatting
+    every value as text. A connection may send many requests without waiting;
+    responses carry the id of their request and may arrive out of order.
+
+    Attributes:
+        generator (WeatherGenerator): The segment pool.
+        cache_size (int): Number of assembled results kept. Default is 256.
+        max_batch (int): Largest number of requests assembled together. Default is 64.
+        batch_window (float): Seconds to wait for more requests before assembling a
+            batch. Default is 0.002.
+        stats (Dict[str, int]): Counts of requests, cache hits and assembled batches.
+    """
+
+    generator: WeatherGenerator
+    cache_size: int = 256
+    max_batch: int = 64
+    batch_window: float = 0.002
+    stats: Dict[str, int] = field(
+        default_factory=lambda: {"requests": 0, "cache_hits": 0, "batches": 0}
+    )
+    _cache: "OrderedDict[Tuple, np.ndarray]" = field(
+        init=False, default_factory=OrderedDict, repr=False
+    )
+    _queue: Optional[asyncio.Queue] = field(init=False, default=None, repr=False)
+    _batcher: Optional[asyncio.Task] = field(init=False, default=None, repr=False)
+
+    @classmethod
+    def from_bundle(cls, bundle: str, **kwargs: Any) -> "ScenarioServer":
+        """
+        Serve the trajectories and classification of a StationPipeline bundle.
+
+        Args:
+            bundle (str): Bundle directory with 'trajectories' and 'classified' stores.
+            **kwargs (Any): Further ScenarioServer or WeatherGenerator settings, e.g.
+                cache_size or seasons.
+
+        Returns:
+            ScenarioServer: The server, not started yet.
+        """
+        seasons = kwargs.pop("seasons", None)
+        trajectories = EnsembleStore(os.path.join(bundle, "trajectories")).read(
+            mmap=True
+        )
+        classified = PrecipitationClassifier.load_classified_data(
+            os.path.join(bundle, "classified")
+        )
+        generator = (
+            WeatherGenerator(trajectories, classified, seasons=seasons)
+            if seasons is not None
+            else WeatherGenerator(trajectories, classified)
+        )
+        return cls(generator, **kwargs)
+
+    async def generate(
+        self,
+        year_structure: YearStructure,
+        num_years: int = 1,
+        n_scenarios: int = 1,
+        seed: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Assemble scenarios through the batch queue and the cache.
+
+        Args:
+            year_structure (YearStructure): A single or multi-year structure, as for
+                WeatherGenerator.generate_weather.
+            num_years (int): Number of years of a single year structure. Default is 1.
+            n_scenarios (int): Number of scenarios. Default is 1.
+            seed (Optional[int]): Seed for the segment choices. Only seeded results
+                are cached.
+
+        Returns:
+            np.ndarray: Array of shape (n_days, n_scenarios), with a trailing variable
+                        axis for multivariate trajectories. Cached arrays are shared and
+                        read-only.
+
+        Raises:
+            ValueError: If the request is invalid or a segment has no match.
+        """
+        if n_scenarios < 1:
+            raise ValueError("n_scenarios must be at least 1.")
+        segments = tuple(
+            self.generator.resolve_segments(_as_pairs(year_structure), num_years)
+        )
+
+        self.stats["requests"] += 1
+        key = (segments, n_scenarios, seed)
+        if seed is not None and key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return self._cache[key]
+
+        self._ensure_batcher()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Request(segments, n_scenarios, seed, future))
+        result = await future
+        if seed is not None:
+            result.flags.writeable = False
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    async def start(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        path: Optional[str] = None,
+    ) -> asyncio.AbstractServer:
+        """
+        Start listening for clients.
+
+        Args:
+            host (str): Interface of the TCP server. Default is "127.0.0.1".
+            port (int): Port of the TCP server, 0 for a free one. Default is 0.
+            path (Optional[str]): Path of a Unix socket to listen on instead of TCP.
+
+        Returns:
+            asyncio.AbstractServer: The listening server, e.g. to read the port from
+                its sockets or to close it.
+        """
+        self._ensure_batcher()
+        if path is not None:
+            return await asyncio.start_unix_server(
+                self._handle_client, path=path, limit=_LINE_LIMIT
+            )
+        return await asyncio.start_server(
+            self._handle_client, host, port, limit=_LINE_LIMIT
+        )
+
+    async def serve_forever(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        path: Optional[str] = None,
+    ) -> None:
+        """
+        Start the server and answer requests until cancelled.
+
+        Args:
+            host (str): Interface of the TCP server. Default is "127.0.0.1".
+            port (int): Port of the TCP server. Default is 0.
+            path (Optional[str]): Path of a Unix socket to listen on instead of TCP.
+        """
+        server = await self.start(host, port, path)
+        async with server:
+            await server.serve_forever()
+
+    def _ensure_batcher(self) -> None:
+        """
+        Start the batching task in the running event loop if it is not running.
+        """
+        if self._batcher is None or self._batcher.done():
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.get_running_loop().create_task(self._run_batches())
+
+    async def _run_batches(self) -> None:
+        """
+        Collect queued requests into batches and assemble each batch in a worker
+        thread, so that the event loop keeps accepting requests meanwhile.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            groups: Dict[Tuple[Tuple[str, str], ...], List[_Request]] = {}
+            for request in batch:
+                groups.setdefault(request.segments, []).append(request)
+            self.stats["batches"] += 1
+
+            for segments, requests in groups.items():
+                try:
+                    results = await loop.run_in_executor(
+                        None, self._assemble_group, segments, requests
+                    )
+                except Exception as exc:
+                    for request in requests:
+                        if not request.future.done():
+                            request.future.set_exception(exc)
+                    continue
+                for request, result in zip(requests, results):
+                    if not request.future.done():
+                        request.future.set_result(result)
+
+    def _assemble_group(
+        self, segments: Tuple[Tuple[str, str], ...], requests: List[_Request]
+    ) -> List[np.ndarray]:
+        """
+        Assemble all requests sharing the same segments in one call.
+
+        Args:
+            segments (Tuple[Tuple[str, str], ...]): The (season, condition) pairs.
+            requests (List[_Request]): The requests.
+
+        Returns:
+            List[np.ndarray]: The scenarios of every request.
+        """
+        seed_sequences = []
+        for request in requests:
+            seed_sequences.extend(
+                np.random.SeedSequence(request.seed).spawn(request.n_scenarios)
+            )
+        with stage("service.assemble", requests=str(len(requests))) as record:
+            scenarios = self.generator.assemble(list(segments), seed_sequences)
+            if record is not None:
+                record.items = scenarios.size
+
+        bounds = np.cumsum([0] + [request.n_scenarios for request in requests])
+        # Contiguous copies, so that a cached result does not keep the whole batch
+        # alive and can be sent as is
+        return [
+            np.ascontiguousarray(scenarios[:, start:stop])
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Answer the JSON-line requests of one connection concurrently.
+
+        Args:
+            reader (asyncio.StreamReader): The incoming stream.
+            writer (asyncio.StreamWriter): The outgoing stream.
+        """
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.ensure_future(self._answer(line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            writer.close()
+
+    async def _answer(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        """
+        Answer one request line.
+
+        Args:
+            line (bytes): The JSON request.
+            writer (asyncio.StreamWriter): The outgoing stream.
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            scenarios = await self.generate(
+                request["year_structure"],
+                num_years=int(request.get("num_years", 1)),
+                n_scenarios=int(request.get("n_scenarios", 1)),
+                seed=request.get("seed"),
+            )
+            header = {
+                "id": request_id,
+                "shape": scenarios.shape,
+                "dtype": scenarios.dtype.str,
+            }
+        except Exception as exc:  # A bad request must not stop the connection
+            header = {"id": request_id, "error": f"{type(exc).__name__}: {exc}"}
+            scenarios = None
+        # Header and payload are written without yielding, so that the responses of
+        # concurrent requests do not interleave
+        writer.write(json.dumps(header).encode() + b"\n")
+        if scenarios is not None:
+            writer.write(memoryview(scenarios).cast("B"))
+        await writer.drain()
+
+
+def _as_pairs(year_structure: YearStructure) -> YearStructure:
+    """
+    Turn the [season, condition] lists of a decoded JSON request back into tuples, so
+    that a single year structure is not mistaken for a multi-year one.
+
+    Args:
+        year_structure (YearStructure): A single or multi-year structure.
+
+    Returns:
+        YearStructure: The structure with (season, condition) tuples.
+
+    Raises:
+        ValueError: If the structure is empty or malformed.
+    """
+    try:
+        if isinstance(year_structure[0][0], str):
+            return [
+                (str(season), str(condition)) for season, condition in year_structure
+            ]
+        return [
+            [(str(season), str(condition)) for season, condition in year]
+            for year in year_structure
+        ]
+    except (IndexError, TypeError, ValueError):
+        raise ValueError(
+            "year_structure must be a list of (season, condition) pairs or a list of "
+            "such lists."
+        ) from None
+
+
+@dataclass
+class ScenarioClient:
+    """
+    An asyncio client of ScenarioServer that can have many requests in flight on one
+    connection.
+
+    Attributes:
+        reader (asyncio.StreamReader): The incoming stream.
+        writer (asyncio.StreamWriter): The outgoing stream.
+    """
+
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    _pending: Dict[int, asyncio.Future] = field(
+        init=False, default_factory=dict, repr=False
+    )
+    _next_id: int = field(init=False, default=0, repr=False)
+    _listener: Optional[asyncio.Task] = field(init=False, default=None, repr=False)
+
+    @classmethod
+    async def connect(
+        cls,
+        host: str = "127.0.0.1",
+        port: Optional[int] = None,
+        path: Optional[str] = None,
+    ) -> "ScenarioClient":
+        """
+        Open a connection to a server.
+
+        Args:
+            host (str): Host of a TCP server. Default is "127.0.0.1".
+            port (Optional[int]): Port of a TCP server.
+            path (Optional[str]): Path of a Unix socket, used instead of TCP.
+
+        Returns:
+            ScenarioClient: The connected client.
+
+        Raises:
+            ValueError: If neither a port nor a path is given.
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path, limit=_LINE_LIMIT)
+        elif port is not None:
+            reader, writer = await asyncio.open_connection(
+                host, port, limit=_LINE_LIMIT
+            )
+        else:
+            raise ValueError("Give the port of a TCP server or the path of a socket.")
+        client = cls(reader, writer)
+        client._listener = asyncio.get_running_loop().create_task(client._listen())
+        return client
+
+    async def request(
+        self,
+        year_structure: YearStructure,
+        num_years: int = 1,
+        n_scenarios: int = 1,
+        seed: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Request scenarios.
+
+        Args:
+            year_structure (YearStructure): A single or multi-year structure.
+            num_years (int): Number of years of a single year structure. Default is 1.
+            n_scenarios (int): Number of scenarios. Default is 1.
+            seed (Optional[int]): Seed for the segment choices.
+
+        Returns:
+            np.ndarray: Read-only array of shape (n_days, n_scenarios), with a trailing
+                        variable axis for multivariate trajectories.
+
+        Raises:
+            ValueError: If the server rejects the request.
+        """
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        message = {
+            "id": request_id,
+            "year_structure": year_structure,
+            "num_years": num_years,
+            "n_scenarios": n_scenarios,
+            "seed": seed,
+        }
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+
+        response = await future
+        if isinstance(response, str):
+            raise ValueError(response)
+        return response
+
+    async def close(self) -> None:
+        """
+        Close the connection.
+        """
+        self.writer.close()
+        await self.writer.wait_closed()
+        if self._listener is not None:
+            self._listener.cancel()
+
+    async def _listen(self) -> None:
+        """
+        Route responses to the requests waiting for them.
+        """
+        error: Exception = ConnectionError("The server closed the connection.")
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                header = json.loads(line)
+                if "error" in header:
+                    response = header["error"]
+                else:
+                    dtype, shape = np.dtype(header["dtype"]), header["shape"]
+                    payload = await self.reader.readexactly(
+                        dtype.itemsize * int(np.prod(shape))
+                    )
+                    response = np.frombuffer(payload, dtype).reshape(shape)
+                future = self._pending.pop(header.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except Exception as exc:  # Unreadable response, fail the waiting requests
+            error = exc
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
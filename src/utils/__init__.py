@@ -3,5 +3,27 @@
 from .weather_requirement import WeatherRequirement
 from .precipitation_classifier import PrecipitationClassifier
 from .synthetic_data_validator import SyntheticDataValidator
+from .quantile_sketch import QuantileSketch
+from .model_cache import ModelCache
+from .instrumentation import (
+    MetricsCollector,
+    StageRecord,
+    add_hook,
+    collect,
+    remove_hook,
+    stage,
+)
 
-__all__ = ["WeatherRequirement", "PrecipitationClassifier", "SyntheticDataValidator"]
+__all__ = [
+    "WeatherRequirement",
+    "PrecipitationClassifier",
+    "SyntheticDataValidator",
+    "QuantileSketch",
+    "ModelCache",
+    "MetricsCollector",
+    "StageRecord",
+    "add_hook",
+    "collect",
+    "remove_hook",
+    "stage",
+]
@@ -0,0 +1,252 @@
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Registered hooks with their memory tracing flag
+_hooks: List[Tuple[Callable[["StageRecord"], None], bool]] = []
+_started_tracing = False
+_lock = threading.Lock()
+# Per-thread peaks of the enclosing stages, since tracemalloc has a single peak
+_local = threading.local()
+
+
+@dataclass
+class StageRecord:
+    """
+    Measurement of one run of an instrumented stage.
+
+    Attributes:
+        name (str): Stage name, e.g. 'arma.generate'.
+        duration (float): Wall time in seconds.
+        items (int): Number of items processed, e.g. trajectory-days.
+        peak_memory (Optional[int]): Peak traced allocation in bytes, None when no
+            hook asked for memory tracing.
+        labels (Dict[str, str]): Extra labels, e.g. the method used.
+    """
+
+    name: str
+    duration: float = 0.0
+    items: int = 0
+    peak_memory: Optional[int] = None
+    labels: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """
+        Items processed per second.
+
+        Returns:
+            float: items / duration, 0 when the duration is 0.
+        """
+        return self.items / self.duration if self.duration > 0 else 0.0
+
+
+def add_hook(hook: Callable[[StageRecord], None], trace_memory: bool = False) -> None:
+    """
+    Register a callback receiving a StageRecord after every instrumented stage.
+
+    Args:
+        hook (Callable[[StageRecord], None]): The callback, e.g. a MetricsCollector.
+        trace_memory (bool): Trace peak allocations with tracemalloc while the hook is
+            registered. This slows down allocation-heavy code. Default is False.
+    """
+    global _started_tracing
+    with _lock:
+        _hooks.append((hook, trace_memory))
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+
+
+def remove_hook(hook: Callable[[StageRecord], None]) -> None:
+    """
+    Unregister a callback.
+
+    Args:
+        hook (Callable[[StageRecord], None]): A callback registered with add_hook.
+    """
+    global _started_tracing
+    with _lock:
+        _hooks[:] = [entry for entry in _hooks if entry[0] is not hook]
+        # Only stop tracing that was started here, not the caller's own
+        if _started_tracing and not _traces_memory():
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+def _traces_memory() -> bool:
+    """
+    Whether any registered hook asked for memory tracing.
+
+    Returns:
+        bool: True if peak allocations are traced.
+    """
+    return any(trace_memory for _, trace_memory in _hooks)
+
+
+@contextmanager
+def stage(name: str, items: int = 0, **labels: str) -> Iterator[Optional[StageRecord]]:
+    """
+    Measure a block of code and pass the record to the registered hooks.
+
+    Without hooks the block runs unmeasured and None is yielded, so instrumentation
+    costs a single list check.
+
+    Args:
+        name (str): Stage name.
+        items (int): Number of items processed. Can also be set on the yielded record.
+        **labels (str): Extra labels of the record.
+
+    Yields:
+        Optional[StageRecord]: The record being filled, or None without hooks.
+    """
+    if not _hooks:
+        yield None
+        return
+
+    record = StageRecord(name, items=items, labels=labels)
+    trace_memory = _traces_memory() and tracemalloc.is_tracing()
+    if trace_memory:
+        peaks = _local.__dict__.setdefault("peaks", [])
+        baseline, peak = tracemalloc.get_traced_memory()
+        if peaks:
+            peaks[-1] = max(peaks[-1], peak)
+        peaks.append(baseline)
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.duration = time.perf_counter() - start
+        if trace_memory:
+            peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+            record.peak_memory = peak - baseline
+            if peaks:
+                peaks[-1] = max(peaks[-1], peak)
+        for hook, _ in list(_hooks):
+            hook(record)
+
+
+@contextmanager
+def collect(trace_memory: bool = False) -> Iterator["MetricsCollector"]:
+    """
+    Collect the stage records of a block of code.
+
+    Args:
+        trace_memory (bool): Trace peak allocations. Default is False.
+
+    Yields:
+        MetricsCollector: The collector, registered as a hook for the block.
+    """
+    collector = MetricsCollector(keep_records=True)
+    add_hook(collector, trace_memory=trace_memory)
+    try:
+        yield collector
+    finally:
+        remove_hook(collector)
+
+
+@dataclass
+class MetricsCollector:
+    """
+    A hook aggregating stage records per stage name, with JSON and Prometheus text
+    exporters.
+
+    Attributes:
+        keep_records (bool): Also keep every individual record. Default is False.
+        records (List[StageRecord]): The individual records, when kept.
+        totals (Dict[str, Dict[str, Any]]): Per-stage count, total duration, total
+            items and maximum peak memory.
+    """
+
+    keep_records: bool = False
+    records: List[StageRecord] = field(default_factory=list)
+    totals: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def __call__(self, record: StageRecord) -> None:
+        """
+        Add a record to the aggregates.
+
+        Args:
+            record (StageRecord): The finished stage.
+        """
+        if self.keep_records:
+            self.records.append(record)
+        totals = self.totals.setdefault(
+            record.name, {"count": 0, "seconds": 0.0, "items": 0, "peak_memory": None}
+        )
+        totals["count"] += 1
+        totals["seconds"] += record.duration
+        totals["items"] += record.items
+        if record.peak_memory is not None:
+            totals["peak_memory"] = max(totals["peak_memory"] or 0, record.peak_memory)
+
+    def to_json(self) -> str:
+        """
+        Export the aggregates, and the records when kept, as JSON.
+
+        Returns:
+            str: JSON document with 'stages' and 'records'.
+        """
+        stages = {
+            name: {
+                **totals,
+                "throughput": (
+                    totals["items"] / totals["seconds"]
+                    if totals["seconds"] > 0
+                    else 0.0
+                ),
+            }
+            for name, totals in self.totals.items()
+        }
+        records = [
+            {**asdict(record), "throughput": record.throughput}
+            for record in self.records
+        ]
+        return json.dumps({"stages": stages, "records": records}, indent=2)
+
+    def to_prometheus(self, prefix: str = "precipgen") -> str:
+        """
+        Export the aggregates in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): Prefix of the metric names. Default is 'precipgen'.
+
+        Returns:
+            str: The metrics, one sample per line.
+        """
+        metrics = [
+            ("stage_runs_total", "counter", "Number of runs of the stage.", "count"),
+            (
+                "stage_seconds_total",
+                "counter",
+                "Wall time spent in the stage.",
+                "seconds",
+            ),
+            ("stage_items_total", "counter", "Items processed by the stage.", "items"),
+            (
+                "stage_peak_memory_bytes",
+                "gauge",
+                "Largest peak allocation of a run of the stage.",
+                "peak_memory",
+            ),
+        ]
+        lines = []
+        for metric, kind, description, key in metrics:
+            lines.append(f"# HELP {prefix}_{metric} {description}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name, totals in sorted(self.totals.items()):
+                if totals[key] is not None:
+                    lines.append(f'{prefix}_{metric}{{stage="{name}"}} {totals[key]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """
+        Forget all records and aggregates.
+        """
+        self.records.clear()
+        self.totals.clear()
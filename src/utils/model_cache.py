@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from importlib import metadata
+from typing import Any, Dict, Iterable, Optional
+
+import pandas as pd
+
+from ..data.ensemble_store import EnsembleStore
+
+_VERSIONED_PACKAGES = ("numpy", "pandas", "scipy", "statsmodels", "scikit-learn")
+
+
+@dataclass
+class ModelCache:
+    """
+    A content-addressed disk cache for fitted model parameters and generated ensembles.
+
+    Every entry is a directory named after the hash of its inputs. Entries are
+    evicted least recently used first once the cache grows beyond max_bytes.
+
+    Attributes:
+        directory (str): Root directory of the cache.
+        max_bytes (Optional[int]): Size limit of the cache. None disables eviction.
+    """
+
+    directory: str
+    max_bytes: Optional[int] = None
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Hash the given inputs, together with the versions of the numerical libraries,
+        into a cache key.
+
+        Args:
+            *parts (Any): Bytes, arrays, pandas objects or JSON-serializable values.
+
+        Returns:
+            str: A hexadecimal SHA-256 digest.
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            if isinstance(part, (pd.Series, pd.DataFrame, pd.Index)):
+                part = pd.util.hash_pandas_object(part, index=True).to_numpy()
+            if hasattr(part, "tobytes"):
+                part = part.tobytes()
+            if not isinstance(part, bytes):
+                part = json.dumps(part, sort_keys=True, default=str).encode()
+            digest.update(len(part).to_bytes(8, "little"))
+            digest.update(part)
+        digest.update(json.dumps(_library_versions(), sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def get_params(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up cached model parameters.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached parameters, or None on a miss.
+        """
+        path = os.path.join(self._entry(key), "params.json")
+        if not os.path.isfile(path):
+            return None
+        self._touch(key)
+        with open(path) as fp:
+            return json.load(fp)
+
+    def put_params(self, key: str, params: Dict[str, Any]) -> None:
+        """
+        Store model parameters.
+
+        Args:
+            key (str): Cache key.
+            params (Dict[str, Any]): JSON-serializable parameters.
+        """
+        os.makedirs(self._entry(key), exist_ok=True)
+        with open(os.path.join(self._entry(key), "params.json"), "w") as fp:
+            json.dump(params, fp)
+        self.evict()
+
+    def get_ensemble(self, key: str, mmap: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Look up a cached ensemble.
+
+        Args:
+            key (str): Cache key.
+            mmap (bool): Memory-map the ensemble instead of reading it. Default is False.
+
+        Returns:
+            Optional[pd.DataFrame]: The cached ensemble, or None on a miss.
+        """
+        if not EnsembleStore.exists(self._entry(key)):
+            return None
+        self._touch(key)
+        return EnsembleStore(self._entry(key)).read(mmap=mmap)
+
+    def put_ensemble(
+        self,
+        key: str,
+        data: pd.DataFrame,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Store an ensemble.
+
+        Args:
+            key (str): Cache key.
+            data (pd.DataFrame): The ensemble to store.
+            attributes (Optional[Dict[str, Any]]): Metadata kept with the ensemble.
+        """
+        EnsembleStore(self._entry(key)).write(data, attributes=attributes)
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits into max_bytes.
+        """
+        if self.max_bytes is None or not os.path.isdir(self.directory):
+            return
+
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path):
+                entries.append((os.path.getmtime(path), _size(path), path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Remove every entry of the cache.
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _touch(self, key: str) -> None:
+        os.utime(self._entry(key))
+
+
+def _library_versions(packages: Iterable[str] = _VERSIONED_PACKAGES) -> Dict[str, str]:
+    """
+    Versions of the libraries whose numerical results are cached.
+
+    Args:
+        packages (Iterable[str]): Distribution names.
+
+    Returns:
+        Dict[str, str]: Installed version of every package, or "missing".
+    """
+    versions = {}
+    for package in packages:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = "missing"
+    return versions
+
+
+def _size(path: str) -> int:
+    """
+    Total size of the files below a directory.
+
+    Args:
+        path (str): Directory to measure.
+
+    Returns:
+        int: Size in bytes.
+    """
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    )
@@ -0,0 +1,22 @@
+from types import ModuleType
+
+
+def load_pyplot() -> ModuleType:
+    """
+    Import matplotlib.pyplot on first use.
+
+    Plotting is optional, so matplotlib is only imported by the methods that draw,
+    keeping it out of the import of the generation and classification code and of
+    worker processes.
+
+    Returns:
+        ModuleType: The matplotlib.pyplot module.
+
+    Raises:
+        ImportError: If matplotlib is not installed.
+    """
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        raise ImportError("Matplotlib is required for plotting. Please install it.")
+    return plt
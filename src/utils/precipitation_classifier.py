@@ -1,8 +1,15 @@
+import logging
 from dataclasses import dataclass, field
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Union, Tuple, Optional
+from ..data.ensemble_store import EnsembleStore
+from ..data.season_calendar import DEFAULT_SEASONS, SeasonCalendar
+from .instrumentation import stage
+from .plotting import load_pyplot
+from .quantile_sketch import QuantileSketch
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -13,62 +20,384 @@ class PrecipitationClassifier:
     Attributes:
         categories (List[str]): List of precipitation categories from driest to wettest.
         seasons (Dict[str, List[int]]): Dictionary mapping season names to their respective months.
+        thresholds (Optional[Dict[str, np.ndarray]]): Frozen category thresholds per season.
+            When set, they are used instead of the percentiles of the classified data.
+        thresholds_by_year (Optional[bool]): Whether the frozen thresholds were computed
+            from per-year seasonal totals. Data is only classified against them on the
+            same basis. None for thresholds set by hand, which apply to either basis.
+        sketches (Dict[str, QuantileSketch]): Running quantile sketches of the seasonal
+            totals seen by update_thresholds.
+        sketches_by_year (Optional[bool]): Whether the sketches summarize per-year
+            seasonal totals, None while they are empty.
     """
 
     categories: List[str] = field(
         default_factory=lambda: ["very_dry", "dry", "normal", "wet", "very_wet"]
     )
-    seasons: Dict[str, List[int]] = field(
-        default_factory=lambda: {
-            "Winter": [12, 1, 2],
-            "Spring": [3, 4, 5],
-            "Summer": [6, 7, 8],
-            "Fall": [9, 10, 11],
-        }
-    )
+    seasons: Dict[str, List[int]] = field(default_factory=lambda: dict(DEFAULT_SEASONS))
 
-    def classify_precipitation(self, data: pd.DataFrame) -> pd.DataFrame:
+    thresholds: Optional[Dict[str, np.ndarray]] = None
+    thresholds_by_year: Optional[bool] = None
+    sketches: Dict[str, QuantileSketch] = field(default_factory=dict)
+    sketches_by_year: Optional[bool] = None
+
+    def classify_precipitation(
+        self, data: Union[pd.DataFrame, Iterable[pd.DataFrame]], by_year: bool = True
+    ) -> pd.DataFrame:
         """
         Classify precipitation data for each season based on the defined categories.
 
         Args:
-            data (pd.DataFrame): DataFrame with date index and precipitation data in columns.
+            data (Union[pd.DataFrame, Iterable[pd.DataFrame]]): DataFrame with date index
+                and precipitation data in columns, or a stream of such blocks
+                (e.g. from ARMADataGenerator.generate_iter). Multivariate data with
+                (variable, simulation) columns is classified by its precipitation.
+            by_year (bool): Classify every season of every year separately instead of
+                            the season totals over the whole simulation. Default is True.
 
         Returns:
-            pd.DataFrame: Classified data with seasons as columns and simulations as rows.
+            pd.DataFrame: Classified data with seasons as columns and simulations as rows,
+                          or (simulation, year) rows when by_year is True. Seasons that
+                          are not fully covered by the data are left missing. Columns
+                          are ordered categoricals over the defined categories.
+
+        Raises:
+            ValueError: If the thresholds were frozen on the other basis.
         """
-        seasonal_data = self._get_seasonal_data(data)
-        classified_data = pd.DataFrame(index=data.columns, columns=self.seasons.keys())
+        with stage("classifier.classify", by_year=str(by_year)) as record:
+            rows, totals = self.seasonal_totals(data, by_year=by_year)
+            if record is not None:
+                record.items = totals.size
+            return self._to_frame(rows, self.classify_totals(totals, by_year))
+
+    def classify_iter(
+        self, data: Iterable[pd.DataFrame], by_year: bool = True
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Classify a stream of blocks as they arrive, using the frozen thresholds.
 
-        for season, season_data in seasonal_data.items():
-            percentiles = np.linspace(0, 100, len(self.categories) + 1)[1:-1]
-            thresholds = np.percentile(season_data.values, percentiles)
+        Args:
+            data (Iterable[pd.DataFrame]): Stream of precipitation blocks.
+            by_year (bool): Classify every season of every year separately. Default is True.
+
+        Yields:
+            pd.DataFrame: The classified data of each block.
+
+        Raises:
+            ValueError: If the thresholds have not been frozen or were frozen on the
+                        other basis.
+        """
+        if self.thresholds is None:
+            raise ValueError(
+                "Thresholds are not frozen. Call freeze_thresholds() first."
+            )
+        thresholds = self.frozen_thresholds(by_year)
+        for chunk in data:
+            rows, totals = self.seasonal_totals(chunk, by_year=by_year)
+            yield self._to_frame(rows, self._classify_totals(totals, thresholds))
+
+    def update_thresholds(self, data: pd.DataFrame, by_year: bool = True) -> None:
+        """
+        Add the seasonal totals of a block of trajectories to the running sketches.
 
-            def classify_value(value):
-                for i, threshold in enumerate(thresholds):
-                    if value <= threshold:
-                        return self.categories[i]
-                return self.categories[-1]
+        Args:
+            data (pd.DataFrame): A block of precipitation data.
+            by_year (bool): Summarize per-year seasonal totals. Default is True.
 
-            classified_data[season] = season_data.apply(classify_value)
+        Raises:
+            ValueError: If the sketches already summarize totals on the other basis.
+        """
+        self._check_basis("The sketches", self.sketches_by_year, by_year)
+        self.sketches_by_year = by_year
+        _, totals = self.seasonal_totals(data, by_year=by_year)
+        for i, season in enumerate(self.seasons):
+            self.sketches.setdefault(season, QuantileSketch()).update(totals[:, i])
 
-        return classified_data
+    def merge_sketches(self, other: "PrecipitationClassifier") -> None:
+        """
+        Merge the running sketches of another classifier, e.g. built on another worker.
+
+        Args:
+            other (PrecipitationClassifier): Classifier whose sketches are merged in.
+
+        Raises:
+            ValueError: If the sketches summarize totals on different bases.
+        """
+        if other.sketches_by_year is not None:
+            self._check_basis(
+                "The sketches", self.sketches_by_year, other.sketches_by_year
+            )
+            self.sketches_by_year = other.sketches_by_year
+        for season, sketch in other.sketches.items():
+            own = self.sketches.get(season)
+            self.sketches[season] = sketch.merge(own) if own is not None else sketch
+
+    def current_thresholds(self) -> Dict[str, np.ndarray]:
+        """
+        Category thresholds estimated from the running sketches.
+
+        Returns:
+            Dict[str, np.ndarray]: Thresholds per season, from driest to wettest boundary.
+
+        Raises:
+            ValueError: If no complete occurrence of a season has been added.
+        """
+        missing = [
+            season
+            for season in self.seasons
+            if season not in self.sketches or self.sketches[season].count == 0
+        ]
+        if missing:
+            raise ValueError(f"No data summarized for seasons: {missing}")
+        quantiles = self._percentiles() / 100
+        return {
+            season: self.sketches[season].quantile(quantiles) for season in self.seasons
+        }
+
+    def freeze_thresholds(
+        self,
+        data: Optional[Union[pd.DataFrame, Iterable[pd.DataFrame]]] = None,
+        by_year: bool = True,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Fix the category thresholds so that later data is labeled without a second pass.
+
+        Args:
+            data (Optional[Union[pd.DataFrame, Iterable[pd.DataFrame]]]): Reference data,
+                e.g. the historical record as a one-column DataFrame. When omitted, the
+                thresholds are taken from the running sketches.
+            by_year (bool): Compute the thresholds from per-year seasonal totals of the
+                            reference data. Ignored when freezing the running sketches,
+                            which keep the basis they were updated on. Default is True.
+
+        Returns:
+            Dict[str, np.ndarray]: The frozen thresholds per season.
+
+        Raises:
+            ValueError: If a season has no complete occurrence in the data, which
+                        would leave its thresholds undefined.
+        """
+        if data is None:
+            self.thresholds = self.current_thresholds()
+            self.thresholds_by_year = self.sketches_by_year
+        else:
+            _, totals = self.seasonal_totals(data, by_year=by_year)
+            missing = [
+                season
+                for i, season in enumerate(self.seasons)
+                if np.isnan(totals[:, i]).all()
+            ]
+            if missing:
+                raise ValueError(
+                    f"No complete occurrence of seasons {missing} in the data to "
+                    "freeze thresholds from."
+                )
+            thresholds = np.nanpercentile(totals, self._percentiles(), axis=0)
+            self.thresholds = {
+                season: thresholds[:, i] for i, season in enumerate(self.seasons)
+            }
+            self.thresholds_by_year = by_year
+        return self.thresholds
+
+    def seasonal_totals(
+        self, data: Union[pd.DataFrame, Iterable[pd.DataFrame]], by_year: bool = False
+    ) -> Tuple[pd.Index, np.ndarray]:
+        """
+        Sum each simulation over every season in a single pass.
+
+        Every occurrence of a season is a contiguous run of rows of the SeasonCalendar
+        of the index, shared by all blocks with the same index; np.add.reduceat sums
+        all runs at once and the run sums are then added up per season, or kept per
+        season and year.
+
+        Args:
+            data (Union[pd.DataFrame, Iterable[pd.DataFrame]]): Original precipitation data,
+                or a stream of blocks. Only the seasonal totals of each block are kept.
+                Multivariate data with (variable, simulation) columns, as generated by
+                VARDataGenerator, is classified by its precipitation variable.
+            by_year (bool): Keep one total per season and year. Only complete
+                            season occurrences are kept. Default is False.
+
+        Returns:
+            Tuple[pd.Index, np.ndarray]: The row index (simulations, or (simulation, year)
+                pairs when by_year is True) and an array of shape (n_rows, n_seasons) of
+                seasonal totals, NaN for seasons missing in a year.
+
+        Raises:
+            ValueError: If no data is provided.
+        """
+        chunks = [data] if isinstance(data, pd.DataFrame) else data
+
+        rows, totals = [], []
+        for chunk in chunks:
+            if chunk.columns.nlevels > 1:
+                chunk = chunk["precipitation"]  # Multivariate (variable, simulation)
+            calendar = SeasonCalendar.from_index(chunk.index, self.seasons)
+            values = chunk.to_numpy(dtype=float)
+            if np.isnan(values).any():
+                values = np.nan_to_num(values)  # Missing values count as no rain
+
+            if not by_year:
+                rows.append(chunk.columns)
+                totals.append(calendar.season_totals(values))
+                continue
+
+            complete = calendar.complete
+            run_sums = calendar.run_sums(values)[complete]
+            years, year_positions = np.unique(
+                calendar.run_years[complete], return_inverse=True
+            )
+            table = np.full((chunk.shape[1], len(years), len(self.seasons)), np.nan)
+            table[:, year_positions, calendar.run_seasons[complete]] = run_sums.T
+
+            rows.append(
+                pd.MultiIndex.from_product(
+                    [chunk.columns, years], names=["simulation", "year"]
+                )
+            )
+            totals.append(table.reshape(-1, len(self.seasons)))
+
+        if not totals:
+            raise ValueError("No precipitation data provided.")
+        return rows[0].append(rows[1:]), np.concatenate(totals)
+
+    def classify_totals(
+        self, totals: np.ndarray, by_year: Optional[bool] = None
+    ) -> np.ndarray:
+        """
+        Classify seasonal totals as returned by seasonal_totals.
+
+        The frozen thresholds are used when set, otherwise the thresholds are computed
+        from the totals themselves.
+
+        Args:
+            totals (np.ndarray): Array of shape (n_rows, n_seasons), NaN where missing.
+            by_year (Optional[bool]): Basis of the totals, checked against the basis of
+                the frozen thresholds. None skips the check.
+
+        Returns:
+            np.ndarray: int8 category codes of the same shape as totals, -1 where missing.
+
+        Raises:
+            ValueError: If the thresholds were frozen on the other basis.
+        """
+        if self.thresholds is not None:
+            thresholds = self.frozen_thresholds(by_year)
+        else:
+            thresholds = np.nanpercentile(totals, self._percentiles(), axis=0)
+        return self._classify_totals(totals, thresholds)
+
+    def frozen_thresholds(self, by_year: Optional[bool] = None) -> np.ndarray:
+        """
+        The frozen thresholds as an array.
+
+        Args:
+            by_year (Optional[bool]): Basis of the totals to classify, checked against
+                the basis of the thresholds. None skips the check.
+
+        Returns:
+            np.ndarray: Array of shape (len(categories) - 1, n_seasons).
+
+        Raises:
+            ValueError: If the thresholds were frozen on the other basis.
+        """
+        if by_year is not None:
+            self._check_basis("The thresholds", self.thresholds_by_year, by_year)
+        return np.column_stack(
+            [
+                np.asarray(self.thresholds[season], dtype=float)
+                for season in self.seasons
+            ]
+        )
+
+    def _percentiles(self) -> np.ndarray:
+        """
+        Percentiles separating the categories.
+
+        Returns:
+            np.ndarray: len(categories) - 1 percentiles between 0 and 100.
+        """
+        return np.linspace(0, 100, len(self.categories) + 1)[1:-1]
+
+    @staticmethod
+    def _check_basis(name: str, basis: Optional[bool], by_year: bool) -> None:
+        """
+        Check that per-year and whole-simulation seasonal totals are not mixed.
+
+        Args:
+            name (str): What was computed on basis, for the error message.
+            basis (Optional[bool]): The by_year basis it was computed on, None if unknown.
+            by_year (bool): The requested basis.
+
+        Raises:
+            ValueError: If the bases differ.
+        """
+        if basis is not None and basis != by_year:
+            raise ValueError(
+                f"{name} were computed with by_year={basis}; use by_year={basis} "
+                "or compute them again."
+            )
+
+    def _to_frame(self, rows: pd.Index, codes: np.ndarray) -> pd.DataFrame:
+        """
+        Wrap category codes in a DataFrame of ordered categoricals.
+
+        Args:
+            rows (pd.Index): Row index of the classified data.
+            codes (np.ndarray): int8 category codes of shape (n_rows, n_seasons).
+
+        Returns:
+            pd.DataFrame: Classified data with seasons as columns.
+        """
+        return pd.DataFrame(
+            {
+                season: pd.Categorical.from_codes(
+                    codes[:, i], categories=self.categories, ordered=True
+                )
+                for i, season in enumerate(self.seasons)
+            },
+            index=rows,
+        )
+
+    def _classify_totals(
+        self, totals: np.ndarray, thresholds: np.ndarray
+    ) -> np.ndarray:
+        """
+        Classify seasonal totals against the thresholds of each season.
+
+        A total equal to a threshold falls into the drier category.
+
+        Args:
+            totals (np.ndarray): Array of shape (n_rows, n_seasons), NaN where missing.
+            thresholds (np.ndarray): Array of shape (len(categories) - 1, n_seasons).
 
-    def _get_seasonal_data(self, data: pd.DataFrame) -> Dict[str, pd.Series]:
+        Returns:
+            np.ndarray: int8 category codes of the same shape as totals, -1 where missing.
+        """
+        codes = np.empty(totals.shape, dtype=np.int8)
+        for i in range(totals.shape[1]):
+            codes[:, i] = np.searchsorted(thresholds[:, i], totals[:, i], side="left")
+        codes[np.isnan(totals)] = -1
+        return codes
+
+    def _get_seasonal_data(
+        self, data: Union[pd.DataFrame, Iterable[pd.DataFrame]]
+    ) -> Dict[str, pd.Series]:
         """
         Calculate total precipitation for each season in each simulation.
 
         Args:
-            data (pd.DataFrame): Original precipitation data.
+            data (Union[pd.DataFrame, Iterable[pd.DataFrame]]): Original precipitation data,
+                or a stream of blocks. Only the seasonal totals of each block are kept.
 
         Returns:
             Dict[str, pd.Series]: Dictionary with seasons as keys and Series of seasonal totals as values.
         """
-        seasonal_data = {}
-        for season, months in self.seasons.items():
-            season_mask = data.index.month.isin(months)
-            seasonal_data[season] = data[season_mask].sum()
-        return seasonal_data
+        simulations, totals = self.seasonal_totals(data)
+        return {
+            season: pd.Series(totals[:, i], index=simulations)
+            for i, season in enumerate(self.seasons)
+        }
 
     def plot_classification_distribution(self, classified_data: pd.DataFrame) -> None:
         """
@@ -77,6 +406,7 @@ class PrecipitationClassifier:
         Args:
             classified_data (pd.DataFrame): The classified precipitation data.
         """
+        plt = load_pyplot()
         fig, axes = plt.subplots(2, 2, figsize=(12, 12))
         fig.suptitle("Distribution of Precipitation Classifications by Season")
 
@@ -107,6 +437,7 @@ class PrecipitationClassifier:
         """
         seasonal_data = self._get_seasonal_data(data)
 
+        plt = load_pyplot()
         fig, axes = plt.subplots(2, 2, figsize=(12, 12))
         fig.suptitle(
             "Distribution of Seasonal Precipitation with Classification Thresholds"
@@ -133,34 +464,55 @@ class PrecipitationClassifier:
                     fontsize=8,
                 )
 
-        print(f"the percentiles are: {percentiles}")
-        print(f"the thresholds are: {thresholds}")
+        logger.info("the percentiles are: %s", percentiles)
+        logger.info("the thresholds are: %s", thresholds)
 
         plt.tight_layout()
         plt.subplots_adjust(top=0.93)
         plt.show()
 
     def save_classified_data(
-        self, classified_data: pd.DataFrame, file_path: str
+        self, classified_data: pd.DataFrame, file_path: str, file_format: str = "csv"
     ) -> None:
         """
-        Save the classified precipitation data to a CSV file.
+        Save the classified precipitation data to a CSV file or a binary ensemble store.
 
         Args:
             classified_data (pd.DataFrame): The classified precipitation data.
-            file_path (str): The path where the CSV file will be saved.
+            file_path (str): The path of the CSV file, or the directory of the store.
+            file_format (str): "csv" or "npy" for an EnsembleStore of int8 category
+                               codes. Default is "csv".
+
+        Raises:
+            ValueError: If the file format is unknown.
         """
-        classified_data.to_csv(file_path)
+        if file_format == "npy":
+            EnsembleStore(file_path).write(
+                classified_data,
+                attributes={"seasons": self.seasons},
+                categories=self.categories,
+            )
+        elif file_format == "csv":
+            classified_data.to_csv(file_path)
+        else:
+            raise ValueError(
+                f"Unknown file format '{file_format}'. Use 'csv' or 'npy'."
+            )
 
     @staticmethod
     def load_classified_data(file_path: str) -> pd.DataFrame:
         """
-        Load previously classified precipitation data from a CSV file.
+        Load previously classified precipitation data from a CSV file or a binary ensemble store.
 
         Args:
-            file_path (str): The path to the CSV file containing the classified data.
+            file_path (str): The path to the CSV file or the directory of the store.
 
         Returns:
             pd.DataFrame: A DataFrame containing the loaded classified data.
         """
-        return pd.read_csv(file_path, index_col=0)
+        if EnsembleStore.exists(file_path):
+            return EnsembleStore(file_path).read()
+        classified_data = pd.read_csv(file_path, index_col=0)
+        if "year" in classified_data.columns:
+            classified_data = classified_data.set_index("year", append=True)
+        return classified_data
@@ -0,0 +1,118 @@
+from dataclasses import dataclass, field
+from typing import Union
+
+import numpy as np
+
+
+@dataclass
+class QuantileSketch:
+    """
+    A mergeable summary of a distribution for approximate quantiles.
+
+    The sketch keeps at most max_size weighted centroids. While fewer values have been
+    added it holds every value and quantiles match np.percentile with linear
+    interpolation. Beyond that, sorted values are compressed into equal-weight
+    centroids, which bounds the rank error to about 1 / max_size. Sketches built on
+    different chunks or workers can be merged.
+
+    Attributes:
+        max_size (int): Maximum number of centroids kept.
+        values (np.ndarray): Centroid means, sorted.
+        weights (np.ndarray): Number of values summarized by each centroid.
+    """
+
+    max_size: int = 2000
+    values: np.ndarray = field(default_factory=lambda: np.empty(0))
+    weights: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+    @property
+    def count(self) -> float:
+        """
+        Number of values summarized by the sketch.
+
+        Returns:
+            float: Total weight of all centroids.
+        """
+        return float(self.weights.sum())
+
+    def update(self, data: np.ndarray) -> "QuantileSketch":
+        """
+        Add values to the sketch. Missing values are ignored.
+
+        Args:
+            data (np.ndarray): Values to add.
+
+        Returns:
+            QuantileSketch: The sketch itself, to allow chaining.
+        """
+        data = np.asarray(data, dtype=float).ravel()
+        data = data[~np.isnan(data)]
+        self._absorb(data, np.ones(len(data)))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        Combine two sketches into a new one summarizing the values of both.
+
+        Args:
+            other (QuantileSketch): The sketch to merge with.
+
+        Returns:
+            QuantileSketch: A new sketch with the larger of the two max_size values.
+        """
+        merged = QuantileSketch(max(self.max_size, other.max_size))
+        merged._absorb(
+            np.concatenate([self.values, other.values]),
+            np.concatenate([self.weights, other.weights]),
+        )
+        return merged
+
+    def quantile(self, q: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        Estimate quantiles of the summarized values.
+
+        Args:
+            q (Union[float, np.ndarray]): Quantile(s) between 0 and 1.
+
+        Returns:
+            np.ndarray: The estimated quantile(s).
+
+        Raises:
+            ValueError: If the sketch is empty.
+        """
+        if len(self.values) == 0:
+            raise ValueError("Cannot compute quantiles of an empty sketch.")
+
+        # Each centroid sits at the mean rank of the values it summarizes, so that
+        # unit-weight centroids reproduce np.percentile's linear interpolation.
+        ranks = np.cumsum(self.weights) - (self.weights + 1) / 2
+        return np.interp(np.asarray(q) * (self.count - 1), ranks, self.values)
+
+    def _absorb(self, values: np.ndarray, weights: np.ndarray) -> None:
+        """
+        Add weighted values and compress back to at most max_size centroids.
+
+        Args:
+            values (np.ndarray): Centroid means to add.
+            weights (np.ndarray): Their weights.
+        """
+        values = np.concatenate([self.values, values])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+
+        if len(values) > self.max_size:
+            cumulative = np.cumsum(weights)
+            bins = ((cumulative - weights / 2) / cumulative[-1] * self.max_size).astype(
+                np.intp
+            )
+            bins = np.minimum(bins, self.max_size - 1)
+            merged_weights = np.bincount(bins, weights=weights, minlength=self.max_size)
+            merged_sums = np.bincount(
+                bins, weights=values * weights, minlength=self.max_size
+            )
+            occupied = merged_weights > 0
+            weights = merged_weights[occupied]
+            values = merged_sums[occupied] / weights
+
+        self.values, self.weights = values, weights
@@ -1,13 +1,191 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional
+import numpy as np
 import pandas as pd
 from .weather_requirement import WeatherRequirement
+from .precipitation_classifier import PrecipitationClassifier
 
 
 @dataclass
 class SyntheticDataValidator:
+    """
+    Check weather requirements against many trajectories or scenarios at once.
+
+    The seasonal totals of all columns are computed in one pass, then every
+    requirement is evaluated as an array comparison over all columns and season
+    occurrences.
+
+    Attributes:
+        classifier (PrecipitationClassifier): Provides the seasons, the seasonal totals
+            and, for category requirements, the thresholds. Frozen thresholds are used
+            when set, otherwise they are computed from the validated data.
+        by_year (bool): Evaluate every complete season occurrence separately instead of
+            the season total over the whole column. Default is True.
+        min_fraction (float): Share of a column's season occurrences that must meet a
+            requirement for the column to pass it. Default is 1.0 (all of them).
+    """
+
+    classifier: PrecipitationClassifier = field(default_factory=PrecipitationClassifier)
+    by_year: bool = True
+    min_fraction: float = 1.0
+
     def validate(
         self, data: pd.DataFrame, requirements: List[WeatherRequirement]
     ) -> bool:
-        # Implementation to be added
-        pass
+        """
+        Check whether every column of the data meets all requirements.
+
+        Args:
+            data (pd.DataFrame): Trajectories or scenarios as columns, with a date index.
+            requirements (List[WeatherRequirement]): The requirements to check.
+
+        Returns:
+            bool: True if all columns pass all requirements.
+        """
+        return bool(self.evaluate(data, requirements).all())
+
+    def evaluate(
+        self, data: pd.DataFrame, requirements: List[WeatherRequirement]
+    ) -> pd.Series:
+        """
+        Compute a pass/fail mask over the columns of the data.
+
+        Args:
+            data (pd.DataFrame): Trajectories or scenarios as columns, with a date index.
+            requirements (List[WeatherRequirement]): The requirements to check.
+
+        Returns:
+            pd.Series: Boolean mask indexed by column, True where all requirements pass.
+        """
+        scores = self.score(data, requirements)
+        return (scores >= self.min_fraction).all(axis=1)
+
+    def score(
+        self, data: pd.DataFrame, requirements: List[WeatherRequirement]
+    ) -> pd.DataFrame:
+        """
+        Compute, for every column and requirement, the share of season occurrences that
+        meet the requirement.
+
+        Args:
+            data (pd.DataFrame): Trajectories or scenarios as columns, with a date index.
+                Scenarios from WeatherGenerator need a DatetimeIndex assigned first.
+                Multivariate data with (variable, simulation) columns is scored by
+                its precipitation.
+            requirements (List[WeatherRequirement]): The requirements to check.
+
+        Returns:
+            pd.DataFrame: Scores between 0 and 1 with simulations as rows and
+                          requirements as columns. NaN where a simulation has no
+                          complete occurrence of the season.
+
+        Raises:
+            ValueError: If the data has no date index, a requirement is invalid or the
+                        frozen thresholds were computed with another by_year.
+        """
+        if not isinstance(data.index, pd.DatetimeIndex):
+            raise ValueError("Data must have a DatetimeIndex to locate the seasons.")
+
+        seasons = list(self.classifier.seasons)
+        rows, totals = self.classifier.seasonal_totals(data, by_year=self.by_year)
+        # Rows are simulations, or (simulation, year) pairs; multivariate data is
+        # validated by its precipitation only, one row per simulation
+        simulations = rows.unique(level="simulation") if self.by_year else rows
+        totals = totals.reshape(len(simulations), -1, len(seasons))
+
+        codes = None
+        if any(r.condition in self.classifier.categories for r in requirements):
+            codes = self.classifier.classify_totals(
+                totals.reshape(-1, len(seasons)), self.by_year
+            ).reshape(totals.shape)
+
+        scores = np.empty((len(simulations), len(requirements)))
+        for j, requirement in enumerate(requirements):
+            if requirement.season not in seasons:
+                raise ValueError(f"Unknown season '{requirement.season}'.")
+            s = seasons.index(requirement.season)
+            values = totals[:, :, s]
+
+            if requirement.condition in ("below", "above"):
+                if requirement.intensity is None:
+                    raise ValueError(
+                        f"Requirement '{requirement.condition}' needs an intensity."
+                    )
+                met = (
+                    values < requirement.intensity
+                    if requirement.condition == "below"
+                    else values > requirement.intensity
+                )
+            elif requirement.condition in self.classifier.categories:
+                met = codes[:, :, s] == self.classifier.categories.index(
+                    requirement.condition
+                )
+            else:
+                raise ValueError(f"Unknown condition '{requirement.condition}'.")
+
+            observed = ~np.isnan(values)
+            counts = observed.sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                scores[:, j] = np.where(
+                    counts > 0, (met & observed).sum(axis=1) / counts, np.nan
+                )
+
+        return pd.DataFrame(
+            scores,
+            index=simulations,
+            columns=[
+                f"{r.season}:{r.condition}"
+                + (f":{r.intensity}" if r.intensity is not None else "")
+                for r in requirements
+            ],
+        )
+
+    def filter_iter(
+        self,
+        data: Iterable[pd.DataFrame],
+        requirements: List[WeatherRequirement],
+        max_results: Optional[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Keep only the passing columns of a stream of blocks, stopping early once enough
+        columns have passed.
+
+        Because the stream is consumed lazily, stopping early also stops generation
+        upstream, e.g. in ARMADataGenerator.generate_iter.
+
+        Args:
+            data (Iterable[pd.DataFrame]): Stream of trajectory or scenario blocks.
+            requirements (List[WeatherRequirement]): The requirements to check.
+            max_results (Optional[int]): Stop after this many passing columns.
+
+        Yields:
+            pd.DataFrame: The passing columns of each block.
+
+        Raises:
+            ValueError: If a category requirement is checked without frozen thresholds,
+                        which would make the labels depend on the block.
+        """
+        if self.classifier.thresholds is None and any(
+            r.condition in self.classifier.categories for r in requirements
+        ):
+            raise ValueError(
+                "Category requirements on a stream need frozen thresholds. "
+                "Call classifier.freeze_thresholds() first."
+            )
+
+        found = 0
+        for chunk in data:
+            mask = self.evaluate(chunk, requirements)
+            selected = mask.index[mask.to_numpy()]
+            if max_results is not None:
+                selected = selected[: max_results - found]
+            found += len(selected)
+            if len(selected):
+                if chunk.columns.nlevels > 1:
+                    yield chunk.loc[
+                        :, chunk.columns.get_level_values("simulation").isin(selected)
+                    ]
+                else:
+                    yield chunk.loc[:, selected]
+            if max_results is not None and found >= max_results:
+                return
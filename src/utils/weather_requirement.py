@@ -1,8 +1,20 @@
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
 class WeatherRequirement:
+    """
+    A requirement on the precipitation of one season.
+
+    Attributes:
+        season (str): The season the requirement applies to.
+        condition (str): Either a precipitation category (e.g. 'very_dry'), met when the
+            seasonal total falls into that category, or 'below' / 'above', met when the
+            seasonal total is below / above intensity.
+        intensity (Optional[float]): Seasonal total in mm for 'below' and 'above'.
+    """
+
     season: str
     condition: str
-    intensity: float
+    intensity: Optional[float] = None
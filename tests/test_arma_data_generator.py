@@ -0,0 +1,232 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.signal import lfilter
+from sklearn.preprocessing import StandardScaler
+from statsmodels.tsa.arima.model import ARIMA
+
+from src.data import EnsembleStore
+from src.models import ARMADataGenerator, arma_data_generator
+from src.utils import ModelCache, PrecipitationClassifier
+
+
+@pytest.fixture(scope="module")
+def fitted_generator():
+    rng = np.random.default_rng(42)
+    noise = rng.standard_normal(3000)
+    values = lfilter([1.0, 0.3], [1.0, -0.5, 0.1], noise) * 2.0 + 3.0
+    series = pd.Series(
+        values, index=pd.date_range("2000-01-01", periods=3000, freq="D")
+    )
+
+    generator = ARMADataGenerator(order=(2, 1), steps=365)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        generator.fit(series)
+    return generator
+
+
+def test_batch_recursion_matches_statsmodels(fitted_generator):
+    results = fitted_generator.model
+    ar, ma, _, const = fitted_generator._arma_coefficients()
+    shocks = np.random.default_rng(0).standard_normal(200)
+
+    expected = results.simulate(
+        200,
+        state_shocks=shocks,
+        measurement_shocks=np.zeros(200),
+        initial_state=np.zeros(results.model.k_states),
+    )
+    batched = const + lfilter(np.r_[1.0, ma], np.r_[1.0, -ar], shocks)
+
+    # statsmodels applies the shock at t to the state at t + 1
+    np.testing.assert_allclose(np.asarray(expected)[1:], batched[:-1])
+
+
+def test_batch_is_statistically_equivalent_to_statsmodels(fitted_generator):
+    reference = fitted_generator.generate(300, method="statsmodels", seed=0).to_numpy()
+    batched = fitted_generator.generate(300, seed=1).to_numpy()
+
+    def lag1(values):
+        centered = values - values.mean(axis=0)
+        return (centered[1:] * centered[:-1]).sum() / (centered**2).sum()
+
+    assert batched.mean() == pytest.approx(reference.mean(), rel=0.02)
+    assert batched.std() == pytest.approx(reference.std(), rel=0.02)
+    assert lag1(batched) == pytest.approx(lag1(reference), abs=0.02)
+    assert (batched >= 0).all()
+
+
+def test_generate_returns_dated_frame(fitted_generator):
+    df = fitted_generator.generate(4, seed=3)
+
+    assert df.shape == (365, 4)
+    assert list(df.columns) == ["Sim_1", "Sim_2", "Sim_3", "Sim_4"]
+    assert df.index[0] == pd.Timestamp("2000-01-01")
+    pd.testing.assert_frame_equal(df, fitted_generator.generate(4, seed=3))
+
+
+def test_generate_iter_yields_bounded_blocks(fitted_generator):
+    chunks = list(fitted_generator.generate_iter(10, chunk_size=4, seed=5))
+
+    assert [chunk.shape[1] for chunk in chunks] == [4, 4, 2]
+    assert chunks[-1].columns[-1] == "Sim_10"
+    assert all(chunk.index.equals(chunks[0].index) for chunk in chunks)
+
+
+@pytest.mark.parametrize("max_open_parts", [64, 2])
+def test_save_generated_trajectories_from_stream(
+    fitted_generator, tmp_path, monkeypatch, max_open_parts
+):
+    monkeypatch.setattr(arma_data_generator, "_MAX_OPEN_PARTS", max_open_parts)
+    path = tmp_path / "trajectories.csv"
+    chunks = list(fitted_generator.generate_iter(5, chunk_size=1, seed=5))
+
+    fitted_generator.save_generated_trajectories(iter(chunks), str(path))
+    loaded = ARMADataGenerator.load_generated_trajectories(str(path))
+
+    expected = pd.concat(chunks, axis=1)
+    np.testing.assert_allclose(loaded.to_numpy(), expected.to_numpy())
+    assert list(loaded.columns) == list(expected.columns)
+    assert (loaded.index == expected.index).all()
+
+
+def test_same_seed_same_ensemble_for_any_worker_count(fitted_generator):
+    serial = fitted_generator.generate(9, seed=11)
+    parallel = fitted_generator.generate(9, seed=11, n_workers=2)
+    streamed = pd.concat(
+        fitted_generator.generate_iter(9, chunk_size=4, seed=11, n_workers=2), axis=1
+    )
+
+    pd.testing.assert_frame_equal(serial, parallel)
+    pd.testing.assert_frame_equal(serial, streamed)
+    assert not serial.equals(fitted_generator.generate(9, seed=12))
+
+
+def test_statsmodels_method_is_seeded(fitted_generator):
+    first = fitted_generator.generate(2, method="statsmodels", seed=4)
+    second = fitted_generator.generate(2, method="statsmodels", seed=4)
+
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_binary_store_round_trip_is_memory_mapped(fitted_generator, tmp_path):
+    path = str(tmp_path / "ensemble")
+    chunks = list(fitted_generator.generate_iter(5, chunk_size=2, seed=5))
+
+    fitted_generator.save_generated_trajectories(
+        iter(chunks), path, file_format="npy", attributes={"seed": 5}
+    )
+    loaded = ARMADataGenerator.load_generated_trajectories(path)
+
+    pd.testing.assert_frame_equal(loaded, pd.concat(chunks, axis=1), check_freq=False)
+    base = loaded["Sim_3"].to_numpy()
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    assert isinstance(base, np.memmap)
+    metadata = EnsembleStore(path).metadata["attributes"]
+    assert metadata["order"] == [2, 1] and metadata["seed"] == 5
+
+
+def test_cache_skips_fitting_and_generation(fitted_generator, tmp_path, monkeypatch):
+    series = fitted_generator.original_data
+    cache = ModelCache(str(tmp_path / "cache"))
+
+    first = ARMADataGenerator(order=(2, 1), steps=365, cache=cache)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        first.fit(series)
+    ensemble = first.generate(3, seed=8)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the cached model should not be refitted")
+
+    second = ARMADataGenerator(order=(2, 1), steps=365, cache=cache)
+    monkeypatch.setattr(ARIMA, "fit", fail)
+    monkeypatch.setattr(StandardScaler, "fit", fail)
+    monkeypatch.setattr(ARMADataGenerator, "_generate", fail)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        second.fit(series)
+
+    np.testing.assert_allclose(second.model.params, first.model.params)
+    pd.testing.assert_frame_equal(
+        second.generate(3, seed=8), ensemble, check_freq=False
+    )
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = ModelCache(str(tmp_path / "cache"), max_bytes=3000)
+    frame = pd.DataFrame(np.zeros((100, 2)))
+
+    cache.put_ensemble("old", frame)
+    os.utime(os.path.join(cache.directory, "old"), (0, 0))
+    cache.put_ensemble("new", frame)
+
+    assert cache.get_ensemble("old") is None
+    assert cache.get_ensemble("new") is not None
+
+
+def test_conditional_generation_reweights_to_conditional_distribution(
+    fitted_generator,
+):
+    ensemble = fitted_generator.generate(4000, seed=5)
+    classifier = PrecipitationClassifier()
+    with pytest.raises(ValueError, match="Winter"):
+        classifier.freeze_thresholds(ensemble)  # One year holds no complete winter
+
+    # Thresholds from two-year trajectories of the same model
+    reference = ARMADataGenerator(order=fitted_generator.order, steps=2 * 365)
+    reference.model = fitted_generator.model
+    reference.scaler = fitted_generator.scaler
+    reference.original_data = fitted_generator.original_data
+    classifier.freeze_thresholds(reference.generate(2000, seed=4), by_year=True)
+    _, totals = classifier.seasonal_totals(ensemble, by_year=True)
+    summer = totals[:, 2][~np.isnan(totals[:, 2])]
+    very_dry = summer[summer <= classifier.thresholds["Summer"][0]]
+
+    result = fitted_generator.generate_conditional(
+        "Summer", "very_dry", 1000, classifier, seed=6, batch_size=500
+    )
+    _, totals = classifier.seasonal_totals(result.trajectories, by_year=True)
+    conditioned = totals[:, 2][~np.isnan(totals[:, 2])]
+    in_band = conditioned <= classifier.thresholds["Summer"][0]
+    weights = result.weights
+
+    assert result.n_segments >= 1000
+    assert result.acceptance_rate > 0.4  # vs. 0.2 without tilting
+    assert 1 < result.effective_sample_size <= result.trajectories.shape[1]
+    weighted_mean = (weights * conditioned)[in_band].sum() / weights[in_band].sum()
+    assert abs(weighted_mean - very_dry.mean()) < 0.02 * very_dry.mean()
+
+
+def test_flat_tilt_response_falls_back_to_plain_sampling(fitted_generator, caplog):
+    tilt = fitted_generator._calibrate_tilt(
+        lambda t: 0.0, 5.0, name="Summer - very_dry"
+    )
+
+    assert tilt == 0.0
+    assert "Summer - very_dry" in caplog.text
+    assert fitted_generator._calibrate_tilt(lambda t: 2.0 * t, 5.0) == 2.5
+
+
+def test_auto_order_ranks_grid_and_fits_best(fitted_generator):
+    series = fitted_generator.original_data
+    generator = ARMADataGenerator(order=(0, 0), steps=365)
+    order, ranking = generator.auto_order(series, max_p=2, max_q=1, n_workers=2)
+
+    assert len(ranking) == 6
+    assert ranking["aic"].dropna().is_monotonic_increasing
+    assert order == (ranking.at[0, "p"], ranking.at[0, "q"]) == generator.order
+    assert ranking.at[0, "status"] == "fitted"
+    assert order != (0, 0)
+    assert generator.generate(2, seed=0).shape == (365, 2)
+
+    serial_order, serial_ranking = ARMADataGenerator(
+        order=(0, 0), steps=365
+    ).auto_order(series, max_p=2, max_q=1)
+    assert serial_order == order
+    np.testing.assert_allclose(serial_ranking["aic"], ranking["aic"])
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.generators import WeatherGenerator
+from src.models import BootstrapDataGenerator
+from src.utils import PrecipitationClassifier
+
+
+@pytest.fixture
+def historical():
+    rng = np.random.default_rng(1)
+    index = pd.date_range("1990-01-01", "2019-12-31", freq="D")
+    wet = rng.random(len(index)) < 0.3
+    values = np.where(wet, rng.gamma(0.7, 8.0, size=len(index)), 0.0)
+    return pd.Series(values, index=index, name="precipitation")
+
+
+def _longest_dry_spell(values):
+    dry = np.concatenate([[0], (values == 0).astype(int), [0]])
+    edges = np.flatnonzero(np.diff(dry))
+    return (edges[1::2] - edges[::2]).max()
+
+
+def test_trajectories_resample_the_record(historical):
+    generator = BootstrapDataGenerator(steps=3 * 365, block_length=15)
+    generator.fit(historical)
+
+    synthetic = generator.generate(20, seed=3)
+
+    assert synthetic.shape == (3 * 365, 20)
+    assert synthetic.index[0] == historical.index[0]
+    assert np.isin(synthetic.to_numpy(), historical.to_numpy()).all()
+    dry_fraction = (synthetic.to_numpy() == 0).mean()
+    assert dry_fraction == pytest.approx((historical == 0).mean(), abs=0.03)
+    spells = [_longest_dry_spell(synthetic[column].to_numpy()) for column in synthetic]
+    assert np.median(spells) >= 10
+
+
+def test_generate_iter_matches_generate(historical):
+    generator = BootstrapDataGenerator(steps=2 * 365)
+    generator.fit(historical)
+
+    expected = generator.generate(7, seed=11)
+    blocks = pd.concat(generator.generate_iter(7, chunk_size=3, seed=11), axis=1)
+
+    pd.testing.assert_frame_equal(blocks, expected)
+
+
+def test_trajectories_feed_classifier_and_weather_generator(historical):
+    generator = BootstrapDataGenerator(steps=2 * 365)
+    generator.fit(historical)
+    synthetic = generator.generate(30, seed=0)
+
+    classified = PrecipitationClassifier().classify_precipitation(
+        synthetic, by_year=True
+    )
+    weather = WeatherGenerator(synthetic, classified)
+    segment = weather._select_matching_segment("Summer", "normal")
+
+    assert len(segment) == 92
+
+
+def test_leap_days_are_not_copies_of_the_last_winter_day(historical):
+    # February 28 and 29 fall into the same block
+    generator = BootstrapDataGenerator(steps=3 * 365, block_length=7)
+    generator.fit(historical)
+
+    synthetic = generator.generate(400, seed=5)
+
+    feb_28 = synthetic.loc["1992-02-28"].to_numpy()
+    feb_29 = synthetic.loc["1992-02-29"].to_numpy()
+    wet = feb_28 > 0
+    assert wet.sum() > 50
+    assert (feb_29[wet] == feb_28[wet]).mean() < 0.1
+    assert np.isin(feb_29, historical.to_numpy()).all()
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from src.cli import load_config, main
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    stations = tmp_path / "stations"
+    stations.mkdir()
+    dates = pd.date_range("1990-01-01", periods=5 * 365, freq="D")
+    values = np.random.default_rng(0).gamma(0.7, 4.0, len(dates))
+    pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "P": values}).to_csv(
+        stations / "ALPHA.csv", index=False
+    )
+
+    settings = {
+        "stations": "stations",
+        "output_dir": "out",
+        "order": [1, 0],
+        "steps": 2 * 365,
+        "n_trajectories": 20,
+        "seasons": {"Cold": [10, 11, 12, 1, 2, 3], "Warm": [4, 5, 6, 7, 8, 9]},
+        "year_structure": [[["Cold", "wet"], ["Warm", "dry"]]],
+        "n_scenarios": 4,
+        "output_format": "csv",
+    }
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(settings))
+    return path
+
+
+def test_load_config_resolves_paths_and_settings(config_path):
+    config, stations, options = load_config(str(config_path))
+
+    assert stations == str(config_path.parent / "stations")
+    assert options == {"output_dir": str(config_path.parent / "out")}
+    assert config.order == (1, 0)
+    assert config.year_structure == [[("Cold", "wet"), ("Warm", "dry")]]
+
+    config_path.write_text(config_path.read_text() + "n_trajectorys: 5\n")
+    with pytest.raises(ValueError, match="n_trajectorys"):
+        load_config(str(config_path))
+
+
+def test_run_command_resumes_and_reruns_changed_stages(config_path, capsys):
+    assert main(["run", str(config_path)]) == 0
+    scenarios = pd.read_csv(
+        config_path.parent / "out" / "ALPHA" / "scenarios.csv", index_col=0
+    )
+    assert scenarios.shape == (365, 4)
+
+    main(["run", str(config_path)])
+    assert "fit,generate" not in capsys.readouterr().out.splitlines()[-1]
+
+    config_path.write_text(
+        config_path.read_text().replace("n_scenarios: 4", "n_scenarios: 2")
+    )
+    main(["run", str(config_path)])
+    assert capsys.readouterr().out.splitlines()[-1].split()[:3] == [
+        "ALPHA",
+        "done",
+        "assemble",
+    ]
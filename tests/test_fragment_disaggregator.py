@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.generators import FragmentDisaggregator
+
+
+@pytest.fixture
+def hourly():
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2000-01-01", "2009-12-31 23:00", freq="h")
+    values = np.where(rng.random(len(index)) < 0.05, rng.gamma(0.6, 3.0, len(index)), 0)
+    return pd.Series(values, index=index, name="precipitation")
+
+
+@pytest.fixture
+def daily(hourly):
+    rng = np.random.default_rng(1)
+    totals = hourly.resample("D").sum().to_numpy()
+    index = pd.date_range("2001-01-01", periods=2 * 365, freq="D")
+    return pd.DataFrame(
+        rng.choice(totals, size=(len(index), 12)),
+        index=index,
+        columns=[f"Sim_{i+1}" for i in range(12)],
+    )
+
+
+def test_fragments_preserve_daily_totals(hourly, daily):
+    disaggregator = FragmentDisaggregator()
+    disaggregator.fit(hourly)
+
+    sub_daily = disaggregator.disaggregate(daily, seed=2)
+
+    assert disaggregator.steps_per_day == 24
+    assert sub_daily.shape == (len(daily) * 24, daily.shape[1])
+    assert sub_daily.index.freq == "h"
+    np.testing.assert_allclose(sub_daily.resample("D").sum(), daily)
+    dry_hours = (sub_daily.to_numpy() == 0).mean()
+    assert dry_hours == pytest.approx((hourly == 0).mean(), abs=0.01)
+
+
+def test_stream_does_not_depend_on_blocks(hourly, daily):
+    disaggregator = FragmentDisaggregator()
+    disaggregator.fit(hourly)
+
+    expected = disaggregator.disaggregate(daily, seed=3)
+    blocks = list(
+        disaggregator.disaggregate_iter(
+            (daily.iloc[:, start : start + 5] for start in range(0, 12, 5)),
+            chunk_size=2,
+            seed=3,
+        )
+    )
+
+    assert max(block.shape[1] for block in blocks) == 2
+    pd.testing.assert_frame_equal(pd.concat(blocks, axis=1), expected)
+
+
+def test_requires_sub_daily_record(daily):
+    with pytest.raises(ValueError, match="sub-daily"):
+        FragmentDisaggregator().fit(daily["Sim_1"])
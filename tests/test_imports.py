@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# numpy and pandas are imported before the timer starts, so the budget covers the
+# package's own modules only. A cold import including them takes several times longer.
+SCRIPT = """
+import sys, time
+import numpy, pandas
+
+start = time.perf_counter()
+import src.data, src.models, src.utils, src.generators, src.pipeline
+elapsed = time.perf_counter() - start
+
+heavy = ("matplotlib", "statsmodels", "sklearn", "scipy.signal")
+print(elapsed)
+print(",".join(name for name in heavy if name in sys.modules))
+"""
+
+
+def test_own_modules_import_fast_and_skip_heavy_dependencies():
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, loaded = result.stdout.splitlines()
+
+    assert loaded == ""
+    assert float(elapsed) < 0.2
@@ -0,0 +1,48 @@
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.generators import WeatherGenerator
+from src.utils import PrecipitationClassifier, collect, stage
+
+
+def test_stages_are_recorded_only_while_collecting():
+    with stage("idle") as record:
+        assert record is None
+
+    with collect(trace_memory=True) as metrics:
+        with stage("outer", items=10):
+            with stage("inner"):
+                buffer = np.ones(2**20)
+            del buffer
+
+    records = {record.name: record for record in metrics.records}
+    assert records["outer"].items == 10
+    assert records["inner"].peak_memory >= 8 * 2**20
+    assert records["outer"].peak_memory >= records["inner"].peak_memory
+    assert json.loads(metrics.to_json())["stages"]["outer"]["count"] == 1
+    assert 'precipgen_stage_runs_total{stage="inner"} 1' in metrics.to_prometheus()
+
+
+def test_pipeline_stages_report_items_and_warnings_are_logged(caplog):
+    index = pd.date_range("2000-12-01", "2002-11-30", freq="D")
+    data = pd.DataFrame(
+        np.random.default_rng(0).gamma(0.8, 4.0, size=(len(index), 20)),
+        index=index,
+        columns=[f"Sim_{i+1}" for i in range(20)],
+    )
+    year = [("Winter", "normal"), ("Spring", "normal")]
+
+    with collect() as metrics:
+        classified = PrecipitationClassifier().classify_precipitation(
+            data, by_year=True
+        )
+        generator = WeatherGenerator(data, classified)
+        with caplog.at_level(logging.WARNING):
+            scenario = generator.generate_weather([year, year], num_years=3, seed=0)
+
+    assert metrics.totals["classifier.classify"]["items"] == classified.size
+    assert metrics.totals["weather.generate"]["items"] == len(scenario)
+    assert "num_years is ignored" in caplog.text
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.generators import WeatherGenerator
+from src.models import MarkovChain
+from src.utils import PrecipitationClassifier
+
+
+def test_transition_matrices_are_recovered_from_sampled_sequences():
+    chain = MarkovChain(categories=["dry", "wet"], seasons=["Winter", "Summer"])
+    chain.seasonal_matrices = np.array(
+        [[[0.9, 0.1], [0.2, 0.8]], [[0.5, 0.5], [0.3, 0.7]]]
+    )
+    chain.initial_distribution = np.array([[0.5, 0.5], [0.5, 0.5]])
+
+    sequences = chain.generate_sequence(200, n_sequences=2000, seed=0)
+
+    estimated = MarkovChain(categories=["dry", "wet"], seasons=["Winter", "Summer"])
+    estimated.compute_transition_matrix(sequences)
+    np.testing.assert_allclose(
+        estimated.seasonal_matrices, chain.seasonal_matrices, atol=0.01
+    )
+    assert estimated.transition_matrix.loc["dry"].sum() == pytest.approx(1.0)
+
+
+def test_year_structures_from_classified_data_feed_weather_generator(tmp_path):
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2000-01-01", periods=6 * 365, freq="D")
+    synthetic = pd.DataFrame(
+        rng.gamma(0.8, 4.0, size=(len(index), 40)),
+        index=index,
+        columns=[f"Sim_{i+1}" for i in range(40)],
+    )
+    classified = PrecipitationClassifier().classify_precipitation(
+        synthetic, by_year=True
+    )
+
+    chain = MarkovChain()
+    chain.compute_transition_matrix(classified)
+    structures = chain.generate_year_structures(num_years=3, n_sequences=2, seed=1)
+    chain.save_transition_matrix(str(tmp_path / "matrix.csv"))
+
+    assert len(structures) == 2 and len(structures[0]) == 3
+    assert [season for season, _ in structures[0][0]] == chain.seasons
+    scenario = WeatherGenerator(synthetic, classified).generate_weather(
+        structures[0], seed=2
+    )
+    assert len(scenario) > 3 * 360
+    pd.testing.assert_frame_equal(
+        MarkovChain.load_transition_matrix(str(tmp_path / "matrix.csv")),
+        chain.transition_matrix,
+    )
@@ -0,0 +1,122 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import EnsembleStore
+from src.pipeline import PipelineConfig, StationPipeline
+
+
+@pytest.fixture
+def station_dir(tmp_path):
+    directory = tmp_path / "raw"
+    directory.mkdir()
+    dates = pd.date_range("1990-01-01", periods=6 * 365, freq="D")
+    for i, name in enumerate(["ALPHA", "BETA"]):
+        rng = np.random.default_rng(i)
+        pd.DataFrame(
+            {"date": dates.strftime("%Y-%m-%d"), "P": rng.gamma(0.7, 4.0, len(dates))}
+        ).to_csv(directory / f"{name}.csv", index=False)
+    return directory
+
+
+@pytest.fixture
+def config():
+    year = [
+        ("Winter", "normal"),
+        ("Spring", "wet"),
+        ("Summer", "dry"),
+        ("Fall", "normal"),
+    ]
+    return PipelineConfig(
+        order=(1, 0),
+        steps=3 * 365,
+        n_trajectories=30,
+        chunk_size=8,
+        year_structure=[year],
+        n_scenarios=5,
+    )
+
+
+def test_pipeline_writes_bundles_and_resumes(station_dir, config, tmp_path):
+    output = tmp_path / "out"
+    pipeline = StationPipeline(str(output), config, n_workers=2)
+
+    summary = pipeline.run(str(station_dir))
+    assert summary["status"].tolist() == ["done", "done"]
+    assert summary["stages_run"].tolist() == ["fit,generate,classify,assemble"] * 2
+
+    trajectories = EnsembleStore(str(output / "ALPHA" / "trajectories")).read()
+    scenarios = EnsembleStore(str(output / "ALPHA" / "scenarios")).read()
+    assert trajectories.shape == (3 * 365, 30)
+    assert scenarios.shape[1] == 5
+
+    assert pipeline.run(str(station_dir))["stages_run"].fillna("").tolist() == ["", ""]
+
+    config.n_scenarios = 3
+    summary = StationPipeline(str(output), config).run(str(station_dir))
+    assert summary["stages_run"].tolist() == ["assemble", "assemble"]
+    pd.testing.assert_frame_equal(
+        EnsembleStore(str(output / "ALPHA" / "trajectories")).read(mmap=False),
+        trajectories,
+    )
+
+
+def test_pipeline_reports_failing_station(station_dir, config, tmp_path):
+    (station_dir / "BROKEN.csv").write_text("")
+    manifest = tmp_path / "stations.csv"
+    pd.DataFrame(
+        {"station": ["BROKEN", "BETA"], "path": ["raw/BROKEN.csv", "raw/BETA.csv"]}
+    ).to_csv(manifest, index=False)
+    config.year_structure = None
+
+    summary = StationPipeline(str(tmp_path / "out"), config).run(str(manifest))
+
+    assert summary.loc["BROKEN", "status"] == "failed"
+    assert "EmptyDataError" in summary.loc["BROKEN", "error"]
+    assert summary.loc["BETA", "stages_run"] == "fit,generate,classify"
+
+
+def test_pipeline_models_hourly_stations_daily_and_disaggregates(config, tmp_path):
+    directory = tmp_path / "hourly"
+    directory.mkdir()
+    dates = pd.date_range("1990-01-01", periods=4 * 365 * 24, freq="h")
+    rng = np.random.default_rng(7)
+    values = np.where(rng.random(len(dates)) < 0.08, rng.gamma(0.6, 2.0, len(dates)), 0)
+    pd.DataFrame({"date": dates.strftime("%Y-%m-%d %H:%M"), "P": values}).to_csv(
+        directory / "GAMMA.csv", index=False
+    )
+    config.year_structure = None
+    config.disaggregate = True
+
+    output = tmp_path / "out"
+    summary = StationPipeline(str(output), config).run(str(directory))
+
+    assert summary.loc["GAMMA", "stages_run"] == "fit,generate,classify,disaggregate"
+    daily = EnsembleStore(str(output / "GAMMA" / "trajectories")).read()
+    hourly = EnsembleStore(str(output / "GAMMA" / "sub_daily")).read()
+    assert daily.shape == (3 * 365, 30)
+    assert hourly.shape == (3 * 365 * 24, 30)
+    np.testing.assert_allclose(hourly.resample("D").sum().to_numpy(), daily.to_numpy())
+
+    config.year_structure = [[("Winter", "normal"), ("Summer", "dry")]]
+    config.by_year = False
+    summary = StationPipeline(str(output), config).run(str(directory))
+    assert summary.loc["GAMMA", "stages_run"] == "classify,assemble"
+
+
+def test_pipeline_skips_disaggregation_of_daily_stations(station_dir, config, tmp_path):
+    config.year_structure = None
+    config.disaggregate = True
+    output = tmp_path / "out"
+
+    summary = StationPipeline(str(output), config).run(str(station_dir))
+
+    assert summary["status"].tolist() == ["done", "done"]
+    assert summary["stages_run"].tolist() == ["fit,generate,classify"] * 2
+    assert not EnsembleStore.exists(str(output / "ALPHA" / "sub_daily"))
+    with open(output / "ALPHA" / "bundle.json") as fp:
+        assert json.load(fp)["not_applicable"] == ["disaggregate"]
+    rerun = StationPipeline(str(output), config).run(str(station_dir))
+    assert rerun["stages_run"].fillna("").tolist() == ["", ""]
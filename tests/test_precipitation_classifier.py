@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import PrecipitationClassifier, QuantileSketch
+
+
+@pytest.fixture
+def synthetic_data():
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2000-01-01", periods=3 * 365, freq="D")
+    values = rng.gamma(0.8, 4.0, size=(len(index), 40))
+    return pd.DataFrame(values, index=index, columns=[f"Sim_{i+1}" for i in range(40)])
+
+
+def test_classify_stream_matches_frame(synthetic_data):
+    classifier = PrecipitationClassifier()
+    chunks = (synthetic_data.iloc[:, i : i + 15] for i in range(0, 40, 15))
+
+    pd.testing.assert_frame_equal(
+        classifier.classify_precipitation(chunks),
+        classifier.classify_precipitation(synthetic_data),
+    )
+
+
+def test_classified_data_binary_round_trip(synthetic_data, tmp_path):
+    classifier = PrecipitationClassifier()
+    classified = classifier.classify_precipitation(synthetic_data, by_year=False)
+    path = str(tmp_path / "classified")
+
+    classifier.save_classified_data(classified, path, file_format="npy")
+    loaded = PrecipitationClassifier.load_classified_data(path)
+
+    assert loaded.index.tolist() == classified.index.tolist()
+    assert (loaded.astype(object) == classified).all().all()
+
+
+def test_vectorized_classification_matches_reference(synthetic_data):
+    classifier = PrecipitationClassifier()
+    classified = classifier.classify_precipitation(synthetic_data, by_year=False)
+
+    percentiles = np.linspace(0, 100, len(classifier.categories) + 1)[1:-1]
+    for season, months in classifier.seasons.items():
+        totals = synthetic_data[synthetic_data.index.month.isin(months)].sum()
+        thresholds = np.percentile(totals, percentiles)
+        expected = [
+            classifier.categories[int(np.sum(value > thresholds))] for value in totals
+        ]
+        assert classified[season].tolist() == expected
+    assert isinstance(classified["Summer"].dtype, pd.CategoricalDtype)
+
+
+def test_classify_by_year_handles_winters_across_year_boundary(synthetic_data):
+    classifier = PrecipitationClassifier()
+    classified = classifier.classify_precipitation(synthetic_data, by_year=True)
+    _, totals = classifier.seasonal_totals(synthetic_data, by_year=True)
+
+    assert classified.index.names == ["simulation", "year"]
+    assert classified.index.get_level_values("year").unique().tolist() == [
+        2000,
+        2001,
+        2002,
+    ]
+    # The first winter is cut off by the start of the data, the last one by its end
+    assert classified.loc[("Sim_1", 2000), "Winter"] is np.nan
+    assert classified.loc[("Sim_1", 2000), "Summer"] in classifier.categories
+
+    winter = synthetic_data.loc["2000-12-01":"2001-02-28", "Sim_2"].sum()
+    row = classified.index.get_loc(("Sim_2", 2001))
+    assert totals[row, 0] == pytest.approx(winter)
+
+
+def test_quantile_sketch_is_exact_when_small_and_mergeable():
+    rng = np.random.default_rng(3)
+    data = rng.gamma(2.0, 50.0, size=50_000)
+    quantiles = np.array([0.2, 0.4, 0.6, 0.8])
+
+    small = QuantileSketch().update(data[:500])
+    np.testing.assert_allclose(
+        small.quantile(quantiles), np.quantile(data[:500], quantiles)
+    )
+
+    merged = QuantileSketch(max_size=500).update(data[:20_000])
+    merged = merged.merge(QuantileSketch(max_size=500).update(data[20_000:]))
+    ranks = np.searchsorted(np.sort(data), merged.quantile(quantiles)) / len(data)
+    np.testing.assert_allclose(ranks, quantiles, atol=0.01)
+
+
+def test_streamed_thresholds_label_chunks_like_a_full_pass(synthetic_data):
+    first, second = PrecipitationClassifier(), PrecipitationClassifier()
+    first.update_thresholds(synthetic_data.iloc[:, :25])
+    second.update_thresholds(synthetic_data.iloc[:, 25:])
+    first.merge_sketches(second)
+    first.freeze_thresholds()
+
+    chunks = (synthetic_data.iloc[:, i : i + 10] for i in range(0, 40, 10))
+    streamed = pd.concat(first.classify_iter(chunks))
+
+    pd.testing.assert_frame_equal(
+        streamed, PrecipitationClassifier().classify_precipitation(synthetic_data)
+    )
+
+
+def test_thresholds_frozen_from_historical_record(synthetic_data):
+    classifier = PrecipitationClassifier()
+    with pytest.raises(ValueError):
+        next(classifier.classify_iter([synthetic_data]))
+
+    historical = synthetic_data[["Sim_1"]]
+    thresholds = classifier.freeze_thresholds(historical, by_year=True)
+    classified = classifier.classify_precipitation(synthetic_data, by_year=True)
+
+    assert thresholds["Summer"].shape == (4,)
+    assert classified["Summer"].notna().all()
+    with pytest.raises(ValueError, match="Winter"):
+        classifier.freeze_thresholds(historical.loc["2000-03-01":"2000-11-30"])
+
+
+def test_freeze_then_classify_iter_uses_the_frozen_basis(synthetic_data):
+    rng = np.random.default_rng(1)
+    historical = pd.DataFrame(
+        {"P": rng.gamma(0.8, 4.0, 30 * 365)},
+        index=pd.date_range("1980-01-01", periods=30 * 365, freq="D"),
+    )
+    classifier = PrecipitationClassifier()
+    classifier.freeze_thresholds(historical)
+
+    chunks = (synthetic_data.iloc[:, i : i + 10] for i in range(0, 40, 10))
+    classified = pd.concat(classifier.classify_iter(chunks))
+
+    shares = classified["Summer"].value_counts(normalize=True)
+    assert (shares > 0.05).all()
+    with pytest.raises(ValueError, match="by_year=True"):
+        classifier.classify_precipitation(synthetic_data, by_year=False)
@@ -0,0 +1,93 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.generators import WeatherGenerator
+from src.service import ScenarioClient, ScenarioServer
+from src.utils import PrecipitationClassifier
+
+YEAR = [("Winter", "wet"), ("Spring", "dry"), ("Summer", "normal"), ("Fall", "wet")]
+
+
+@pytest.fixture
+def generator():
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2001-01-01", periods=3 * 365, freq="D")
+    values = rng.gamma(0.8, 4.0, size=(len(index), 20))
+    synthetic = pd.DataFrame(
+        values, index=index, columns=[f"Sim_{i+1}" for i in range(20)]
+    )
+    classified = PrecipitationClassifier().classify_precipitation(
+        synthetic, by_year=True
+    )
+    return WeatherGenerator(synthetic, classified)
+
+
+def test_concurrent_requests_match_batch_generation(generator):
+    server = ScenarioServer(generator, batch_window=0.05)
+
+    async def scenario():
+        listener = await server.start()
+        port = listener.sockets[0].getsockname()[1]
+        client = await ScenarioClient.connect(port=port)
+        try:
+            return await asyncio.gather(
+                *[
+                    client.request(YEAR, num_years=2, n_scenarios=3, seed=seed)
+                    for seed in range(8)
+                ],
+                client.request([YEAR, YEAR[::-1]], n_scenarios=2, seed=0),
+            )
+        finally:
+            await client.close()
+            listener.close()
+
+    results = asyncio.run(scenario())
+
+    for seed, result in enumerate(results[:8]):
+        expected = generator.generate_weather_batch(
+            YEAR, num_years=2, n_scenarios=3, seed=seed
+        )
+        np.testing.assert_array_equal(result, expected.to_numpy())
+    expected = generator.generate_weather_batch(
+        [YEAR, YEAR[::-1]], n_scenarios=2, seed=0
+    )
+    np.testing.assert_array_equal(results[8], expected.to_numpy())
+    assert server.stats["batches"] < server.stats["requests"]
+
+
+def test_seeded_results_are_cached(generator):
+    server = ScenarioServer(generator, cache_size=1)
+
+    async def scenario():
+        first = await server.generate(YEAR, n_scenarios=2, seed=1)
+        again = await server.generate(YEAR, n_scenarios=2, seed=1)
+        await server.generate(YEAR, n_scenarios=2, seed=2)
+        await server.generate(YEAR, n_scenarios=2, seed=1)
+        return first, again
+
+    first, again = asyncio.run(scenario())
+
+    assert again is first
+    assert not first.flags.writeable
+    assert server.stats == {"requests": 4, "cache_hits": 1, "batches": 3}
+
+
+def test_invalid_request_returns_error(generator):
+    server = ScenarioServer(generator)
+
+    async def scenario():
+        listener = await server.start()
+        port = listener.sockets[0].getsockname()[1]
+        client = await ScenarioClient.connect(port=port)
+        try:
+            with pytest.raises(ValueError, match="No matching simulations"):
+                await client.request([("Summer", "unknown")])
+            return await client.request(YEAR, seed=0)
+        finally:
+            await client.close()
+            listener.close()
+
+    assert asyncio.run(scenario()).shape == (365, 1)
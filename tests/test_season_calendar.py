@@ -0,0 +1,19 @@
+import gc
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.data.season_calendar import SeasonCalendar
+
+
+def test_calendar_is_shared_without_keeping_the_index_alive():
+    index = pd.date_range("2001-01-01", periods=3 * 365, freq="D")
+    with ThreadPoolExecutor(4) as pool:
+        calendars = list(pool.map(SeasonCalendar.from_index, [index] * 16))
+
+    assert all(calendar is calendars[0] for calendar in calendars)
+    reference = weakref.ref(index)
+    del index
+    gc.collect()
+    assert reference() is None
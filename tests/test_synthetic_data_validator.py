@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import (
+    PrecipitationClassifier,
+    SyntheticDataValidator,
+    WeatherRequirement,
+)
+
+
+@pytest.fixture
+def synthetic_data():
+    rng = np.random.default_rng(1)
+    index = pd.date_range("2000-12-01", "2003-11-30", freq="D")
+    scale = rng.uniform(1.0, 6.0, size=60)
+    values = rng.gamma(0.8, 1.0, size=(len(index), 60)) * scale
+    return pd.DataFrame(values, index=index, columns=[f"Sim_{i+1}" for i in range(60)])
+
+
+def test_threshold_requirements_match_per_column_loop(synthetic_data):
+    requirements = [
+        WeatherRequirement("Summer", "below", 350.0),
+        WeatherRequirement("Winter", "above", 100.0),
+    ]
+    validator = SyntheticDataValidator()
+    mask = validator.evaluate(synthetic_data, requirements)
+
+    expected = []
+    for column in synthetic_data:
+        series = synthetic_data[column]
+        summer = series[series.index.month.isin([6, 7, 8])].groupby(
+            series[series.index.month.isin([6, 7, 8])].index.year
+        )
+        winter = series[series.index.month.isin([12, 1, 2])]
+        winter_year = winter.index.year + (winter.index.month == 12)
+        expected.append(
+            (summer.sum() < 350.0).all()
+            and (winter.groupby(winter_year).sum() > 100.0).all()
+        )
+
+    assert 0 < mask.sum() < len(mask)
+    assert mask.tolist() == expected
+
+
+def test_category_scores_use_frozen_thresholds(synthetic_data):
+    classifier = PrecipitationClassifier()
+    classifier.freeze_thresholds(synthetic_data, by_year=True)
+    validator = SyntheticDataValidator(classifier, min_fraction=0.5)
+
+    scores = validator.score(synthetic_data, [WeatherRequirement("Fall", "very_wet")])
+    classified = classifier.classify_precipitation(synthetic_data, by_year=True)
+    expected = (classified["Fall"] == "very_wet").groupby(level="simulation").mean()
+
+    np.testing.assert_allclose(scores.iloc[:, 0], expected.loc[scores.index])
+
+
+def test_filter_iter_stops_early(synthetic_data):
+    requirements = [WeatherRequirement("Summer", "above", 200.0)]
+    validator = SyntheticDataValidator()
+    consumed = []
+
+    def chunks():
+        for i in range(0, 60, 10):
+            consumed.append(i)
+            yield synthetic_data.iloc[:, i : i + 10]
+
+    passing = pd.concat(
+        validator.filter_iter(chunks(), requirements, max_results=5), axis=1
+    )
+    expected = validator.evaluate(synthetic_data, requirements)
+
+    assert passing.columns.tolist() == expected[expected].index[:5].tolist()
+    assert len(consumed) < 6
+
+
+def test_multivariate_data_is_scored_by_precipitation(synthetic_data):
+    requirements = [WeatherRequirement("Summer", "above", 200.0)]
+    precipitation = synthetic_data.iloc[:, :3]
+    data = pd.concat(
+        {"precipitation": precipitation, "temperature": precipitation * 0.0 + 10.0},
+        axis=1,
+        names=["variable", "simulation"],
+    )
+    validator = SyntheticDataValidator()
+
+    scores = validator.score(data, requirements)
+    passing = list(validator.filter_iter([data], requirements))
+
+    expected = validator.score(precipitation, requirements)
+    assert scores.index.tolist() == precipitation.columns.tolist()
+    np.testing.assert_allclose(scores.to_numpy(), expected.to_numpy())
+    mask = validator.evaluate(precipitation, requirements)
+    assert passing[0]["temperature"].columns.tolist() == mask[mask].index.tolist()
@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import TimeSeriesData
+
+
+@pytest.fixture
+def multi_column_csv(tmp_path):
+    dates = pd.date_range("2000-01-01", periods=48, freq="h")
+    path = tmp_path / "station.csv"
+    pd.DataFrame(
+        {
+            "time": dates.strftime("%d.%m.%Y %H:%M"),
+            "P": np.arange(48, dtype=float),
+            "T": np.linspace(-5, 5, 48),
+        }
+    ).to_csv(path, index=False)
+    return str(path)
+
+
+def test_from_csv_single_column_is_precipitation():
+    data = TimeSeriesData.from_csv("data/raw/GSTEIGmeteo.csv", date_format="%Y-%m-%d")
+
+    assert data.data.columns.tolist() == ["precipitation"]
+    assert isinstance(data.data.index, pd.DatetimeIndex)
+    assert data.get_time_resolution() == "D"
+
+
+def test_from_csv_keeps_columns_and_applies_options(multi_column_csv):
+    data = TimeSeriesData.from_csv(multi_column_csv, date_format="%d.%m.%Y %H:%M")
+    assert data.data.columns.tolist() == ["P", "T"]
+    assert data.data.index[1] == pd.Timestamp("2000-01-01 01:00")
+
+    subset = TimeSeriesData.from_csv(
+        multi_column_csv,
+        date_format="%d.%m.%Y %H:%M",
+        columns=["T"],
+        dtype=np.float32,
+    )
+    assert subset.data.columns.tolist() == ["T"]
+    assert subset.data["T"].dtype == np.float32
+
+
+def test_pyarrow_engine_applies_date_format(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "station.csv"
+    # Every date is also a valid ISO date with day and month swapped
+    dates = pd.date_range("2000-01-01", periods=12, freq="D")
+    pd.DataFrame({"date": dates.strftime("%Y-%d-%m"), "P": np.arange(12.0)}).to_csv(
+        path, index=False
+    )
+
+    options = {"date_format": "%Y-%d-%m"}
+    arrow = TimeSeriesData.from_csv(str(path), engine="pyarrow", **options)
+    c = TimeSeriesData.from_csv(str(path), engine="c", **options)
+
+    assert arrow.data.index.equals(dates)
+    pd.testing.assert_frame_equal(arrow.data, c.data, check_freq=False)
+
+
+def test_from_csv_cache_skips_parsing(multi_column_csv, monkeypatch):
+    options = {"date_format": "%d.%m.%Y %H:%M", "cache": True}
+    first = TimeSeriesData.from_csv(multi_column_csv, **options)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the file should not be parsed again")
+
+    monkeypatch.setattr(TimeSeriesData, "_read_csv", staticmethod(fail))
+    pd.testing.assert_frame_equal(
+        TimeSeriesData.from_csv(multi_column_csv, **options).data,
+        first.data,
+        check_freq=False,
+    )
+
+    # A modified file is parsed again
+    monkeypatch.undo()
+    stat = os.stat(multi_column_csv)
+    os.utime(multi_column_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    monkeypatch.setattr(TimeSeriesData, "_read_csv", staticmethod(fail))
+    with pytest.raises(AssertionError):
+        TimeSeriesData.from_csv(multi_column_csv, **options)
+
+
+def test_calendar_is_shared_and_handles_sub_daily_custom_seasons(multi_column_csv):
+    data = TimeSeriesData.from_csv(multi_column_csv, date_format="%d.%m.%Y %H:%M")
+    assert data.calendar() is data.calendar()
+
+    index = pd.date_range("2000-01-01", "2001-12-31 23:00", freq="h")
+    halves = {"Cold": [10, 11, 12, 1, 2, 3], "Warm": [4, 5, 6, 7, 8, 9]}
+    calendar = TimeSeriesData(pd.DataFrame({"P": 1.0}, index=index)).calendar(halves)
+
+    assert calendar.run_years.tolist() == [2000, 2000, 2001, 2001, 2002]
+    assert calendar.complete.tolist() == [False, True, True, True, False]
+    assert calendar.segment_rows("Warm").shape == (2, 183 * 24)
+    np.testing.assert_array_equal(
+        calendar.season_totals(np.ones((len(index), 1))),
+        [[(len(index) - 2 * 183 * 24), 2 * 183 * 24]],
+    )
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import EnsembleStore
+from src.generators import WeatherGenerator
+from src.models import VARDataGenerator
+from src.utils import PrecipitationClassifier
+
+
+@pytest.fixture(scope="module")
+def generator():
+    rng = np.random.default_rng(5)
+    index = pd.date_range("1990-01-01", "2009-12-31", freq="D")
+    temperature = np.zeros(len(index))
+    for t in range(1, len(index)):
+        temperature[t] = 0.7 * temperature[t - 1] + rng.normal()
+    precipitation = np.maximum(rng.gamma(0.6, 6.0, len(index)) - temperature, 0)
+    data = pd.DataFrame(
+        {"precipitation": precipitation, "temperature": temperature + 10},
+        index=index,
+    )
+
+    generator = VARDataGenerator(order=1, steps=2 * 365)
+    generator.fit(data)
+    return generator
+
+
+def test_variables_are_simulated_jointly(generator):
+    synthetic = generator.generate(200, seed=1)
+
+    assert list(synthetic.columns.names) == ["variable", "simulation"]
+    assert synthetic["precipitation"].shape == (2 * 365, 200)
+    assert (synthetic["precipitation"].to_numpy() >= 0).all()
+    correlation = np.corrcoef(
+        synthetic["precipitation"].to_numpy().ravel(),
+        synthetic["temperature"].to_numpy().ravel(),
+    )[0, 1]
+    assert correlation < -0.1
+
+    blocks = pd.concat(generator.generate_iter(200, chunk_size=64, seed=1), axis=1)
+    pd.testing.assert_frame_equal(blocks[synthetic.columns], synthetic)
+
+    empty = generator.generate(0, seed=1)
+    assert empty.shape == (2 * 365, 0)
+    assert list(empty.columns.names) == ["variable", "simulation"]
+
+
+def test_weather_generator_copies_all_variables_of_a_segment(generator):
+    synthetic = generator.generate(30, seed=2)
+    classified = PrecipitationClassifier().classify_precipitation(
+        synthetic, by_year=True
+    )
+    weather = WeatherGenerator(synthetic, classified)
+
+    year = [("Winter", "dry"), ("Spring", "wet"), ("Summer", "normal"), ("Fall", "wet")]
+    scenario = weather.generate_weather(year, seed=3)
+    assert list(scenario.columns) == ["precipitation", "temperature"]
+
+    # The Summer segment follows a 90-day Winter and a 92-day Spring
+    days = scenario.iloc[182:274]
+    summers = synthetic[synthetic.index.month.isin([6, 7, 8])]
+    matches = [
+        (summer, column)
+        for summer in np.unique(summers.index.year)
+        for column in synthetic["precipitation"].columns
+        if np.array_equal(
+            summers.loc[summers.index.year == summer, ("precipitation", column)],
+            days["precipitation"],
+        )
+    ]
+    assert len(matches) == 1
+    summer, column = matches[0]
+    np.testing.assert_array_equal(
+        summers.loc[summers.index.year == summer, ("temperature", column)],
+        days["temperature"],
+    )
+
+    batch = weather.generate_weather_batch(year, n_scenarios=4, seed=3)
+    pd.testing.assert_frame_equal(
+        batch[[("precipitation", "Scenario_1"), ("temperature", "Scenario_1")]]
+        .droplevel("scenario", axis=1)
+        .rename_axis(columns=None),
+        scenario,
+    )
+
+
+def test_multivariate_ensemble_round_trips_through_store(generator, tmp_path):
+    synthetic = generator.generate(5, seed=4)
+    EnsembleStore(str(tmp_path / "ensemble")).write(synthetic)
+
+    loaded = EnsembleStore(str(tmp_path / "ensemble")).read()
+
+    pd.testing.assert_frame_equal(loaded, synthetic, check_freq=False)
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data import EnsembleStore
+from src.generators import WeatherGenerator
+from src.utils import PrecipitationClassifier
+
+
+@pytest.fixture
+def ensemble():
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2001-01-01", periods=2 * 365, freq="D")
+    values = rng.gamma(0.8, 4.0, size=(len(index), 30))
+    synthetic = pd.DataFrame(
+        values, index=index, columns=[f"Sim_{i+1}" for i in range(30)]
+    )
+    classified = PrecipitationClassifier().classify_precipitation(
+        synthetic, by_year=False
+    )
+    return synthetic, classified
+
+
+def test_segment_matches_requested_condition(ensemble):
+    synthetic, classified = ensemble
+    generator = WeatherGenerator(synthetic, classified)
+
+    segment = generator._select_matching_segment("Summer", "very_dry")
+
+    summer = synthetic[synthetic.index.month.isin([6, 7, 8])]
+    matches = [
+        column
+        for column in classified.index[classified["Summer"] == "very_dry"]
+        if np.array_equal(summer[column].to_numpy(), segment)
+    ]
+    assert len(matches) == 1
+
+
+def test_generate_weather_concatenates_segments(ensemble):
+    synthetic, classified = ensemble
+    generator = WeatherGenerator(synthetic, classified)
+    year = [("Winter", "wet"), ("Spring", "dry"), ("Summer", "normal"), ("Fall", "wet")]
+
+    scenario = generator.generate_weather(year, num_years=2)
+
+    assert len(scenario) == 2 * len(synthetic)
+    assert scenario.index.name == "simulated_day"
+    assert scenario.index[0] == 1
+    with pytest.raises(ValueError):
+        generator.generate_weather([("Summer", "unknown")])
+
+
+def test_batch_is_reproducible_and_matches_single_scenarios(ensemble):
+    synthetic, classified = ensemble
+    generator = WeatherGenerator(synthetic, classified)
+    year = [("Winter", "wet"), ("Spring", "dry"), ("Summer", "normal"), ("Fall", "wet")]
+
+    batch = generator.generate_weather_batch(year, num_years=3, n_scenarios=50, seed=7)
+    streamed = pd.concat(
+        generator.generate_weather_batch_iter(
+            year, num_years=3, n_scenarios=50, chunk_size=16, seed=7
+        ),
+        axis=1,
+    )
+    single = generator.generate_weather(year, num_years=3, seed=7)
+
+    assert batch.shape == (3 * len(synthetic), 50)
+    pd.testing.assert_frame_equal(batch, streamed)
+    np.testing.assert_array_equal(batch["Scenario_1"], single["precipitation"])
+    assert batch.T.duplicated().sum() < 50
+
+    segments = generator.resolve_segments(year, num_years=3)
+    assembled = generator.assemble(segments, np.random.SeedSequence(7).spawn(50))
+    np.testing.assert_array_equal(assembled, batch.to_numpy())
+    with pytest.raises(ValueError, match="No matching simulations"):
+        generator.resolve_segments([("Summer", "unknown")])
+
+
+def test_by_year_classification_selects_single_season_segments(ensemble):
+    synthetic, _ = ensemble
+    classified = PrecipitationClassifier().classify_precipitation(
+        synthetic, by_year=True
+    )
+    generator = WeatherGenerator(synthetic, classified)
+
+    segment = generator._select_matching_segment(
+        "Summer", "wet", rng=np.random.default_rng(1)
+    )
+
+    wet = classified.index[classified["Summer"] == "wet"]
+    candidates = [
+        synthetic.loc[f"{year}-06-01":f"{year}-08-31", simulation].to_numpy()
+        for simulation, year in wet
+    ]
+    assert len(segment) == 92
+    assert any(np.array_equal(segment, candidate) for candidate in candidates)
+
+    batch = generator.generate_weather_batch(
+        [("Winter", "dry"), ("Summer", "wet")], n_scenarios=20, seed=2
+    )
+    assert batch.shape == (90 + 92, 20)
+
+
+@pytest.mark.parametrize("simulation_major", [False, True])
+def test_multivariate_store_is_not_copied(ensemble, tmp_path, simulation_major):
+    synthetic, _ = ensemble
+    columns = pd.MultiIndex.from_product(
+        [["precipitation", "temperature"], synthetic.columns],
+        names=["variable", "simulation"],
+    )
+    data = pd.DataFrame(
+        np.hstack([synthetic.to_numpy(), -synthetic.to_numpy()]),
+        index=synthetic.index,
+        columns=columns,
+    )
+    if simulation_major:
+        data = data.T.sort_index(level="simulation", sort_remaining=False).T
+    EnsembleStore(str(tmp_path / "store")).write(data)
+    stored = EnsembleStore(str(tmp_path / "store")).read(mmap=True)
+    classified = PrecipitationClassifier().classify_precipitation(stored, by_year=True)
+
+    generator = WeatherGenerator(stored, classified)
+    scenarios = generator.generate_weather_batch(
+        [("Summer", "wet"), ("Fall", "dry")], n_scenarios=4, seed=3
+    )
+
+    assert np.shares_memory(generator._values, stored.to_numpy())
+    np.testing.assert_array_equal(
+        scenarios["temperature"].to_numpy(), -scenarios["precipitation"].to_numpy()
+    )